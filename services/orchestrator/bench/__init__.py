@@ -0,0 +1 @@
+# Offline benchmarks for orchestrator hot paths (run with `python -m bench.<name>`)
@@ -0,0 +1,121 @@
+"""Embedding a chunk corpus: one call per chunk vs the batched, deduplicating, cached pipeline.
+
+    python -m bench.bench_embeddings --chunks 5000 --duplicates 0.3 --latency 0.05
+
+Runs against the deterministic stub embedder with a simulated per-call and per-text latency.
+"naive" embeds every chunk with its own call (EMBEDDING_CONCURRENCY at a time); "cold" is the
+pipeline on an empty cache; "warm" re-embeds the same corpus after a re-index (every row pending
+again, every vector already cached).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from .common import write_results
+
+_WORDS = ("parse", "config", "render", "socket", "buffer", "token", "stream", "cache", "index",
+          "query", "vector", "session", "router", "budget", "retry", "gate", "chunk", "graph",
+          "file", "tool")
+
+
+def _corpus(n: int, duplicates: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    texts: list[str] = []
+    for i in range(n):
+        if texts and rng.random() < duplicates:
+            texts.append(rng.choice(texts))  # license headers, boilerplate, vendored copies
+        else:
+            texts.append(f"def f{i}():\n    " + " ".join(rng.choices(_WORDS, k=40)))
+    return texts
+
+
+async def _naive(prov, texts: list[str], concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(text: str):
+        async with sem:
+            return await prov.embed([text])
+
+    calls = prov.calls
+    t = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return {"wall_s": round(time.perf_counter() - t, 3), "calls": prov.calls - calls}
+
+
+async def _pipeline(prov, rows: int) -> dict:
+    from sqlalchemy import text as sql
+
+    from orchestrator.embeddings.pipeline import embedding_pipeline
+    from orchestrator.memory import store
+    from orchestrator.memory.store import get_engine
+
+    calls = prov.calls
+    t = time.perf_counter()
+    summary = await embedding_pipeline.embed_pending()
+    summary.pop("ms")
+    out = {"wall_s": round(time.perf_counter() - t, 3), "calls": prov.calls - calls, **summary}
+    with get_engine().begin() as conn:  # simulate a re-index: rows come back without embeddings
+        conn.execute(sql("UPDATE vectorchunk SET embedding = NULL, dim = NULL"))
+    store._bump_generation("vector")
+    assert summary["rows"] == rows
+    return out
+
+
+async def _run(args) -> dict:
+    from orchestrator.config import settings
+    from orchestrator.embeddings.base import embedding_registry
+    from orchestrator.embeddings.stub import StubEmbeddingProvider
+    from orchestrator.memory import store
+
+    prov = StubEmbeddingProvider(latency=args.latency, per_text_latency=args.per_text_latency)
+    embedding_registry.register(prov)
+    settings.embedding_provider = "stub"
+    texts = _corpus(args.chunks, args.duplicates, args.seed)
+    results: dict = {"chunks": args.chunks, "distinct": len(set(texts)), "latency_s": args.latency,
+                     "batch_size": settings.embedding_batch_size,
+                     "concurrency": settings.embedding_concurrency}
+    if args.naive_limit:
+        sample = texts[:args.naive_limit]
+        naive = await _naive(prov, sample, settings.embedding_concurrency)
+        naive["projected_s"] = round(naive["wall_s"] * len(texts) / len(sample), 3)
+        results["naive"] = {"chunks": len(sample), **naive}
+    for i, text in enumerate(texts):
+        store.add_vector_chunk(f"bench/{i}.py#L1-2", text)
+    results["cold"] = await _pipeline(prov, len(texts))
+    results["warm"] = await _pipeline(prov, len(texts))
+    if "naive" in results:
+        cold_s = max(results["cold"]["wall_s"], 1e-9)
+        results["speedup_cold"] = round(results["naive"]["projected_s"] / cold_s, 1)
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunks", type=int, default=5000)
+    ap.add_argument("--duplicates", type=float, default=0.3)
+    ap.add_argument("--latency", type=float, default=0.05,
+                    help="simulated seconds per provider call")
+    ap.add_argument("--per-text-latency", type=float, default=0.0002)
+    ap.add_argument("--naive-limit", type=int, default=400,
+                    help="chunks to embed one by one (0 skips)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        from orchestrator.config import settings
+
+        settings.database_url = f"sqlite:///{tmp}/bench.db"
+        settings.embedding_cache_path = f"{tmp}/embedding_cache.db"
+        settings.log_level = "warning"
+        results = asyncio.run(_run(args))
+    for mode in ("naive", "cold", "warm"):
+        if mode in results:
+            print(mode, results[mode])
+    write_results("embeddings", results)
+
+
+if __name__ == "__main__":
+    main()
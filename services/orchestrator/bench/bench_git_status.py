@@ -0,0 +1,102 @@
+"""git.status on a synthetic repository: GitPython (previous implementation) vs porcelain v2.
+
+GitPython is only needed here; install it with the ``bench`` extra.
+
+    python -m bench.bench_git_status --files 50000 --modified 500 --untracked 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+from .common import percentiles, write_results
+
+
+def _git(cwd: str, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def _make_repo(root: str, files: int, modified: int, untracked: int) -> None:
+    per_dir = 100
+    for i in range(files):
+        d = os.path.join(root, f"pkg{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, f"mod{i:06d}.py"), "w") as f:
+            f.write(f"VALUE = {i}\n")
+    _git(root, "init", "-q", "-b", "main")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "synthetic")
+    step = max(1, files // max(1, modified))
+    for i in range(0, files, step)[:modified]:
+        with open(os.path.join(root, f"pkg{i // per_dir:04d}", f"mod{i:06d}.py"), "a") as f:
+            f.write("# touched\n")
+    os.makedirs(os.path.join(root, "scratch"), exist_ok=True)
+    for i in range(untracked):
+        with open(os.path.join(root, "scratch", f"new{i:05d}.txt"), "w") as f:
+            f.write("x\n")
+
+
+def _legacy(path: str) -> dict:
+    import git
+
+    repo = git.Repo(path, search_parent_directories=True)
+    return {
+        "active_branch": repo.active_branch.name if not repo.head.is_detached else None,
+        "is_dirty": repo.is_dirty(),
+        "untracked": repo.untracked_files,
+        "diff": [str(d) for d in repo.index.diff(None)],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=50_000)
+    ap.add_argument("--modified", type=int, default=500)
+    ap.add_argument("--untracked", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--page", type=int, default=100)
+    args = ap.parse_args()
+
+    from orchestrator.config import settings
+    from orchestrator.tools.git_tools import GitStatusTool
+
+    tool = GitStatusTool()
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        _make_repo(tmp, args.files, args.modified, args.untracked)
+        setup_s = time.perf_counter() - t0
+        settings.allow_fs_base = tmp
+        sub = os.path.join(tmp, "pkg0001")
+        _legacy(sub)  # warm the OS cache and the index stat info for both sides
+
+        samples = {"legacy_gitpython": [], "porcelain_v2": [], "porcelain_v2_paged": []}
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            old = _legacy(sub)
+            samples["legacy_gitpython"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            new = asyncio.run(tool.run(repo_path=sub))
+            samples["porcelain_v2"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            asyncio.run(tool.run(repo_path=sub, limit=args.page))
+            samples["porcelain_v2_paged"].append((time.perf_counter() - start) * 1000)
+        assert len(new["untracked"]) == len(old["untracked"]) == args.untracked
+        assert len(new["diff"]) == len(old["diff"]) == args.modified
+        results = {
+            "files": args.files,
+            "modified": args.modified,
+            "untracked": args.untracked,
+            "setup_s": round(setup_s, 2),
+            **{name: percentiles(vals) for name, vals in samples.items()},
+        }
+    write_results("git_status", results)
+
+
+if __name__ == "__main__":
+    main()
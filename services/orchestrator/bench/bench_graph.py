@@ -0,0 +1,134 @@
+"""memory.graph_expand cost: in-memory CSR traversal vs one ORM query per node per hop.
+
+    python -m bench.bench_graph --edges 100000 1000000 --nodes 50000 --hops 2 --queries 200
+
+The naive baseline gets an index on ``GraphEdge.src_id`` so it is one indexed lookup per node. Also
+reports the initial load and an incremental refresh after a small batch of inserts.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from orchestrator.core.plugins import rss_mb
+
+from .common import percentiles, write_results
+
+_RELATIONS = ["is_a", "part_of", "see_also", "depends_on"]
+
+
+def _naive(session, seed: int, hops: int) -> set:
+    from sqlmodel import select
+
+    from orchestrator.memory import models
+
+    seen, frontier = {seed}, [seed]
+    for _ in range(hops):
+        nxt = []
+        for node in frontier:
+            stmt = select(models.GraphEdge.dst_id).where(models.GraphEdge.src_id == node)
+            for dst in session.exec(stmt):
+                if dst not in seen:
+                    seen.add(dst)
+                    nxt.append(dst)
+        frontier = nxt
+    return seen - {seed}
+
+
+def run(edges: int, nodes: int, hops: int, n_queries: int, naive_limit: int, seed: int) -> dict:
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    from orchestrator.config import settings
+    from orchestrator.memory import store
+    from orchestrator.memory.graph import GraphIndex
+
+    rng = random.Random(seed)
+
+    def random_edge() -> tuple:
+        return rng.randrange(nodes), rng.randrange(nodes), rng.choice(_RELATIONS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.database_url = f"sqlite:///{tmp}/bench.db"
+        store._engine = None
+        start = time.perf_counter()
+        for offset in range(0, edges, 50_000):
+            store.add_graph_edges([random_edge() for _ in range(min(50_000, edges - offset))])
+        seed_s = time.perf_counter() - start
+
+        graph, rss_before = GraphIndex(), rss_mb()
+        start = time.perf_counter()
+        graph.ensure_current()
+        load_s = time.perf_counter() - start
+        rss_delta = rss_mb() - rss_before
+
+        store.add_graph_edges([random_edge() for _ in range(1000)])
+        start = time.perf_counter()
+        graph.ensure_current()
+        refresh_ms = (time.perf_counter() - start) * 1000
+
+        seeds = [rng.randrange(nodes) for _ in range(n_queries)]
+        graph_samples, reached = [], []
+        for s in seeds:
+            start = time.perf_counter()
+            found = graph.neighbors([s], hops)
+            graph_samples.append((time.perf_counter() - start) * 1000)
+            reached.append(len(found))
+        path_samples = []
+        for s in seeds:
+            start = time.perf_counter()
+            graph.shortest_path(s, rng.randrange(nodes), max_hops=hops * 2)
+            path_samples.append((time.perf_counter() - start) * 1000)
+
+        eng = store.get_engine()
+        with eng.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS bench_graphedge_src ON graphedge (src_id)"))
+        naive_samples, mismatches = [], 0
+        with Session(eng) as session:
+            for s in seeds[:naive_limit]:
+                start = time.perf_counter()
+                expected = _naive(session, s, hops)
+                naive_samples.append((time.perf_counter() - start) * 1000)
+                mismatches += expected != {n["id"] for n in graph.neighbors([s], hops)}
+        eng.dispose()
+        store._engine = None
+    return {
+        "edges": edges,
+        "nodes": nodes,
+        "hops": hops,
+        "seed_s": seed_s,
+        "load_s": load_s,
+        "load_rss_mb": rss_delta,
+        "refresh_1000_ms": refresh_ms,
+        "reached": percentiles(reached),
+        "graph_ms": percentiles(graph_samples),
+        "path_ms": percentiles(path_samples),
+        "naive_ms": percentiles(naive_samples),
+        "errors": mismatches,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--edges", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--nodes", type=int, default=50_000)
+    ap.add_argument("--hops", type=int, default=2)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--naive-limit", type=int, default=50,
+                    help="queries also run through the per-node ORM traversal")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    results = {}
+    for edges in args.edges:
+        row = results[str(edges)] = run(edges, args.nodes, args.hops, args.queries,
+                                        args.naive_limit, args.seed)
+        print(edges, {k: row[k]["p50"] for k in ("graph_ms", "path_ms", "naive_ms")},
+              "load_s", round(row["load_s"], 2))
+    write_results("graph", results)
+
+
+if __name__ == "__main__":
+    main()
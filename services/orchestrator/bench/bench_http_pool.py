@@ -0,0 +1,64 @@
+"""TTFT with a fresh httpx client per turn vs the shared HTTPClientPool.
+
+    python -m bench.bench_http_pool --turns 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from .common import percentiles, serve_in_thread, write_results
+from .stub_llm import create_app
+
+
+async def _turns(provider, pool, turns: int, fresh: bool) -> list[float]:
+    msgs = [{"role": "user", "content": "ping"}]
+    samples = []
+    for _ in range(turns):
+        if fresh:
+            # Reproduces the old behaviour: a brand new client (pool, SSL context, TCP) per turn.
+            await pool.aclose()
+        start = time.perf_counter()
+        first = None
+        async for _evt in provider.stream_chat(msgs, model="stub"):
+            if first is None:
+                first = time.perf_counter() - start
+        samples.append(first * 1000)
+    return samples
+
+
+async def run(turns: int) -> dict:
+    from orchestrator.config import settings
+    from orchestrator.core.http_pool import HTTPClientPool
+    from orchestrator.providers.openai_provider import OpenAIProvider
+
+    settings.openai_api_key = settings.openai_api_key or "bench"
+    provider = OpenAIProvider()
+    provider.http_pool = HTTPClientPool()
+    out = {}
+    for mode, fresh in (("fresh_client", True), ("pooled", False)):
+        await _turns(provider, provider.http_pool, 5, fresh)  # warm-up
+        samples = await _turns(provider, provider.http_pool, turns, fresh)
+        out[mode] = {"ttft_ms": percentiles(samples)}
+    await provider.http_pool.aclose()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.0, help="stub first-token latency (s)")
+    args = ap.parse_args()
+    server, base = serve_in_thread(create_app(tokens=4, first_token_latency=args.latency))
+    os.environ["OPENAI_API_BASE"] = f"{base}/v1"
+    try:
+        results = asyncio.run(run(args.turns))
+    finally:
+        server.should_exit = True
+    write_results("http_pool", {"turns": args.turns, **results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""simple_lexical_search latency: full-text index vs the bounded substring scan it falls back to.
+
+    python -m bench.bench_lexical_search --rows 10000 100000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from .common import percentiles, write_results
+
+_WORDS = [f"w{i:04d}" for i in range(5000)]
+
+
+def _seed(store, rows: int, rng: random.Random) -> float:
+    from sqlmodel import Session
+
+    from orchestrator.memory import models
+
+    start = time.perf_counter()
+    with Session(store.get_engine()) as s:
+        for i in range(rows):
+            body = " ".join(rng.choices(_WORDS, k=40))
+            if i % 2:
+                s.add(models.OntologyItem(key=f"k{i}", title=f"item {i}", body=body, tags="[]"))
+            else:
+                s.add(models.VectorChunk(source=f"doc{i}", content=body))
+            if i % 5000 == 4999:
+                s.commit()
+        s.commit()
+    return time.perf_counter() - start
+
+
+def _time(fn, queries) -> dict:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q, limit=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def run(rows: int, n_queries: int, seed: int) -> dict:
+    from orchestrator.config import settings
+    from orchestrator.memory import fts, store
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.database_url = f"sqlite:///{tmp}/bench.db"
+        store._engine = None
+        seed_s = _seed(store, rows, rng)
+        # Mix of common and rare terms plus two-word queries.
+        queries = [rng.choice(_WORDS) if i % 3 else " ".join(rng.sample(_WORDS, 2))
+                   for i in range(n_queries)]
+        store.simple_lexical_search(queries[0])  # warm caches and prepared statements
+        out = {
+            "rows": rows,
+            "backend": fts.backend(),
+            "seed_s": seed_s,
+            "fts_ms": _time(store.simple_lexical_search, queries),
+            "scan_ms": _time(store._scan_lexical_search, queries),
+        }
+        store._engine.dispose()
+        store._engine = None
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = run(rows, args.queries, args.seed)
+        print(rows, {k: results[str(rows)][k]["p50"] for k in ("fts_ms", "scan_ms")})
+    write_results("lexical_search", results)
+
+
+if __name__ == "__main__":
+    main()
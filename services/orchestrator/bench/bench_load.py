@@ -0,0 +1,129 @@
+"""Load test: N concurrent sessions driving /chat/stream against the local OpenAI-compatible stub.
+
+    python -m bench.bench_load --sessions 1 10 100 --turns 5 --tokens 64 --token-rate 200 \
+        --latency 0.05
+
+Everything runs in-process on loopback (stub + orchestrator under uvicorn), so results only
+depend on the machine. Reports client-observed TTFT, turn time, per-stream token rate and
+aggregate throughput.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+from orchestrator.core.plugins import rss_mb
+
+from .common import percentiles, serve_in_thread, write_results
+from .stub_llm import create_app
+
+
+async def _turn(client, payload: Dict[str, Any]) -> Dict[str, Any]:
+    import orjson
+
+    start = time.perf_counter()
+    first = None
+    tokens = 0
+    error = None
+    async with client.stream("POST", "/chat/stream", json=payload) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            evt = orjson.loads(line[len("data: "):])
+            if evt.get("type") == "token":
+                if first is None:
+                    first = time.perf_counter()
+                # The stub emits "tok<i> " per token; frames may coalesce.
+                tokens += evt["token"].count(" ")
+            elif evt.get("type") == "error":
+                error = evt.get("error")
+    end = time.perf_counter()
+    return {
+        "ttft_ms": None if first is None else (first - start) * 1000,
+        "turn_ms": (end - start) * 1000,
+        "tokens": tokens,
+        "stream_tok_s": tokens / (end - first) if first is not None and end > first else None,
+        "error": error,
+    }
+
+
+async def _level(base: str, sessions: int, turns: int) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=None) as client:
+        async def session(idx: int) -> List[Dict[str, Any]]:
+            out = []
+            for turn in range(turns):
+                # Unique prompts so every turn reaches the upstream instead of the response cache.
+                payload = {"message": f"s{idx} t{turn}", "provider": "openai", "cache": False}
+                try:
+                    out.append(await _turn(client, payload))
+                except Exception as e:  # noqa: BLE001 - counted, not fatal
+                    out.append({"error": str(e) or type(e).__name__})
+            return out
+
+        await _turn(client, {"message": "warm-up", "provider": "openai", "cache": False})
+        start = time.perf_counter()
+        per_session = await asyncio.gather(*(session(i) for i in range(sessions)))
+        results = [r for rs in per_session for r in rs]
+        elapsed = time.perf_counter() - start
+    ok = [r for r in results if not r.get("error") and r.get("ttft_ms") is not None]
+    tokens = sum(r["tokens"] for r in ok)
+    return {
+        "sessions": sessions,
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "elapsed_s": elapsed,
+        "ttft_ms": percentiles(r["ttft_ms"] for r in ok),
+        "turn_ms": percentiles(r["turn_ms"] for r in ok),
+        "stream_tok_s": percentiles(r["stream_tok_s"] for r in ok if r["stream_tok_s"] is not None),
+        "throughput_tok_per_s": tokens / elapsed if elapsed else 0.0,
+        "throughput_turns_per_s": len(ok) / elapsed if elapsed else 0.0,
+        "rss_mb": rss_mb(),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--turns", type=int, default=5, help="sequential turns per session")
+    ap.add_argument("--tokens", type=int, default=64, help="tokens per stub response")
+    ap.add_argument("--token-rate", type=float, default=200.0,
+                    help="stub tokens/sec per stream (0 = unthrottled)")
+    ap.add_argument("--latency", type=float, default=0.05, help="stub first-token latency (s)")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    stub, stub_base = serve_in_thread(create_app(args.tokens, args.token_rate, args.latency,
+                                                 args.jitter, args.seed))
+    # Must be set before the orchestrator is imported: the provider reads it at import time.
+    os.environ["OPENAI_API_BASE"] = f"{stub_base}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    os.environ.setdefault("ENABLE_MEMORY", "false")
+    from orchestrator.api.main import app
+
+    server, base = serve_in_thread(app)
+    try:
+        levels = {str(n): asyncio.run(_level(base, n, args.turns)) for n in args.sessions}
+    finally:
+        server.should_exit = True
+        stub.should_exit = True
+    for n, row in levels.items():
+        print(n, {k: row[k] for k in ("errors", "throughput_tok_per_s")}, "ttft", row["ttft_ms"])
+    write_results("load", {
+        "stub": {"tokens": args.tokens, "token_rate": args.token_rate, "latency_s": args.latency,
+                 "jitter": args.jitter, "seed": args.seed},
+        "turns_per_session": args.turns,
+        "levels": levels,
+    })
+
+
+if __name__ == "__main__":
+    main()
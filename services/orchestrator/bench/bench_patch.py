@@ -0,0 +1,112 @@
+"""fs.apply_patch engine on large files: many hunks, exact positions vs drifted context.
+
+    python -m bench.bench_patch --lines 100000 200000 --hunks 2000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+from .common import write_results
+
+
+def _make_case(n_lines: int, n_hunks: int, context: int = 3):
+    original = [f"line {i} {'x' * (i % 40)}\n" for i in range(n_lines)]
+    step = max(context * 2 + 2, n_lines // n_hunks)
+    expected = list(original)
+    patch: List[str] = ["--- a/big.txt\n", "+++ b/big.txt\n"]
+    delta = 0
+    edits = []
+    for target in range(context + 1, n_lines - context - 1, step)[:n_hunks]:
+        lo, hi = target - context, target + context + 1
+        body = [" " + original[j] for j in range(lo, target)]
+        body += ["-" + original[target], "+" + original[target].upper(),
+                 "+added after %d\n" % target]
+        body += [" " + original[j] for j in range(target + 1, hi)]
+        patch.append(f"@@ -{lo + 1},{hi - lo} +{lo + 1 + delta},{hi - lo + 1} @@\n")
+        patch += body
+        delta += 1
+        edits.append(target)
+    for target in reversed(edits):
+        expected[target:target + 1] = [original[target].upper(), "added after %d\n" % target]
+    return original, "".join(patch), expected
+
+
+def _legacy_apply(original: List[str], diff_lines: List[str]) -> List[str]:
+    # The previous implementation: rescans the rest of the diff per hunk and ignores the
+    # offset introduced by earlier hunks.
+    out = original[:]
+    for idx, line in enumerate(diff_lines):
+        if line.startswith("@@"):
+            old_start = int(line.split("@@")[1].strip().split(" ")[0].split(",")[0][1:])
+            hunk: List[str] = []
+            for h in diff_lines[idx + 1:]:
+                if h.startswith("@@"):
+                    break
+                if h.startswith("---") or h.startswith("+++"):
+                    continue
+                hunk.append(h)
+            new_lines: List[str] = []
+            remove_count = 0
+            for hline in hunk:
+                if hline.startswith("+"):
+                    new_lines.append(hline[1:])
+                elif hline.startswith("-"):
+                    remove_count += 1
+                elif hline.startswith(" "):
+                    new_lines.append(hline[1:])
+            o_index = old_start - 1
+            out[o_index:o_index + remove_count] = new_lines
+    return out
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    from orchestrator.tools.patch import apply_hunks, parse_patch
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, nargs="+", default=[100_000, 200_000])
+    ap.add_argument("--hunks", type=int, default=2000)
+    ap.add_argument("--drift", type=int, default=25,
+                    help="lines inserted at the top to force offset search")
+    ap.add_argument("--legacy", action="store_true", help="also time the previous implementation")
+    args = ap.parse_args()
+
+    results = {}
+    for n in args.lines:
+        original, patch, expected = _make_case(n, args.hunks)
+        file_patches = parse_patch(patch)
+        hunks = file_patches[0].hunks
+        out, _ = apply_hunks(original, hunks)
+        assert out == expected
+        drifted = [f"prelude {i}\n" for i in range(args.drift)] + original
+        out, info = apply_hunks(drifted, hunks)
+        assert out[args.drift:] == expected
+        row = {
+            "hunks": len(hunks),
+            "patch_bytes": len(patch),
+            "parse_ms": _time(lambda: parse_patch(patch)),
+            "apply_exact_ms": _time(lambda: apply_hunks(original, hunks)),
+            "apply_drifted_ms": _time(lambda: apply_hunks(drifted, hunks)),
+            "drifted_hunks_relocated": len(info["applied"]),
+        }
+        if args.legacy:
+            diff_lines = patch.splitlines(keepends=True)
+            row["legacy_ms"] = _time(lambda: _legacy_apply(original, diff_lines), repeat=1)
+            row["legacy_correct"] = _legacy_apply(original, diff_lines) == expected
+        results[str(n)] = row
+        print(n, row)
+    write_results("patch", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""retrieval.search latency per axis, and what running the axes concurrently saves.
+
+    python -m bench.bench_retrieval --rows 10000 100000 --queries 100 --embed-latency 0.02
+
+Seeds OntologyItem (keys and tags), ParsingItem and VectorChunk rows (stub embeddings) from one
+vocabulary. The stub embedder's latency stands in for the provider round trip of the vector axis.
+Every query uses a fresh text, so it is never in the embedding cache.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from .common import percentiles, write_results
+
+_WORDS = [f"w{i:04d}" for i in range(5000)]
+
+
+def _seed(store, rows: int, rng: random.Random) -> float:
+    from sqlmodel import Session
+
+    from orchestrator.embeddings.stub import StubEmbeddingProvider
+    from orchestrator.memory import models
+    from orchestrator.memory.vector_index import pack_vector
+
+    start = time.perf_counter()
+    with Session(store.get_engine()) as s:
+        for i in range(rows):
+            body = " ".join(rng.choices(_WORDS, k=40))
+            kind = i % 3
+            if kind == 0:
+                s.add(models.OntologyItem(key=rng.choice(_WORDS), title=f"item {i}", body=body,
+                                          tags=f'["{rng.choice(_WORDS)}", "{rng.choice(_WORDS)}"]'))
+            elif kind == 1:
+                s.add(models.ParsingItem(source=f"doc{i}", content=body))
+            else:
+                vec = StubEmbeddingProvider.vector(body, 64)
+                s.add(models.VectorChunk(source=f"chunk{i}", content=body,
+                                         embedding=pack_vector(vec), dim=64))
+            if i % 5000 == 4999:
+                s.commit()
+        s.commit()
+    store._bump_generation("vector")
+    return time.perf_counter() - start
+
+
+async def _queries(queries, limit: int) -> dict:
+    from orchestrator.memory.retrieval import hybrid_retriever
+
+    await hybrid_retriever.search("warm up", limit)  # builds the vector index
+    axes = {"lexical": [], "vector": [], "ontology": [], "fuse": [], "total": [], "sequential": []}
+    errors = 0
+    for q in queries:
+        out = await hybrid_retriever.search(q, limit)
+        errors += bool(out["errors"])
+        t = out["timings_ms"]
+        for axis in ("lexical", "vector", "ontology", "fuse", "total"):
+            axes[axis].append(t[axis])
+        axes["sequential"].append(t["lexical"] + t["vector"] + t["ontology"] + t["fuse"])
+    out = {f"{axis}_ms": percentiles(samples) for axis, samples in axes.items()}
+    return out | {"errors": errors}
+
+
+def run(rows: int, n_queries: int, limit: int, embed_latency: float, seed: int) -> dict:
+    from orchestrator.config import settings
+    from orchestrator.embeddings.base import embedding_registry
+    from orchestrator.embeddings.pipeline import EmbeddingPipeline, embedding_pipeline
+    from orchestrator.embeddings.stub import StubEmbeddingProvider
+    from orchestrator.memory import store
+    from orchestrator.memory.vector_index import vector_index
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.database_url = f"sqlite:///{tmp}/bench.db"
+        settings.embedding_provider = "stub"
+        settings.embedding_dimensions = 64
+        embedding_registry._items["stub"] = StubEmbeddingProvider(latency=embed_latency)
+        embedding_pipeline.cache = EmbeddingPipeline(f"{tmp}/emb.db").cache
+        vector_index.directory, vector_index.generation = f"{tmp}/vector_index", -1
+        store._engine = None
+        seed_s = _seed(store, rows, rng)
+        queries = [" ".join(rng.sample(_WORDS, 2)) + f" q{i}" for i in range(n_queries)]
+        out = {"rows": rows, "seed_s": seed_s, **asyncio.run(_queries(queries, limit))}
+        store._engine.dispose()
+        store._engine = None
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--embed-latency", type=float, default=0.02,
+                    help="stub embedding call latency (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    results = {}
+    for rows in args.rows:
+        row = results[str(rows)] = run(rows, args.queries, args.limit, args.embed_latency,
+                                       args.seed)
+        print(rows, {k: round(row[k]["p50"], 2) for k in row if k.endswith("_ms") and row[k]})
+    write_results("retrieval", results)
+
+
+if __name__ == "__main__":
+    main()
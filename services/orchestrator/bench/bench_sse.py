@@ -0,0 +1,75 @@
+"""SSE framing cost on /chat/stream: legacy per-chunk json.dumps vs parsed deltas + coalescing.
+
+    python -m bench.bench_sse --tokens 2000 --gap-ms 1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import orjson
+
+from orchestrator.api.sse import coalesce_tokens, encode_event
+
+from .common import write_results
+
+
+def _raw_chunk(i: int) -> str:
+    return orjson.dumps({
+        "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": 0, "model": "bench",
+        "choices": [{"index": 0, "delta": {"content": f"tok{i} "}, "finish_reason": None}],
+    }).decode()
+
+
+async def _tokens(n: int, gap: float, legacy: bool):
+    for i in range(n):
+        # Legacy mode forwarded the whole upstream JSON line as the "token".
+        yield {"type": "token", "token": _raw_chunk(i) if legacy else f"tok{i} "}
+        await asyncio.sleep(gap)
+
+
+async def _measure(n: int, gap: float, mode: str, window_ms: float) -> dict:
+    frames = 0
+    total = 0
+    start = time.perf_counter()
+    if mode == "legacy":
+        async for evt in _tokens(n, gap, legacy=True):
+            total += len(f"data: {json.dumps(evt)}\n\n".encode())
+            frames += 1
+    else:
+        async for evt in coalesce_tokens(_tokens(n, gap, legacy=False), window_ms, 2048):
+            total += len(encode_event(evt))
+            frames += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "bytes": total,
+        "bytes_per_token": round(total / n, 2),
+        "frames_per_sec": round(frames / elapsed, 1),
+        "tokens_per_frame": round(n / frames, 2),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+async def run(n: int, gap_ms: float, windows: list[float]) -> dict:
+    gap = gap_ms / 1000
+    out = {"legacy_json_dumps": await _measure(n, gap, "legacy", 0)}
+    for w in windows:
+        out[f"orjson_window_{w:g}ms"] = await _measure(n, gap, "coalesced", w)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tokens", type=int, default=2000)
+    ap.add_argument("--gap-ms", type=float, default=1.0, help="delay between upstream tokens")
+    ap.add_argument("--windows", type=float, nargs="*", default=[0, 5, 15, 30])
+    args = ap.parse_args()
+    results = asyncio.run(run(args.tokens, args.gap_ms, args.windows))
+    write_results("sse", {"tokens": args.tokens, "gap_ms": args.gap_ms, **results})
+
+
+if __name__ == "__main__":
+    main()
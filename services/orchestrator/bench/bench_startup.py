@@ -0,0 +1,67 @@
+"""Cold start: interpreter + app import time and RSS, lazy plugin discovery vs preloading
+everything.
+
+    python -m bench.bench_startup --runs 10
+
+Each sample is a fresh interpreter (like a new Cloud Run instance): the app is imported and its
+lifespan started, then the first git.status lookup is timed (that is where lazy loading pays).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .common import percentiles, write_results
+
+_PROBE = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+from orchestrator.api.main import app, lifespan
+from orchestrator.core.plugins import rss_mb
+from orchestrator.tools.base import tool_registry
+
+async def main():
+    async with lifespan(app):
+        ready = time.perf_counter()
+        rss = rss_mb()
+        modules = len(sys.modules)
+        tool_registry.get("git.status")
+        first_use = (time.perf_counter() - ready) * 1000
+    print(json.dumps({"ready_ms": (ready - t0) * 1000, "rss_mb": rss, "modules": modules,
+                      "first_git_status_lookup_ms": first_use}))
+
+asyncio.run(main())
+"""
+
+
+def _sample(preload: bool) -> dict:
+    env = dict(os.environ, PLUGINS_PRELOAD=str(preload).lower(), LOG_LEVEL="warning",
+               ENABLE_MEMORY="false")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True,
+                          cwd=Path(__file__).parent.parent, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    return {"process_ms": wall, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+    results = {}
+    for mode, preload in (("lazy", False), ("preload", True)):
+        _sample(preload)  # warm the OS page cache and .pyc files
+        samples = [_sample(preload) for _ in range(args.runs)]
+        keys = ("process_ms", "ready_ms", "rss_mb", "modules", "first_git_status_lookup_ms")
+        results[mode] = {key: percentiles(s[key] for s in samples) for key in keys}
+        print(mode, {k: round(v["p50"], 1) for k, v in results[mode].items()})
+    write_results("startup", {"runs": args.runs, **results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Vector index query latency, recall and resident memory at several corpus sizes.
+
+    python -m bench.bench_vector_index --sizes 10000 100000 1000000 --dim 384
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+
+import numpy as np
+
+from orchestrator.core.plugins import rss_mb
+
+from .common import percentiles, write_results
+
+
+def _rows(n: int, dim: int, seed: int):
+    # Real embeddings are clustered by topic; uniform noise would be a worst case for IVF.
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(16, n // 100), dim), dtype=np.float32)
+    for start in range(0, n, 10_000):
+        size = min(10_000, n - start)
+        block = centers[rng.integers(0, centers.shape[0], size)]
+        block += 0.6 * rng.standard_normal((size, dim), dtype=np.float32)
+        for i, vec in enumerate(block):
+            yield start + i, vec
+
+
+def _one_size(n: int, dim: int, queries: int, nprobe: int) -> dict:
+    from orchestrator.memory.vector_index import VectorIndex
+
+    out: dict = {"rows": n, "dim": dim}
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp)
+        rss0 = rss_mb()
+        t = time.perf_counter()
+        index.write(_rows(n, dim, seed=0), dim=dim, count=n)
+        out["build_s"] = round(time.perf_counter() - t, 2)
+        out["rss_after_open_mb"] = round(rss_mb() - rss0, 1)
+        rng = np.random.default_rng(1)
+        qs = [np.asarray(index.matrix[i]) + 0.05 * rng.standard_normal(dim, dtype=np.float32)
+              for i in rng.choice(n, size=queries, replace=False)]
+
+        lat = []
+        exact_hits = []
+        for q in qs:
+            t = time.perf_counter()
+            exact_hits.append({i for i, _ in index.search(q, k=10, mode="exact")})
+            lat.append((time.perf_counter() - t) * 1000)
+        out["exact_ms"] = percentiles(lat)
+        out["rss_after_exact_mb"] = round(rss_mb() - rss0, 1)
+
+        t = time.perf_counter()
+        index.build_ivf()
+        out["ivf_train_s"] = round(time.perf_counter() - t, 2)
+        lat, recall = [], []
+        for q, exact in zip(qs, exact_hits):
+            t = time.perf_counter()
+            approx = {i for i, _ in index.search(q, k=10, mode="ivf", nprobe=nprobe)}
+            lat.append((time.perf_counter() - t) * 1000)
+            recall.append(len(approx & exact) / 10)
+        out["ivf_ms"] = percentiles(lat)
+        out["ivf_recall_at_10"] = round(float(np.mean(recall)), 3)
+        out["ivf_lists"] = index.stats()["ivf_lists"]
+        out["rss_after_ivf_mb"] = round(rss_mb() - rss0, 1)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--nprobe", type=int, default=8)
+    args = ap.parse_args()
+    results = []
+    # One fresh process per size so resident memory figures don't bleed between runs.
+    ctx = mp.get_context("spawn")
+    for n in args.sizes:
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(_one_size, (n, args.dim, args.queries, args.nprobe)))
+    write_results("vector_index", {"nprobe": args.nprobe, "runs": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Sustained Message inserts/sec: per-row commits (add_message) vs the batched background writer.
+
+    python -m bench.bench_writer --messages 5000 --concurrency 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from .common import write_results
+
+
+def _point_store_at(tmp: str):
+    from orchestrator.config import settings
+    from orchestrator.memory import store
+
+    settings.database_url = f"sqlite:///{tmp}/bench.db"
+    store._engine = None
+    return store
+
+
+async def _per_row(store, n: int, concurrency: int) -> float:
+    # Old path: each handler commits its own row on the event loop.
+    async def worker(k: int):
+        for i in range(k):
+            store.add_message(1, "user", {"content": f"m{i}"})
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def _batched(store, n: int, concurrency: int) -> tuple[float, dict]:
+    import orchestrator.memory.writer as writer_mod
+    from orchestrator.memory.writer import BatchWriter
+
+    writer = BatchWriter()
+    writer_mod.db_writer = writer
+    writer.start()
+
+    async def worker(k: int):
+        for i in range(k):
+            store.queue_message(1, "user", {"content": f"m{i}"})
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n // concurrency) for _ in range(concurrency)))
+    await writer.flush()
+    elapsed = time.perf_counter() - start
+    stats = writer.stats()
+    await writer.shutdown()
+    return elapsed, stats
+
+
+async def run(n: int, concurrency: int) -> dict:
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _point_store_at(tmp)
+        store.get_engine()
+        elapsed = await _per_row(store, n, concurrency)
+        out["per_row_commit"] = {"seconds": round(elapsed, 3),
+                                 "messages_per_sec": round(n / elapsed, 1)}
+        elapsed, stats = await _batched(store, n, concurrency)
+        out["batched_writer"] = {"seconds": round(elapsed, 3),
+                                 "messages_per_sec": round(n / elapsed, 1), **stats}
+        store.get_engine().dispose()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    args = ap.parse_args()
+    results = asyncio.run(run(args.messages, args.concurrency))
+    write_results("writer", {"messages": args.messages, "concurrency": args.concurrency, **results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Transport comparison: N concurrent chat turns over SSE (one HTTP connection each) versus the
+multiplexed WebSocket endpoint (a handful of connections, text and binary framing).
+
+    python -m bench.bench_ws --sessions 1000 --ws-connections 8 --tokens 64 --token-rate 100
+
+The orchestrator runs as a uvicorn subprocess so its RSS and open sockets can be sampled from /proc
+without the client and stub mixed in; the stub upstream runs on a thread here. Upstream limits are
+raised to the session count so both transports see the same, unconstrained upstream.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import orjson
+
+from .common import percentiles, serve_in_thread, write_results
+from .stub_llm import create_app
+
+
+def _proc_sample(pid: int) -> tuple[float, int]:
+    rss = 0.0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) / 1024
+    sockets = 0
+    for fd in os.listdir(f"/proc/{pid}/fd"):
+        try:
+            sockets += os.readlink(f"/proc/{pid}/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return rss, sockets
+
+
+class _Sampler:
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.base_rss, self.base_sockets = _proc_sample(pid)
+        self.peak_rss, self.peak_sockets = self.base_rss, self.base_sockets
+        self._task: asyncio.Task | None = None
+
+    async def _loop(self) -> None:
+        while True:
+            rss, sockets = _proc_sample(self.pid)
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_sockets = max(self.peak_sockets, sockets)
+            await asyncio.sleep(0.05)
+
+    def __enter__(self) -> "_Sampler":
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        assert self._task is not None
+        self._task.cancel()
+
+    def result(self) -> Dict[str, float]:
+        return {"server_rss_mb": self.peak_rss,
+                "server_rss_delta_mb": self.peak_rss - self.base_rss,
+                "server_sockets_peak": self.peak_sockets}
+
+
+def _tokens(evt: Dict[str, Any]) -> int:
+    return evt["token"].count(" ")  # the stub emits "tok<i> " per token; frames may coalesce
+
+
+def _summary(results: List[Dict[str, Any]], elapsed: float, connections: int,
+             sampler: _Sampler) -> Dict[str, Any]:
+    ok = [r for r in results if not r.get("error") and r.get("ttft_ms") is not None]
+    tokens = sum(r["tokens"] for r in ok)
+    return {
+        "client_connections": connections,
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "elapsed_s": elapsed,
+        "ttft_ms": percentiles(r["ttft_ms"] for r in ok),
+        "turn_ms": percentiles(r["turn_ms"] for r in ok),
+        "throughput_tok_per_s": tokens / elapsed if elapsed else 0.0,
+        "throughput_turns_per_s": len(ok) / elapsed if elapsed else 0.0,
+        **sampler.result(),
+    }
+
+
+def _payload(idx: int) -> Dict[str, Any]:
+    # Unique prompts so every turn reaches the upstream instead of the response cache.
+    return {"message": f"s{idx} {time.monotonic_ns()}", "provider": "openai", "cache": False}
+
+
+async def _sse(base: str, sessions: int, pid: int) -> Dict[str, Any]:
+    import httpx
+
+    async def turn(client, idx: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        first, tokens, error = None, 0, None
+        try:
+            async with client.stream("POST", "/chat/stream", json=_payload(idx)) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    evt = orjson.loads(line[len("data: "):])
+                    if evt.get("type") == "token":
+                        first = first or time.perf_counter()
+                        tokens += _tokens(evt)
+                    elif evt.get("type") == "error":
+                        error = evt.get("error")
+        except Exception as e:  # noqa: BLE001 - counted, not fatal
+            error = str(e) or type(e).__name__
+        end = time.perf_counter()
+        return {"ttft_ms": None if first is None else (first - start) * 1000,
+                "turn_ms": (end - start) * 1000, "tokens": tokens, "error": error}
+
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=None) as client:
+        await turn(client, -1)
+        with _Sampler(pid) as sampler:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(turn(client, i) for i in range(sessions)))
+            elapsed = time.perf_counter() - start
+    return _summary(results, elapsed, sessions, sampler)
+
+
+async def _ws(base: str, sessions: int, connections: int, binary: bool, pid: int) -> Dict[str, Any]:
+    from websockets.asyncio.client import connect
+
+    from orchestrator.api.ws import unpack_frames
+
+    url = base.replace("http://", "ws://") + "/ws" + ("?binary=1" if binary else "")
+    results: List[Dict[str, Any]] = []
+
+    async def conn(ids: List[int]) -> None:
+        turns: Dict[str, Dict[str, Any]] = {}
+        async with connect(url, max_size=None, ping_interval=None) as ws:
+            for idx in ids:
+                cid = str(idx)
+                turns[cid] = {"start": time.perf_counter(), "first": None, "tokens": 0,
+                              "error": None}
+                await ws.send(orjson.dumps({"op": "chat", "id": cid, **_payload(idx)}),
+                              text=not binary)
+            pending = set(turns)
+            while pending:
+                data = await ws.recv()
+                for frame in unpack_frames(data) if binary else [orjson.loads(data)]:
+                    t = turns[frame["id"]]
+                    evt = frame.get("event")
+                    if evt is not None:
+                        if evt.get("type") == "token":
+                            t["first"] = t["first"] or time.perf_counter()
+                            t["tokens"] += _tokens(evt)
+                        elif evt.get("type") == "error":
+                            t["error"] = evt.get("error")
+                    elif frame.get("op") == "error":
+                        t["error"] = frame["error"]
+                        pending.discard(frame["id"])
+                    if frame.get("op") == "closed":
+                        t["end"] = time.perf_counter()
+                        pending.discard(frame["id"])
+        for t in turns.values():
+            end = t.get("end", time.perf_counter())
+            ttft = None if t["first"] is None else (t["first"] - t["start"]) * 1000
+            results.append({"ttft_ms": ttft, "turn_ms": (end - t["start"]) * 1000,
+                            "tokens": t["tokens"], "error": t["error"]})
+
+    await conn([-1])
+    results.clear()
+    with _Sampler(pid) as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(conn(list(range(c, sessions, connections)))
+                               for c in range(connections)))
+        elapsed = time.perf_counter() - start
+    return _summary(results, elapsed, connections, sampler)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(stub_base: str, sessions: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_BASE": f"{stub_base}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"),
+        "LOG_LEVEL": "warning",
+        "ENABLE_MEMORY": "false",
+        "PROVIDER_DEFAULT_CONCURRENCY": str(sessions),
+        "ADMISSION_MAX_QUEUE": str(sessions * 2),
+        "HTTP_MAX_CONNECTIONS": str(sessions),
+        "HTTP_MAX_KEEPALIVE": str(sessions),
+        "WS_MAX_STREAMS": str(sessions),
+    }
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "orchestrator.api.main:app",
+                             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+                            cwd=Path(__file__).parent.parent, env=env)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or proc.poll() is not None:
+                proc.kill()
+                raise RuntimeError("orchestrator failed to start")
+            time.sleep(0.1)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=1000,
+                    help="concurrent chat turns per transport")
+    ap.add_argument("--ws-connections", type=int, default=8,
+                    help="WebSocket connections the turns are spread over")
+    ap.add_argument("--tokens", type=int, default=64, help="tokens per stub response")
+    ap.add_argument("--token-rate", type=float, default=100.0,
+                    help="stub tokens/sec per stream (0 = unthrottled)")
+    ap.add_argument("--latency", type=float, default=0.05, help="stub first-token latency (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    stub, stub_base = serve_in_thread(create_app(args.tokens, args.token_rate, args.latency, 0.0,
+                                                 args.seed))
+    transports: Dict[str, Any] = {}
+    try:
+        # A fresh server per transport so neither inherits the other's heap or pools.
+        for name in ("sse", "ws", "ws_binary"):
+            proc, base = _start_server(stub_base, args.sessions)
+            try:
+                if name == "sse":
+                    transports[name] = asyncio.run(_sse(base, args.sessions, proc.pid))
+                else:
+                    transports[name] = asyncio.run(_ws(base, args.sessions, args.ws_connections,
+                                                       name == "ws_binary", proc.pid))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+    finally:
+        stub.should_exit = True
+    for name, row in transports.items():
+        keys = ("client_connections", "errors", "throughput_tok_per_s", "server_rss_delta_mb",
+                "server_sockets_peak")
+        print(name, {k: row[k] for k in keys}, "ttft", row["ttft_ms"])
+    write_results("ws", {
+        "stub": {"tokens": args.tokens, "token_rate": args.token_rate, "latency_s": args.latency,
+                 "seed": args.seed},
+        "sessions": args.sessions,
+        "transports": transports,
+    })
+
+
+if __name__ == "__main__":
+    main()
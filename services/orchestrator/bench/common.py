@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples: Iterable[float], ps: Tuple[int, ...] = (50, 95, 99)) -> Dict[str, float]:
+    data = sorted(samples)
+    if not data:
+        return {}
+    out = {f"p{p}": data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))] for p in ps}
+    out["mean"] = statistics.fmean(data)
+    out["n"] = len(data)
+    return out
+
+
+def write_results(name: str, results: Dict[str, Any]) -> Path:
+    """Persist a benchmark run as JSON under bench/results/ and echo it."""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    doc = {
+        "benchmark": name,
+        "timestamp": stamp,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    path = RESULTS_DIR / f"{name}-{stamp}.json"
+    path.write_text(json.dumps(doc, indent=2, default=str))
+    print(json.dumps(doc, indent=2, default=str))
+    print(f"wrote {path}")
+    return path
+
+
+def serve_in_thread(app: Any, host: str = "127.0.0.1", port: int = 0) -> Tuple[Any, str]:
+    """Run an ASGI app with uvicorn on a background thread; returns (server, base_url)."""
+    import uvicorn
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("server failed to start")
+        time.sleep(0.01)
+    sock = server.servers[0].sockets[0]
+    bound_port = sock.getsockname()[1]
+    return server, f"http://{host}:{bound_port}"
@@ -0,0 +1,109 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m bench.compare bench/results/load-A.json bench/results/load-B.json
+    python -m bench.compare --latest load --threshold 10 --fail
+
+Numeric leaves are matched by path. Latency-like values (``*_ms``, ``*_s``, ``*_mb``, ``errors``)
+regress when they grow, throughput-like values (``*per_s``, ``*tok_s``, ``throughput*``) when they
+shrink. Everything else (sizes, counts) is shown but never flagged.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+from .common import RESULTS_DIR
+
+_ENV_KEYS = ("python", "machine", "cpus")
+
+
+def flatten(doc: Any, prefix: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], float]]:
+    if isinstance(doc, dict):
+        for key, value in doc.items():
+            yield from flatten(value, prefix + (str(key),))
+    elif isinstance(doc, (int, float)) and not isinstance(doc, bool):
+        yield prefix, float(doc)
+
+
+def direction(path: Tuple[str, ...]) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if informational."""
+    if path[-1] == "n":
+        return 0
+    for seg in reversed(path):
+        if seg.endswith("per_s") or seg.endswith("tok_s") or seg.startswith("throughput"):
+            return 1
+        if seg.endswith(("_ms", "_s", "_mb")) or seg == "errors":
+            return -1
+    return 0
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Tuple[list, int]:
+    old = dict(flatten(base.get("results", base)))
+    new = dict(flatten(head.get("results", head)))
+    rows = []
+    regressions = 0
+    for path in sorted(old.keys() & new.keys()):
+        a, b = old[path], new[path]
+        change = (b - a) / abs(a) * 100 if a else (0.0 if b == a else float("inf"))
+        sign = direction(path)
+        status = ""
+        if sign and abs(change) >= threshold:
+            worse = change > 0 if sign < 0 else change < 0
+            status = "REGRESSION" if worse else "improved"
+            regressions += worse
+        rows.append((".".join(path), a, b, change, status))
+    for path in sorted(old.keys() ^ new.keys()):
+        side = "base" if path in old else "head"
+        rows.append((".".join(path), old.get(path), new.get(path), None, "only in " + side))
+    return rows, regressions
+
+
+def latest(name: str) -> Tuple[Path, Path]:
+    runs = sorted(RESULTS_DIR.glob(f"{name}-*.json"))
+    if len(runs) < 2:
+        raise SystemExit(f"need two '{name}' runs in {RESULTS_DIR}, found {len(runs)}")
+    return runs[-2], runs[-1]
+
+
+def _fmt(value: float | None) -> str:
+    return "-" if value is None else f"{value:.4g}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="*", help="base.json head.json")
+    ap.add_argument("--latest", metavar="NAME",
+                    help="compare the two newest results for a benchmark")
+    ap.add_argument("--threshold", type=float, default=10.0, help="percent change that counts")
+    ap.add_argument("--all", action="store_true", help="also print unchanged rows")
+    ap.add_argument("--fail", action="store_true", help="exit 1 when anything regressed")
+    args = ap.parse_args()
+    if args.latest:
+        base_path, head_path = latest(args.latest)
+    elif len(args.files) == 2:
+        base_path, head_path = map(Path, args.files)
+    else:
+        ap.error("pass two result files or --latest NAME")
+    base, head = (json.loads(p.read_text()) for p in (base_path, head_path))
+    print(f"base {base_path.name}\nhead {head_path.name}")
+    for key in _ENV_KEYS:
+        if base.get(key) != head.get(key):
+            print(f"warning: {key} differs ({base.get(key)} vs {head.get(key)}); "
+                  "numbers may not be comparable")
+    rows, regressions = compare(base, head, args.threshold)
+    width = max((len(r[0]) for r in rows), default=10)
+    for path, a, b, change, status in rows:
+        if status or args.all:
+            pct = "" if change is None else f"{change:+.1f}%"
+            print(f"{path:<{width}}  {_fmt(a):>10}  {_fmt(b):>10}  {pct:>8}  {status}")
+    print(f"{regressions} regression(s) beyond {args.threshold:g}%")
+    if args.fail and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
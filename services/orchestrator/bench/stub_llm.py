@@ -0,0 +1,88 @@
+"""OpenAI-compatible streaming stub server for offline benchmarks.
+
+Point the orchestrator at it with ``OPENAI_API_BASE=http://127.0.0.1:<port>/v1``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import TYPE_CHECKING
+
+import orjson
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+
+
+def create_app(
+    tokens: int = 32,
+    token_rate: float = 0.0,
+    first_token_latency: float = 0.0,
+    jitter: float = 0.0,
+    seed: int = 0,
+) -> Starlette:
+    """``token_rate`` is tokens/second (0 = as fast as possible). ``jitter`` scales every delay by a
+    uniform factor in [1 - jitter, 1 + jitter] drawn from a seeded RNG, so runs are repeatable.
+    A request's ``max_tokens`` caps the number of tokens streamed."""
+    interval = 1.0 / token_rate if token_rate > 0 else 0.0
+    rng = random.Random(seed)
+
+    def delay(base: float) -> float:
+        return base * rng.uniform(1 - jitter, 1 + jitter) if jitter else base
+
+    async def chat_completions(request: Request) -> StreamingResponse:
+        body = await request.json()
+        model = body.get("model", "stub")
+        count = min(tokens, body.get("max_tokens") or tokens)
+        created = int(time.time())
+
+        def chunk(delta: dict, finish: str | None = None) -> bytes:
+            payload = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+        async def gen():
+            if first_token_latency:
+                await asyncio.sleep(delay(first_token_latency))
+            yield chunk({"role": "assistant", "content": ""})
+            for i in range(count):
+                yield chunk({"content": f"tok{i} "})
+                if interval:
+                    await asyncio.sleep(delay(interval))
+            yield chunk({}, finish="stop")
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(gen(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+
+def main() -> None:
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--tokens", type=int, default=32)
+    ap.add_argument("--token-rate", type=float, default=0.0)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds before the first token")
+    ap.add_argument("--jitter", type=float, default=0.0,
+                    help="relative +/- spread applied to every delay")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    app = create_app(args.tokens, args.token_rate, args.latency, args.jitter, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
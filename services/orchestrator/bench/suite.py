@@ -0,0 +1,81 @@
+"""Run the regression suite (load test + hot-path micro-benchmarks) and merge the results.
+
+    python -m bench.suite            # full sizes
+    python -m bench.suite --quick    # small sizes, about a minute
+    python -m bench.compare --latest suite --fail
+
+Each benchmark runs in its own interpreter so imports, env and caches do not leak between them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from .common import write_results
+
+SUITE: Dict[str, Dict[str, List[str]]] = {
+    "load": {
+        "full": ["--sessions", "1", "10", "100", "--turns", "5", "--tokens", "64",
+                 "--token-rate", "200", "--latency", "0.05"],
+        "quick": ["--sessions", "1", "10", "--turns", "3", "--tokens", "32",
+                  "--token-rate", "400", "--latency", "0.02"],
+    },
+    "patch": {
+        "full": ["--lines", "100000", "200000", "--hunks", "2000"],
+        "quick": ["--lines", "20000", "--hunks", "400"],
+    },
+    "lexical_search": {
+        "full": ["--rows", "10000", "100000", "--queries", "200"],
+        "quick": ["--rows", "5000", "--queries", "100"],
+    },
+    "retrieval": {
+        "full": ["--rows", "10000", "100000", "--queries", "100", "--embed-latency", "0.02"],
+        "quick": ["--rows", "10000", "--queries", "50", "--embed-latency", "0.02"],
+    },
+    "embeddings": {
+        "full": ["--chunks", "20000", "--duplicates", "0.3", "--latency", "0.05",
+                 "--naive-limit", "400"],
+        "quick": ["--chunks", "2000", "--duplicates", "0.3", "--latency", "0.02",
+                  "--naive-limit", "100"],
+    },
+    "graph": {
+        "full": ["--edges", "100000", "1000000", "--hops", "3", "--queries", "200",
+                 "--naive-limit", "50"],
+        "quick": ["--edges", "100000", "--hops", "3", "--queries", "100", "--naive-limit", "20"],
+    },
+    "git_status": {
+        "full": ["--files", "50000", "--modified", "500", "--untracked", "1000"],
+        "quick": ["--files", "5000", "--modified", "50", "--untracked", "100", "--repeat", "3"],
+    },
+}
+
+
+def _run(name: str, argv: List[str]) -> dict:
+    proc = subprocess.run([sys.executable, "-m", f"bench.bench_{name}", *argv],
+                          cwd=Path(__file__).parent.parent, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or [f"exit {proc.returncode}"]}
+    wrote = [line for line in proc.stdout.splitlines() if line.startswith("wrote ")]
+    doc = json.loads(Path(wrote[-1][len("wrote "):]).read_text())
+    return {"args": argv, **doc["results"]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true")
+    ap.add_argument("--only", nargs="+", choices=sorted(SUITE))
+    args = ap.parse_args()
+    profile = "quick" if args.quick else "full"
+    results = {"profile": profile}
+    for name in args.only or SUITE:
+        print(f"== {name}", flush=True)
+        results[name] = _run(name, SUITE[name][profile])
+    write_results("suite_quick" if args.quick else "suite", results)
+
+
+if __name__ == "__main__":
+    main()
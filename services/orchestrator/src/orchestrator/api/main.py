@@ -1,41 +1,116 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any
+
+import asyncio
 import base64
-import json
-from ..core.chat import chat_stream
-from ..speech.base import speech_registry  # ensure providers imported
-from ..speech import openai_speech  # noqa: F401 - register provider
-from ..tools.base import tool_registry
-import time
 import logging
+import sys
+import time
+import uuid
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List
 
-logger = logging.getLogger("orchestrator")
-logging.basicConfig(level=logging.INFO)
+from fastapi import FastAPI, File, Form, Header, HTTPException, Request, UploadFile, WebSocket
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from .. import IMPORT_STARTED
 from ..config import settings
+from ..core import metrics
+from ..core.chat import chat_turn
+from ..core.http_pool import http_pool
+from ..core.logs import configure_logging, request_id
+from ..core.plugins import rss_mb
+from ..core.streams import EventStream, Numbered, event_id, parse_event_id, stream_registry
+from ..embeddings.base import embedding_registry
+from ..memory.indexer import IndexJob, repo_indexer
+from ..memory.writer import db_writer
+from ..providers.admission import admission
+from ..providers.base import provider_registry
+from ..providers.cache import response_cache
+from ..providers.router import model_router
+from ..speech.base import SpeechProvider, speech_registry
+from ..speech.cache import AUDIO_MEDIA_TYPES, audio_cache, synthesize_cached
+from ..tools.base import tool_registry
+from ..tools.cache import tool_cache
+from ..tools.process import process_scheduler
+from .sse import coalesce_tokens, encode_event
+from .ws import WSMultiplexer, ws_stats
+
+logger = logging.getLogger("orchestrator")
+configure_logging(settings.log_level, settings.log_format)
+# Tools and providers are imported on first use (see manifest.py); startup cost is reported here.
+startup: Dict[str, Any] = {"import_ms": round((time.perf_counter() - IMPORT_STARTED) * 1000, 2)}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    from ..providers.openai_provider import OPENAI_API_BASE
 
-app = FastAPI(title="Orchestrator Service")
+    # The app owns the shared upstream client pool: warm it on startup, close it on shutdown.
+    http_pool.open(OPENAI_API_BASE)
+    if settings.enable_memory:
+        db_writer.start()
+    if settings.plugins_preload:
+        for registry in (tool_registry, provider_registry, speech_registry, embedding_registry):
+            registry.load_all()
+    startup.update(ready_ms=round((time.perf_counter() - IMPORT_STARTED) * 1000, 2),
+                   rss_mb=round(rss_mb(), 1), modules=len(sys.modules),
+                   preloaded=settings.plugins_preload)
+    logger.info("startup", extra=startup)
+    try:
+        yield
+    finally:
+        await repo_indexer.shutdown()
+        await stream_registry.shutdown()
+        await http_pool.aclose()
+        # Drains and commits every queued row before the process exits.
+        await db_writer.shutdown()
+
+
+app = FastAPI(title="Orchestrator Service", lifespan=lifespan)
 
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start = time.time()
-    response = None
+async def log_requests(request: Request,
+                       call_next: Callable[[Request], Awaitable[StreamingResponse]]
+                       ) -> StreamingResponse:
+    # perf_counter for durations; the request id is echoed back and tags every log line of the
+    # request.
+    rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id.set(rid)
+    start = time.perf_counter()
     try:
         response = await call_next(request)
-        return response
+    except Exception:
+        logger.exception("request", extra={"path": request.url.path, "method": request.method,
+                                           "status": 500,
+                                           "ms": round((time.perf_counter() - start) * 1000, 2)})
+        raise
     finally:
-        duration = (time.time() - start) * 1000
-        logger.info(
-            "request",
-            extra={
+        request_id.reset(token)
+    ttfb = time.perf_counter() - start
+    # The route template, not the raw path, so labels stay bounded.
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.HTTP_REQUEST.labels(request.method, route, str(response.status_code)).observe(ttfb)
+    response.headers["X-Request-ID"] = rid
+    body = response.body_iterator
+
+    async def timed_body() -> AsyncIterator[str | bytes | memoryview]:
+        # Streaming responses (SSE, audio) finish long after the headers; log once the body is done.
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            logger.info("request", extra={
+                "request_id": rid,
                 "path": request.url.path,
                 "method": request.method,
-                "status": getattr(response, 'status_code', 'NA'),
-                "ms": round(duration, 2),
-            },
-        )
+                "status": response.status_code,
+                "ttfb_ms": round(ttfb * 1000, 2),
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+            })
+
+    response.body_iterator = timed_body()
+    return response
 
 class ChatRequest(BaseModel):
     message: str
@@ -43,28 +118,220 @@ class ChatRequest(BaseModel):
     model: str | None = None
     provider: str | None = None
     tool_calls: List[Dict[str, Any]] | None = None  # [{name: str, params: {...}}]
+    coalesce_ms: float | None = None  # override SSE_COALESCE_MS; 0 = one frame per token
+    cache: bool | None = None  # override RESPONSE_CACHE_ENABLED for this turn
+    model_class: str | None = None  # route across MODEL_CLASSES targets instead of `provider`
+    hedge: bool | None = None  # override ROUTER_HEDGE_ENABLED
+
+def _sse_stream(stream_id: str, events: AsyncGenerator[Numbered, None]) -> StreamingResponse:
+    # Every frame carries "<stream>:<seq>" as its id; disconnecting only stops this follower.
+    async def event_source() -> AsyncIterator[bytes]:
+        async with aclosing(events):
+            async for seq, evt in events:
+                yield encode_event(evt, event_id(stream_id, seq))
+
+    return StreamingResponse(event_source(), media_type="text/event-stream",
+                             headers={"X-Stream-ID": stream_id})
+
+
+async def _resume(stream_id: str, after: int) -> StreamingResponse:
+    try:
+        return _sse_stream(stream_id, await stream_registry.open(stream_id, after))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown or expired stream")
+
+
+def _start_chat(req: ChatRequest) -> EventStream:
+    """Start a turn as a detached stream (shared by SSE and WebSocket clients)."""
+    try:
+        session_id = int(req.session_id) if req.session_id is not None else None
+    except ValueError:
+        raise ValueError("session_id must be an integer")
+    if req.model_class is not None and req.model_class not in settings.model_classes:
+        raise ValueError(f"unknown model_class: {req.model_class}")
+    window = settings.sse_coalesce_ms if req.coalesce_ms is None else req.coalesce_ms
+    events = chat_turn(req.message, session_id, model=req.model, provider=req.provider or "openai",
+                       tool_calls=req.tool_calls, cache=req.cache, model_class=req.model_class,
+                       hedge=req.hedge)
+    return stream_registry.start(coalesce_tokens(events, window, settings.sse_coalesce_bytes))
+
 
 @app.post("/chat/stream")
-async def chat_stream_endpoint(req: ChatRequest):
-    msgs = [{"role": "user", "content": req.message}]
+async def chat_stream_endpoint(
+        req: ChatRequest, last_event_id: str | None = Header(default=None)) -> StreamingResponse:
+    resume = parse_event_id(last_event_id)
+    if resume is not None:
+        # Reconnect: replay what was missed and attach to the live tail; nothing is re-run.
+        return await _resume(*resume)
+    try:
+        stream = _start_chat(req)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _sse_stream(stream.id, stream.follow())
 
-    async def event_source():
-        try:
-            async for evt in chat_stream(msgs, model=req.model, provider=req.provider or "openai", tool_calls=req.tool_calls):
-                yield f"data: {json.dumps(evt)}\n\n"
-        except Exception as e:  # noqa: BLE001
-            err = {"type": "error", "error": str(e)}
-            yield f"data: {json.dumps(err)}\n\n"
 
-    return StreamingResponse(event_source(), media_type="text/event-stream")
+@app.websocket("/ws")
+async def chat_ws(websocket: WebSocket, binary: bool = False) -> None:
+    """Many concurrent turns over one connection; protocol in api/ws.py."""
+    await WSMultiplexer(websocket, lambda msg: _start_chat(ChatRequest.model_validate(msg)),
+                        binary=binary).run()
+
+
+@app.get("/chat/stream/{stream_id}")
+async def chat_stream_resume(stream_id: str, after: int = -1,
+                             last_event_id: str | None = Header(default=None)
+                             ) -> StreamingResponse:
+    """SSE: events of a stream after ``after`` (or the Last-Event-ID header), then the live tail."""
+    resume = parse_event_id(last_event_id)
+    if resume is not None and resume[0] == stream_id:
+        after = resume[1]
+    return await _resume(stream_id, after)
+
+
+@app.get("/chat/streams")
+async def chat_stream_stats() -> Dict[str, Any]:
+    return {**stream_registry.stats(), "websocket": ws_stats}
 
 @app.get("/healthz")
-async def healthz():
+async def healthz() -> Dict[str, Any]:
     return {"status": "ok", "allowed_tools": settings.allowed_tools}
 
+@app.get("/metrics")
+async def prometheus_metrics() -> Response:
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    payload, content_type = metrics.render()
+    return Response(payload, media_type=content_type)
+
 @app.get("/tools")
-async def list_tools():
-    return {"tools": tool_registry.list()}
+async def list_tools() -> Dict[str, Any]:
+    return {"tools": tool_registry.list(), "specs": tool_registry.describe()}
+
+@app.get("/plugins")
+async def list_plugins() -> Dict[str, Any]:
+    """Declared tools/providers (loaded or not) with per-plugin import time, plus startup cost."""
+    return {
+        "startup": startup,
+        "tools": tool_registry.describe(),
+        "providers": provider_registry.describe(),
+        "speech": speech_registry.describe(),
+        "embeddings": embedding_registry.describe(),
+    }
+
+@app.get("/tools/cache")
+async def tool_cache_stats() -> Dict[str, Any]:
+    return tool_cache.stats()
+
+
+@app.get("/providers/cache")
+async def response_cache_stats() -> Dict[str, Any]:
+    return response_cache.stats()
+
+
+@app.get("/providers/admission")
+async def provider_admission_stats() -> Dict[str, Any]:
+    return admission.stats()
+
+
+@app.get("/providers/routes")
+async def provider_route_stats() -> Dict[str, Any]:
+    return model_router.stats_snapshot()
+
+
+@app.get("/tools/processes")
+async def tool_process_stats() -> Dict[str, Any]:
+    return process_scheduler.stats()
+
+
+class IndexBody(BaseModel):
+    path: str | None = None  # relative to ALLOW_FS_BASE; default: the whole base
+
+
+@app.post("/memory/index")
+async def start_index(body: IndexBody) -> Dict[str, Any]:
+    """Start (or join) a background indexing job for a directory."""
+    if not settings.enable_memory:
+        raise HTTPException(status_code=400, detail="Memory disabled")
+    try:
+        return repo_indexer.start(body.path).as_dict()
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+def _index_job(job_id: str) -> IndexJob:
+    try:
+        return repo_indexer.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown index job")
+
+
+@app.get("/memory/index/{job_id}")
+async def index_status(job_id: str) -> Dict[str, Any]:
+    return _index_job(job_id).as_dict()
+
+
+@app.get("/memory/index/{job_id}/events")
+async def index_events(job_id: str, after: int = 0,
+                       last_event_id: str | None = Header(default=None)) -> StreamingResponse:
+    """SSE: past progress events from ``after`` (or past Last-Event-ID), then live ones until the
+    job ends."""
+    job = _index_job(job_id)
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id) + 1
+
+    async def event_source() -> AsyncIterator[bytes]:
+        async for evt in job.follow(after):
+            yield encode_event(evt, str(evt["seq"]))
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
+
+class EmbedBody(BaseModel):
+    limit: int | None = None
+
+
+@app.post("/memory/embed")
+async def embed_pending(body: EmbedBody) -> Dict[str, Any]:
+    """Embed VectorChunk rows that have no embedding yet (batched, deduplicated, cached)."""
+    if not settings.enable_memory:
+        raise HTTPException(status_code=400, detail="Memory disabled")
+    # Imported here so numpy only loads once embeddings are used.
+    from ..embeddings.pipeline import embedding_pipeline
+
+    return await embedding_pipeline.embed_pending(limit=body.limit)
+
+
+@app.get("/memory/embeddings")
+async def embedding_stats() -> Dict[str, Any]:
+    from ..embeddings.pipeline import embedding_pipeline
+
+    return embedding_pipeline.stats()
+
+
+class GraphEdgesBody(BaseModel):
+    edges: List[Dict[str, Any]]  # [{src_id, dst_id, relation}]
+
+
+@app.post("/memory/graph/edges")
+async def add_graph_edges(body: GraphEdgesBody) -> Dict[str, Any]:
+    """Insert GraphEdge rows; the in-memory graph picks them up incrementally on its next query."""
+    if not settings.enable_memory:
+        raise HTTPException(status_code=400, detail="Memory disabled")
+    from ..memory import store
+
+    try:
+        edges = [(int(e["src_id"]), int(e["dst_id"]), str(e["relation"])) for e in body.edges]
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400,
+                            detail="Each edge needs integer src_id, dst_id and a relation")
+    return {"added": await asyncio.to_thread(store.add_graph_edges, edges)}
+
+
+@app.get("/memory/graph")
+async def graph_stats() -> Dict[str, Any]:
+    from ..memory.graph import graph_index
+
+    return graph_index.stats()
 
 
 class TranscribeBody(BaseModel):
@@ -74,12 +341,64 @@ class TranscribeBody(BaseModel):
 
 
 @app.post("/speech/transcribe")
-async def transcribe_audio(body: TranscribeBody):
+async def transcribe_audio(body: TranscribeBody) -> Dict[str, Any]:
     if not settings.enable_speech:
         raise HTTPException(status_code=400, detail="Speech disabled")
     audio_bytes = base64.b64decode(body.audio_base64)
     prov = speech_registry.get(body.provider or "openai")
-    return await prov.transcribe(audio_bytes, language=body.language)
+    with metrics.observe_speech(prov.name, "transcribe"):
+        return await prov.transcribe(audio_bytes, language=body.language)
+
+
+async def _capped(chunks: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > limit:
+            raise HTTPException(status_code=413, detail="Audio upload too large")
+        yield chunk
+
+
+async def _upload_chunks(upload: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        data = await upload.read(64 * 1024)
+        if not data:
+            return
+        yield data
+
+
+async def _final_transcript(prov: SpeechProvider, chunks: AsyncIterator[bytes],
+                            language: str | None) -> Dict[str, Any] | None:
+    result = None
+    with metrics.observe_speech(prov.name, "transcribe"):
+        capped = _capped(chunks, settings.speech_upload_max_bytes)
+        async for evt in prov.transcribe_stream(capped, language=language):
+            if evt.get("type") == "final":
+                result = {k: v for k, v in evt.items() if k != "type"}
+    return result
+
+
+@app.post("/speech/transcribe/upload")
+async def transcribe_upload(
+    file: UploadFile = File(...),
+    provider: str | None = Form(default=None),
+    language: str | None = Form(default=None),
+) -> Dict[str, Any] | None:
+    """Multipart upload; the file is spooled by the server and fed to the provider in chunks."""
+    if not settings.enable_speech:
+        raise HTTPException(status_code=400, detail="Speech disabled")
+    prov = speech_registry.get(provider or "openai")
+    return await _final_transcript(prov, _upload_chunks(file), language)
+
+
+@app.post("/speech/transcribe/stream")
+async def transcribe_stream(request: Request, provider: str | None = None,
+                            language: str | None = None) -> Dict[str, Any] | None:
+    """Raw (optionally chunked) audio body, consumed as it arrives."""
+    if not settings.enable_speech:
+        raise HTTPException(status_code=400, detail="Speech disabled")
+    prov = speech_registry.get(provider or "openai")
+    return await _final_transcript(prov, request.stream(), language)
 
 
 class SynthesizeBody(BaseModel):
@@ -89,9 +408,39 @@ class SynthesizeBody(BaseModel):
     format: str | None = None
 
 
+def _audio_format(body: SynthesizeBody) -> str:
+    fmt = body.format or "mp3"
+    if fmt not in AUDIO_MEDIA_TYPES:
+        expected = ", ".join(sorted(AUDIO_MEDIA_TYPES))
+        raise HTTPException(status_code=400, detail=f"Unsupported format: expected {expected}")
+    return fmt
+
+
 @app.post("/speech/tts")
-async def synthesize_text(body: SynthesizeBody):
+async def synthesize_text(body: SynthesizeBody) -> Dict[str, Any]:
+    if not settings.enable_speech:
+        raise HTTPException(status_code=400, detail="Speech disabled")
+    prov = speech_registry.get(body.provider or "openai")
+    fmt = _audio_format(body)
+    hit, chunks = await synthesize_cached(prov, body.text, voice=body.voice, format=fmt)
+    audio = b"".join([c async for c in chunks])
+    return {"audio_base64": base64.b64encode(audio).decode(),
+            "voice": body.voice or settings.tts_voice, "format": fmt, "provider": prov.name,
+            "chars": len(body.text), "cached": hit}
+
+
+@app.post("/speech/tts/stream")
+async def synthesize_stream(body: SynthesizeBody) -> StreamingResponse:
+    """Raw audio with chunked transfer encoding; cache hits are streamed from disk."""
     if not settings.enable_speech:
         raise HTTPException(status_code=400, detail="Speech disabled")
     prov = speech_registry.get(body.provider or "openai")
-    return await prov.synthesize(body.text, voice=body.voice, format=body.format or "mp3")
+    fmt = _audio_format(body)
+    hit, chunks = await synthesize_cached(prov, body.text, voice=body.voice, format=fmt)
+    return StreamingResponse(chunks, media_type=AUDIO_MEDIA_TYPES[fmt],
+                             headers={"X-Cache": "hit" if hit else "miss"})
+
+
+@app.get("/speech/cache")
+async def speech_cache_stats() -> Dict[str, Any]:
+    return audio_cache.stats()
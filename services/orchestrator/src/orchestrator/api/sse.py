@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict
+
+import orjson
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _is_plain_token(evt: Dict[str, Any]) -> bool:
+    # Only bare {"type": "token", "token": str} events are safe to merge.
+    return evt.get("type") == "token" and len(evt) == 2 and isinstance(evt.get("token"), str)
+
+
+def encode_event(evt: Dict[str, Any], event_id: str | None = None) -> bytes:
+    """Serialise one event as an SSE ``data:`` frame, with an ``id:`` line when given one."""
+    if event_id is None:
+        return b"data: " + orjson.dumps(evt) + b"\n\n"
+    return b"id: " + event_id.encode() + b"\ndata: " + orjson.dumps(evt) + b"\n\n"
+
+
+async def coalesce_tokens(
+    events: AsyncIterator[Dict[str, Any]], window_ms: float, max_bytes: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Merge consecutive ``token`` events into larger ones.
+
+    The first token is passed through immediately so time-to-first-token is unchanged;
+    later tokens are buffered until ``window_ms`` has elapsed since the first buffered
+    token, ``max_bytes`` of text is pending, or a non-token event arrives.
+    """
+    if window_ms <= 0:
+        async for evt in events:
+            yield evt
+        return
+
+    queue: asyncio.Queue[Any] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for evt in events:
+                await queue.put(evt)
+        except Exception as e:  # noqa: BLE001 - re-raised on the consumer side
+            await queue.put(_Failure(e))
+        finally:
+            await queue.put(_DONE)
+
+    task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+    window = window_ms / 1000
+    buf: list[str] = []
+    size = 0
+    deadline = 0.0
+    first = True
+    try:
+        while True:
+            if buf:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout <= 0:
+                        raise asyncio.TimeoutError
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield {"type": "token", "token": "".join(buf)}
+                    buf, size = [], 0
+                    continue
+            else:
+                item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                if buf:
+                    yield {"type": "token", "token": "".join(buf)}
+                    buf, size = [], 0
+                raise item.exc
+            if _is_plain_token(item):
+                if first:
+                    first = False
+                    yield item
+                    continue
+                if not buf:
+                    deadline = loop.time() + window
+                buf.append(item["token"])
+                size += len(item["token"])
+                if size >= max_bytes:
+                    yield {"type": "token", "token": "".join(buf)}
+                    buf, size = [], 0
+                continue
+            if buf:
+                yield {"type": "token", "token": "".join(buf)}
+                buf, size = [], 0
+            yield item
+        if buf:
+            yield {"type": "token", "token": "".join(buf)}
+    finally:
+        task.cancel()
@@ -0,0 +1,177 @@
+"""WebSocket transport: many concurrent chat turns over one connection.
+
+Client -> server (JSON, text or binary frames)::
+
+    {"op": "chat", "id": "a1", "message": "...", ...}       # same fields as POST /chat/stream
+    {"op": "resume", "id": "a1", "stream": "<stream id>", "after": 41}
+    {"op": "cancel", "id": "a1"}                    # stops the generation, not just delivery
+    {"op": "ping"}
+
+Server -> client::
+
+    {"id": "a1", "op": "opened", "stream": "<stream id>"}
+    {"id": "a1", "seq": 0, "event": {"type": "token", ...}}  # the SSE events, numbered like SSE ids
+    {"id": "a1", "op": "closed"}
+    {"id": "a1", "op": "error", "error": "..."}
+    {"op": "pong"}
+
+Turns run on the same detached streams as /chat/stream (core/streams.py), so a dropped socket
+loses no work: ``resume`` on a new connection (or SSE with Last-Event-ID) picks the stream up
+again. One bounded send queue per connection provides backpressure. A slow reader stalls its
+forwarders, not the generations, which fall back on the replay buffer. With ``?binary=1`` the
+server sends binary messages that batch every queued frame as ``<u32 big-endian length><orjson
+frame>`` records.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Callable, Dict, List
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from ..config import settings
+from ..core.streams import EventStream, Numbered, stream_registry
+
+logger = logging.getLogger("orchestrator.ws")
+
+_LEN = struct.Struct("!I")
+
+ws_stats: Dict[str, int] = {"connections": 0, "active": 0, "turns": 0, "resumes": 0, "cancels": 0,
+                            "messages_sent": 0, "frames_sent": 0}
+
+
+def pack_frames(frames: List[Dict[str, Any]]) -> bytes:
+    parts = []
+    for frame in frames:
+        payload = orjson.dumps(frame)
+        parts.append(_LEN.pack(len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def unpack_frames(data: bytes) -> List[Dict[str, Any]]:
+    frames, offset = [], 0
+    while offset < len(data):
+        (size,) = _LEN.unpack_from(data, offset)
+        offset += _LEN.size
+        frames.append(orjson.loads(data[offset:offset + size]))
+        offset += size
+    return frames
+
+
+class WSMultiplexer:
+    def __init__(self, websocket: WebSocket, start_chat: Callable[[Dict[str, Any]], EventStream],
+                 binary: bool = False):
+        self.ws = websocket
+        self.start_chat = start_chat
+        self.binary = binary
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(
+            maxsize=max(1, settings.ws_send_queue))
+        self.turns: Dict[str, asyncio.Task[Any]] = {}
+        self.streams: Dict[str, str] = {}  # client id -> stream id
+
+    async def run(self) -> None:
+        await self.ws.accept()
+        ws_stats["connections"] += 1
+        ws_stats["active"] += 1
+        writer = asyncio.create_task(self._writer())
+        try:
+            while True:
+                message = await self.ws.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                raw = message.get("bytes") or message.get("text") or b"{}"
+                try:
+                    msg = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    await self._send({"op": "error", "error": "invalid JSON"})
+                    continue
+                msg = msg if isinstance(msg, dict) else {}
+                try:
+                    await self._handle(msg)
+                except Exception as e:
+                    # One bad frame fails its own id, never the connection or its other turns.
+                    logger.exception("ws_frame_failed", extra={"op": msg.get("op")})
+                    await self._send({"id": str(msg.get("id", "")), "op": "error",
+                                      "error": type(e).__name__})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            ws_stats["active"] -= 1
+            # Forwarders stop; the generations keep running detached and stay resumable.
+            tasks = [*self.turns.values(), writer]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, msg: Dict[str, Any]) -> None:
+        op, cid = msg.get("op"), str(msg.get("id", ""))
+        if op == "ping":
+            await self._send({"op": "pong"})
+        elif op in ("chat", "resume"):
+            if not cid or cid in self.turns:
+                await self._send({"id": cid, "op": "error", "error": "missing or duplicate id"})
+                return
+            if len(self.turns) >= settings.ws_max_streams:
+                await self._send({"id": cid, "op": "error", "error": "too many concurrent streams"})
+                return
+            try:
+                if op == "chat":
+                    stream = self.start_chat(msg)
+                    stream_id, events = stream.id, stream.follow()
+                    ws_stats["turns"] += 1
+                else:
+                    stream_id = str(msg.get("stream", ""))
+                    events = await stream_registry.open(stream_id, int(msg.get("after", -1)))
+                    ws_stats["resumes"] += 1
+            except KeyError:
+                await self._send({"id": cid, "op": "error", "error": "unknown or expired stream"})
+                return
+            except (TypeError, ValueError) as e:  # includes pydantic ValidationError
+                await self._send({"id": cid, "op": "error", "error": str(e)})
+                return
+            self.streams[cid] = stream_id
+            await self._send({"id": cid, "op": "opened", "stream": stream_id})
+            self.turns[cid] = asyncio.create_task(self._forward(cid, events))
+        elif op == "cancel":
+            live = stream_registry.streams.get(self.streams.get(cid, ""))
+            if live is None or cid not in self.turns:
+                await self._send({"id": cid, "op": "error", "error": "unknown id"})
+                return
+            ws_stats["cancels"] += 1
+            if live.task is not None:
+                # The forwarder delivers the final "cancelled" error, then "closed".
+                live.task.cancel()
+        else:
+            await self._send({"id": cid, "op": "error", "error": f"unknown op {op!r}"})
+
+    async def _forward(self, cid: str, events: AsyncGenerator[Numbered, None]) -> None:
+        try:
+            async with aclosing(events):
+                async for seq, evt in events:
+                    await self.queue.put({"id": cid, "seq": seq, "event": evt})
+            await self.queue.put({"id": cid, "op": "closed"})
+        finally:
+            self.turns.pop(cid, None)
+            self.streams.pop(cid, None)
+
+    async def _send(self, frame: Dict[str, Any]) -> None:
+        await self.queue.put(frame)
+
+    async def _writer(self) -> None:
+        while True:
+            frame = await self.queue.get()
+            if self.binary:
+                frames = [frame]
+                while len(frames) < settings.ws_batch_frames and not self.queue.empty():
+                    frames.append(self.queue.get_nowait())
+                await self.ws.send_bytes(pack_frames(frames))
+                ws_stats["frames_sent"] += len(frames)
+            else:
+                await self.ws.send_text(orjson.dumps(frame).decode())
+                ws_stats["frames_sent"] += 1
+            ws_stats["messages_sent"] += 1
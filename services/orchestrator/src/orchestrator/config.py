@@ -1,7 +1,10 @@
 from __future__ import annotations
-from pydantic_settings import BaseSettings
+
+from typing import Dict, List
+
 from pydantic import Field
-from typing import List
+from pydantic_settings import BaseSettings
+
 
 class Settings(BaseSettings):
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
@@ -14,10 +17,149 @@ class Settings(BaseSettings):
     database_url: str | None = Field(default=None, alias="DATABASE_URL")
     speech_model: str = Field(default="whisper-1", alias="SPEECH_MODEL")
     tts_voice: str = Field(default="alloy", alias="TTS_VOICE")
+    # Synthesised audio cache (content-addressed files, LRU bounded by total size)
+    speech_cache_enabled: bool = Field(default=True, alias="SPEECH_CACHE_ENABLED")
+    speech_cache_dir: str = Field(default="./data/tts_cache", alias="SPEECH_CACHE_DIR")
+    speech_cache_max_bytes: int = Field(default=256 * 1024 * 1024, alias="SPEECH_CACHE_MAX_BYTES")
+    speech_upload_max_bytes: int = Field(default=25 * 1024 * 1024, alias="SPEECH_UPLOAD_MAX_BYTES")
     embedding_model: str = Field(default="text-embedding-3-small", alias="EMBEDDING_MODEL")
+    # Embedding pipeline: batched by count and estimated tokens, deduplicated by content hash and
+    # cached on disk per (provider, model, dimensions)
+    embedding_provider: str = Field(default="openai", alias="EMBEDDING_PROVIDER")
+    embedding_dimensions: int = Field(default=0, alias="EMBEDDING_DIMENSIONS")  # 0: model default
+    embedding_batch_size: int = Field(default=256, alias="EMBEDDING_BATCH_SIZE")
+    embedding_batch_tokens: int = Field(default=100_000, alias="EMBEDDING_BATCH_TOKENS")
+    embedding_max_input_tokens: int = Field(default=8191, alias="EMBEDDING_MAX_INPUT_TOKENS")
+    embedding_concurrency: int = Field(default=4, alias="EMBEDDING_CONCURRENCY")
+    embedding_cache_enabled: bool = Field(default=True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_path: str = Field(default="./data/embedding_cache.db",
+                                      alias="EMBEDDING_CACHE_PATH")
+    # Conversation history: hot sessions kept in-process, prompt trimmed to a token budget
+    session_cache_size: int = Field(default=256, alias="SESSION_CACHE_SIZE")
+    context_token_budget: int = Field(default=8000, alias="CONTEXT_TOKEN_BUDGET")
+    # Background DB writer: inserts are committed in batches off the event loop
+    db_writer_batch: int = Field(default=256, alias="DB_WRITER_BATCH")
+    db_writer_delay_ms: float = Field(default=20.0, alias="DB_WRITER_DELAY_MS")
+    # Provider response cache: exact match on (provider, model, messages); memory LRU + SQLite.
+    # Off by default: a hit replays one caller's sampled reply to anyone sending the same prompt.
+    response_cache_enabled: bool = Field(default=False, alias="RESPONSE_CACHE_ENABLED")
+    response_cache_ttl_s: float = Field(default=600.0, alias="RESPONSE_CACHE_TTL_S")
+    response_cache_max_entries: int = Field(default=512, alias="RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_max_bytes: int = Field(default=16 * 1024 * 1024,
+                                          alias="RESPONSE_CACHE_MAX_BYTES")
+    response_cache_path: str = Field(default="./data/response_cache.db",
+                                     alias="RESPONSE_CACHE_PATH")
+    response_cache_sqlite_max_rows: int = Field(default=10_000,
+                                                alias="RESPONSE_CACHE_SQLITE_MAX_ROWS")
+    # Model-class routing: class -> ["provider:model", ...], ranked by EWMA TTFT and error rate
+    model_classes: Dict[str, List[str]] = Field(
+        default_factory=lambda: {
+            "default": ["openai:gpt-4o-mini", "gemini:gemini-stub"],
+        },
+        alias="MODEL_CLASSES",
+    )
+    router_ewma_alpha: float = Field(default=0.2, alias="ROUTER_EWMA_ALPHA")
+    router_error_penalty: float = Field(default=4.0, alias="ROUTER_ERROR_PENALTY")
+    router_explore: float = Field(default=0.02, alias="ROUTER_EXPLORE")
+    router_hedge_enabled: bool = Field(default=True, alias="ROUTER_HEDGE_ENABLED")
+    router_hedge_percentile: float = Field(default=95.0, alias="ROUTER_HEDGE_PERCENTILE")
+    router_hedge_after_ms: float = Field(default=2000.0, alias="ROUTER_HEDGE_AFTER_MS")
+    router_hedge_min_samples: int = Field(default=20, alias="ROUTER_HEDGE_MIN_SAMPLES")
+    # Admission control for upstream LLM calls (concurrency per provider / "provider:model",
+    # requests/sec token buckets per provider, retries with jittered backoff honouring Retry-After)
+    provider_default_concurrency: int = Field(default=64, alias="PROVIDER_DEFAULT_CONCURRENCY")
+    provider_max_concurrency: Dict[str, int] = Field(default_factory=dict,
+                                                     alias="PROVIDER_MAX_CONCURRENCY")
+    model_max_concurrency: Dict[str, int] = Field(default_factory=dict,
+                                                  alias="MODEL_MAX_CONCURRENCY")
+    provider_rate_limits: Dict[str, float] = Field(default_factory=dict,
+                                                   alias="PROVIDER_RATE_LIMITS")
+    admission_max_queue: int = Field(default=1000, alias="ADMISSION_MAX_QUEUE")
+    retry_max_attempts: int = Field(default=3, alias="RETRY_MAX_ATTEMPTS")
+    retry_base_ms: float = Field(default=250.0, alias="RETRY_BASE_MS")
+    retry_max_ms: float = Field(default=8000.0, alias="RETRY_MAX_MS")
+    retry_after_cap_s: float = Field(default=30.0, alias="RETRY_AFTER_CAP_S")
+    # Logging (json = one object per line with request_id and per-stage timings) and /metrics
+    log_level: str = Field(default="info", alias="LOG_LEVEL")
+    log_format: str = Field(default="json", alias="LOG_FORMAT")
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    # Shared outbound HTTP client pool (one client per upstream origin)
+    http2: bool = Field(default=True, alias="HTTP2")
+    http_max_connections: int = Field(default=100, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive: int = Field(default=20, alias="HTTP_MAX_KEEPALIVE")
+    http_keepalive_expiry: float = Field(default=30.0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_connect_timeout: float = Field(default=10.0, alias="HTTP_CONNECT_TIMEOUT")
+    # /chat/stream coalesces token deltas into one SSE frame per window (0 disables)
+    sse_coalesce_ms: float = Field(default=15.0, alias="SSE_COALESCE_MS")
+    sse_coalesce_bytes: int = Field(default=2048, alias="SSE_COALESCE_BYTES")
+    # Resumable /chat/stream: events carry ids, generation runs detached from the connection and
+    # a per-stream ring buffer serves Last-Event-ID reconnects (optionally spilled to the DB when
+    # done)
+    sse_replay_events: int = Field(default=1024, alias="SSE_REPLAY_EVENTS")
+    sse_replay_ttl_s: float = Field(default=120.0, alias="SSE_REPLAY_TTL_S")
+    sse_replay_max_streams: int = Field(default=10_000, alias="SSE_REPLAY_MAX_STREAMS")
+    sse_detached_timeout_s: float = Field(default=300.0, alias="SSE_DETACHED_TIMEOUT_S")
+    sse_replay_spill: bool = Field(default=False, alias="SSE_REPLAY_SPILL")
+    sse_replay_spill_ttl_s: float = Field(default=86_400.0, alias="SSE_REPLAY_SPILL_TTL_S")
+    # WebSocket transport (/ws): turns multiplexed per connection behind one bounded send queue
+    ws_send_queue: int = Field(default=1024, alias="WS_SEND_QUEUE")
+    ws_max_streams: int = Field(default=256, alias="WS_MAX_STREAMS")
+    ws_batch_frames: int = Field(default=256, alias="WS_BATCH_FRAMES")
+    # Tool executor: independent tool calls run concurrently up to this limit
+    tool_max_concurrency: int = Field(default=8, alias="TOOL_MAX_CONCURRENCY")
+    tool_timeout_s: float = Field(default=60.0, alias="TOOL_TIMEOUT_S")
+    # fs.read: hard cap per call, mmap threshold, streaming cap and fs.read_many fan-out
+    fs_read_max_bytes: int = Field(default=1024 * 1024, alias="FS_READ_MAX_BYTES")
+    fs_mmap_threshold: int = Field(default=4 * 1024 * 1024, alias="FS_MMAP_THRESHOLD")
+    fs_stream_max_bytes: int = Field(default=64 * 1024 * 1024, alias="FS_STREAM_MAX_BYTES")
+    fs_read_many_concurrency: int = Field(default=16, alias="FS_READ_MANY_CONCURRENCY")
+    # terminal.exec: wall-clock timeout, combined stdout+stderr cap, process-wide subprocess limit
+    terminal_timeout_s: float = Field(default=30.0, alias="TERMINAL_TIMEOUT_S")
+    terminal_max_output_bytes: int = Field(default=1024 * 1024, alias="TERMINAL_MAX_OUTPUT_BYTES")
+    terminal_max_procs: int = Field(default=4, alias="TERMINAL_MAX_PROCS")
+    terminal_max_queued: int = Field(default=64, alias="TERMINAL_MAX_QUEUED")
+    # git.status: one porcelain v2 subprocess per call
+    git_status_timeout_s: float = Field(default=30.0, alias="GIT_STATUS_TIMEOUT_S")
+    git_status_max_bytes: int = Field(default=64 * 1024 * 1024, alias="GIT_STATUS_MAX_BYTES")
+    # fs.apply_patch: outer context lines a hunk may ignore when it doesn't match exactly
+    patch_fuzz: int = Field(default=2, alias="PATCH_FUZZ")
+    # Result cache for read-only tools (fs.read, git.status, memory.search)
+    tool_cache_enabled: bool = Field(default=True, alias="TOOL_CACHE_ENABLED")
+    tool_cache_max_entries: int = Field(default=1024, alias="TOOL_CACHE_MAX_ENTRIES")
+    tool_cache_max_bytes: int = Field(default=32 * 1024 * 1024, alias="TOOL_CACHE_MAX_BYTES")
+    # Vector index (memory-mapped, built from VectorChunk embeddings)
+    vector_index_dir: str = Field(default="./data/vector_index", alias="VECTOR_INDEX_DIR")
+    vector_ivf_threshold: int = Field(default=50_000, alias="VECTOR_IVF_THRESHOLD")
+    vector_ivf_nprobe: int = Field(default=8, alias="VECTOR_IVF_NPROBE")
+    # Graph engine over GraphEdge (memory.graph_expand): CSR per relation plus an uncompacted delta
+    graph_compact_edges: int = Field(default=4096, alias="GRAPH_COMPACT_EDGES")
+    graph_max_hops: int = Field(default=6, alias="GRAPH_MAX_HOPS")
+    # Hybrid retrieval (retrieval.search): axes queried concurrently, fused by reciprocal rank
+    retrieval_axes: List[str] = Field(default_factory=lambda: ["lexical", "vector", "ontology"],
+                                      alias="RETRIEVAL_AXES")
+    retrieval_rrf_k: int = Field(default=60, alias="RETRIEVAL_RRF_K")
+    # candidates per axis = limit * fanout
+    retrieval_fanout: int = Field(default=4, alias="RETRIEVAL_FANOUT")
+    retrieval_axis_timeout_s: float = Field(default=5.0, alias="RETRIEVAL_AXIS_TIMEOUT_S")
+    # Repository indexer (memory.index_repo): .gitignore-aware walk of ALLOW_FS_BASE, chunked in a
+    # process pool
+    index_workers: int = Field(default=4, alias="INDEX_WORKERS")
+    index_max_file_bytes: int = Field(default=1024 * 1024, alias="INDEX_MAX_FILE_BYTES")
+    index_chunk_lines: int = Field(default=80, alias="INDEX_CHUNK_LINES")
+    index_exclude: List[str] = Field(
+        default_factory=lambda: [".git", "node_modules", "__pycache__", ".venv", "venv",
+                                 ".mypy_cache", ".pytest_cache"],
+        alias="INDEX_EXCLUDE",
+    )
+    index_batch_files: int = Field(default=64, alias="INDEX_BATCH_FILES")
+    # embed new chunks when a job finishes
+    index_embed: bool = Field(default=False, alias="INDEX_EMBED")
+    # Import every declared tool/provider at startup instead of on first use
+    plugins_preload: bool = Field(default=False, alias="PLUGINS_PRELOAD")
     allowed_tools: List[str] = Field(
         default_factory=lambda: [
             "fs.read",
+            "fs.read_many",
             "fs.write",
             "fs.apply_patch",
             "git.status",
@@ -25,6 +167,10 @@ class Settings(BaseSettings):
             "speech.transcribe",
             "speech.synthesize",
             "memory.search",
+            "memory.vector_search",
+            "memory.index_repo",
+            "memory.graph_expand",
+            "retrieval.search",
         ],
         alias="ALLOWED_TOOLS",
     )
@@ -1,26 +1,93 @@
 from __future__ import annotations
-from typing import AsyncIterator, Any, List, Dict
-from ..providers.base import provider_registry
-import logging
+
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+
 from ..config import settings
-from ..tools.base import tool_registry
+from ..memory.history import session_history
+from ..providers.admission import admission
+from ..providers.base import ChatProvider, provider_registry
+from ..providers.cache import response_cache
+from ..providers.router import model_router
+from .executor import ToolExecutor
+from .metrics import instrument_stream
+
 
-logger = logging.getLogger("orchestrator.tools")
+async def run_tools(tool_calls: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    # Independent calls run concurrently; events arrive in completion order.
+    async for evt in ToolExecutor().run(tool_calls):
+        yield evt
 
-async def run_tools(tool_calls: List[Dict[str, Any]]):
-    for call in tool_calls:
-        name = call["name"]
-        params = call.get("params", {})
-        tool = tool_registry.get(name)
-        result = await tool.run(**params)
-        logger.info("tool_run", extra={"tool": name})
-        yield {"type": "tool_result", "tool": name, "data": result}
+def _tool_message(tool_calls: List[Dict[str, Any]],
+                  outcomes: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """One system message with every tool outcome of the turn, in call order (a stable prompt
+    keeps response-cache hits possible even though tools finish in any order)."""
+    lines = []
+    for i, spec in enumerate(tool_calls):
+        evt = outcomes.get(str(spec.get("id", i)))  # same default id as executor.ToolCall
+        if evt is None:
+            continue
+        body = ({"result": evt["data"]} if evt["type"] == "tool_result"
+                else {"error": evt["error"]})
+        lines.append(orjson.dumps({"tool": evt["tool"], "id": evt["id"], **body},
+                                  default=str, option=orjson.OPT_NON_STR_KEYS).decode())
+    return {"role": "system", "content": "Tool results:\n" + "\n".join(lines)}
 
-async def chat_stream(messages: List[Dict[str, str]], model: str | None = None, provider: str = "openai", tool_calls: List[Dict[str, Any]] | None = None) -> AsyncIterator[Dict[str, Any]]:
+def _open(prov: ChatProvider, messages: List[Dict[str, str]], model: str, use_cache: bool,
+          session: str | None) -> AsyncIterator[Dict[str, Any]]:
+    # Cache hits skip admission control entirely; misses queue for an upstream slot.
+    def upstream() -> AsyncIterator[Dict[str, Any]]:
+        return admission.stream(prov, messages, model, session=session)
+
+    if use_cache:
+        return response_cache.stream(prov, messages, model, opener=upstream)
+    return upstream()
+
+async def chat_stream(messages: List[Dict[str, str]], model: str | None = None,
+                      provider: str = "openai", tool_calls: List[Dict[str, Any]] | None = None,
+                      cache: bool | None = None, model_class: str | None = None,
+                      hedge: bool | None = None,
+                      session: str | None = None) -> AsyncIterator[Dict[str, Any]]:
     if tool_calls:
+        outcomes: Dict[str, Dict[str, Any]] = {}
         async for tr in run_tools(tool_calls):
+            if tr["type"] in ("tool_result", "tool_error"):
+                outcomes[tr["id"]] = tr
             yield tr
-    prov = provider_registry.get(provider)
-    async for chunk in prov.stream_chat(messages, model=model or settings.default_model):
+        if outcomes:
+            # The model answers with the tool output in context; the caller's list is not mutated.
+            messages = [*messages, _tool_message(tool_calls, outcomes)]
+    use_cache = settings.response_cache_enabled if cache is None else cache
+    if model_class:
+        # The router picks (and may hedge across) providers; the cache still applies per target.
+        stream = model_router.stream(model_class, messages, hedge=hedge,
+                                     opener=lambda p, m, mdl: _open(p, m, mdl, use_cache, session))
+        # The label is bounded by the configured classes, whatever the caller sent.
+        known = model_class if model_class in settings.model_classes else "unknown"
+        stream = instrument_stream(stream, f"class:{known}", None)
+    else:
+        model = model or settings.default_model
+        upstream = _open(provider_registry.get(provider), messages, model, use_cache, session)
+        stream = instrument_stream(upstream, provider, model)
+    async for chunk in stream:
         yield chunk
     yield {"type": "end", "reason": "completed"}
+
+async def chat_turn(message: str, session_id: int | None = None,
+                    **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+    """One user turn: stateless without ``session_id``, otherwise history-backed and persisted."""
+    if session_id is None:
+        async for evt in chat_stream([{"role": "user", "content": message}], **kwargs):
+            yield evt
+        return
+    await session_history.append(session_id, "user", message)
+    msgs, tokens = await session_history.context(session_id)
+    yield {"type": "session", "session_id": session_id, "context_messages": len(msgs),
+           "context_tokens": tokens}
+    reply: List[str] = []
+    async for evt in chat_stream(msgs, session=str(session_id), **kwargs):
+        if evt.get("type") == "token":
+            reply.append(evt["token"])
+        yield evt
+    await session_history.append(session_id, "assistant", "".join(reply))
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List
+
+from ..config import settings
+from ..memory import store
+from ..memory.writer import db_writer
+from ..tools.base import ToolResult, tool_registry
+from ..tools.cache import tool_cache
+from .metrics import TOOL
+
+logger = logging.getLogger("orchestrator.tools")
+
+
+class ToolCall:
+    __slots__ = ("id", "name", "params", "depends_on", "timeout", "use_cache", "stream",
+                 "dependents", "pending")
+
+    def __init__(self, index: int, spec: Dict[str, Any]):
+        self.id = str(spec.get("id", index))
+        self.name: str = spec["name"]
+        self.params: Dict[str, Any] = spec.get("params") or {}
+        self.depends_on: List[str] = [str(d) for d in spec.get("depends_on") or ()]
+        self.timeout: float | None = spec.get("timeout")
+        self.use_cache = bool(spec.get("cache", True))
+        self.stream = bool(spec.get("stream", False))
+        self.dependents: List[ToolCall] = []
+        self.pending = len(self.depends_on)
+
+
+def build_graph(tool_calls: List[Dict[str, Any]]) -> List[ToolCall]:
+    """Parse call specs and validate the optional ``depends_on`` graph (ids, cycles)."""
+    calls = [ToolCall(i, spec) for i, spec in enumerate(tool_calls)]
+    by_id: Dict[str, ToolCall] = {}
+    for call in calls:
+        if call.id in by_id:
+            raise ValueError(f"Duplicate tool call id '{call.id}'")
+        by_id[call.id] = call
+    for call in calls:
+        for dep in call.depends_on:
+            if dep not in by_id:
+                raise ValueError(f"Tool call '{call.id}' depends on unknown id '{dep}'")
+            by_id[dep].dependents.append(call)
+    # Kahn's algorithm: every call must be reachable from the roots.
+    remaining = {c.id: c.pending for c in calls}
+    ready = [c for c in calls if not c.pending]
+    seen = 0
+    while ready:
+        call = ready.pop()
+        seen += 1
+        for d in call.dependents:
+            remaining[d.id] -= 1
+            if not remaining[d.id]:
+                ready.append(d)
+    if seen != len(calls):
+        raise ValueError("Tool call dependency graph has a cycle")
+    return calls
+
+
+class ToolExecutor:
+    """Runs tool calls concurrently, respecting ``depends_on`` edges.
+
+    Events are yielded as each call starts and finishes (completion order, not
+    submission order). A failed call or timeout produces a ``tool_error`` event and
+    its dependents are skipped with a ``tool_error`` of their own.
+    """
+
+    def __init__(self, max_concurrency: int | None = None, default_timeout: float | None = None):
+        self.max_concurrency = max_concurrency or settings.tool_max_concurrency
+        if default_timeout is None:
+            default_timeout = settings.tool_timeout_s
+        self.default_timeout = default_timeout
+
+    def _timeout_for(self, call: ToolCall, tool: Any) -> float | None:
+        timeout = call.timeout if call.timeout is not None else getattr(tool, "timeout", None)
+        timeout = timeout if timeout is not None else self.default_timeout
+        return timeout if timeout and timeout > 0 else None
+
+    async def _invoke(self, tool: Any, call: ToolCall) -> Any:
+        if tool.cacheable and call.use_cache:
+            coro = tool_cache.call(tool, call.params)
+        else:
+            coro = tool.run(**call.params)
+        return await asyncio.wait_for(coro, self._timeout_for(call, tool))
+
+    async def _stream(self, tool: Any, call: ToolCall,
+                      events: asyncio.Queue[Dict[str, Any]]) -> Any:
+        result = None
+        async with asyncio.timeout(self._timeout_for(call, tool)):
+            async for item in tool.stream(**call.params):
+                if isinstance(item, ToolResult):
+                    result = item.data
+                else:
+                    await events.put({"type": "tool_chunk", "tool": call.name, "id": call.id,
+                                      "data": item})
+        return result
+
+    async def _run_one(self, call: ToolCall, sem: asyncio.Semaphore,
+                       events: asyncio.Queue[Dict[str, Any]]) -> None:
+        async with sem:
+            await events.put({"type": "tool_start", "tool": call.name, "id": call.id})
+            started_at = datetime.now(timezone.utc)
+            start = time.perf_counter()
+            evt: Dict[str, Any]
+            try:
+                tool = tool_registry.get(call.name)
+                if call.stream and tool.streaming:
+                    result = await self._stream(tool, call, events)
+                else:
+                    result = await self._invoke(tool, call)
+            except asyncio.TimeoutError:
+                evt = {"type": "tool_error", "tool": call.name, "id": call.id, "error": "timeout"}
+            except Exception as e:  # noqa: BLE001 - reported to the client as an event
+                evt = {"type": "tool_error", "tool": call.name, "id": call.id,
+                       "error": str(e) or type(e).__name__}
+            else:
+                evt = {"type": "tool_result", "tool": call.name, "id": call.id, "data": result}
+            elapsed = time.perf_counter() - start
+            ms = round(elapsed * 1000, 2)
+            evt["ms"] = ms
+            ok = evt["type"] == "tool_result"
+            status = "ok" if ok else ("timeout" if evt["error"] == "timeout" else "error")
+            label = call.name if call.name in tool_registry else "unknown"
+            TOOL.labels(label, status).observe(elapsed)
+            logger.info("tool_run", extra={"tool": call.name, "ms": ms, "ok": ok})
+            if settings.enable_memory and db_writer.running:
+                store.queue_tool_execution(
+                    call.name,
+                    call.params,
+                    evt["data"] if ok else {"error": evt["error"]},
+                    "completed" if ok else status,
+                    started_at,
+                    datetime.now(timezone.utc),
+                )
+            await events.put(evt)
+
+    async def run(self, tool_calls: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        calls = build_graph(tool_calls)
+        if not calls:
+            return
+        by_id = {c.id: c for c in calls}
+        sem = asyncio.Semaphore(self.max_concurrency)
+        events: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        tasks: set[asyncio.Task[Any]] = set()
+        unfinished = len(calls)
+
+        def launch(call: ToolCall) -> None:
+            task = asyncio.create_task(self._run_one(call, sem, events))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        def skip(call: ToolCall, failed: str) -> List[Dict[str, Any]]:
+            out = [{"type": "tool_error", "tool": call.name, "id": call.id,
+                    "error": f"dependency '{failed}' failed"}]
+            for d in call.dependents:
+                out.extend(skip(d, call.id))
+            return out
+
+        skipped: set[str] = set()
+        try:
+            for call in calls:
+                if not call.pending:
+                    launch(call)
+            while unfinished:
+                evt = await events.get()
+                yield evt
+                if evt["type"] in ("tool_start", "tool_chunk"):
+                    continue
+                unfinished -= 1
+                call = by_id[evt["id"]]
+                for d in call.dependents:
+                    if d.id in skipped:
+                        continue
+                    if evt["type"] == "tool_result":
+                        d.pending -= 1
+                        if not d.pending:
+                            launch(d)
+                    else:
+                        for s in skip(d, call.id):
+                            if s["id"] not in skipped:
+                                skipped.add(s["id"])
+                                unfinished -= 1
+                                yield s
+        finally:
+            for task in tasks:
+                task.cancel()
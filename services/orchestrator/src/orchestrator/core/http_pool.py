@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger("orchestrator.http")
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientPool:
+    """Long-lived ``httpx.AsyncClient`` instances shared by providers.
+
+    One client is kept per upstream origin (scheme://host:port), so connection
+    limits apply per host and TCP/TLS connections stay warm across chat turns.
+    Extra keyword arguments are passed through to every client (e.g. ``transport``).
+    """
+
+    def __init__(self, **client_kwargs: Any):
+        self._client_kwargs = client_kwargs
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop | None]] = {}
+        self._retiring: Set[asyncio.Task[None]] = set()
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _build(self, origin: str) -> httpx.AsyncClient:
+        http2 = settings.http2
+        if http2 and not _h2_available():
+            logger.warning("HTTP2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        kwargs: Dict[str, Any] = {
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            # Streaming responses can idle between tokens; only bound the connect phase.
+            "timeout": httpx.Timeout(None, connect=settings.http_connect_timeout),
+        }
+        kwargs.update(self._client_kwargs)
+        return httpx.AsyncClient(base_url=origin, **kwargs)
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Return the shared client for the origin of ``url``, creating it on first use."""
+        origin = self._origin(url)
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        entry = self._clients.get(origin)
+        # Connections are bound to the loop that opened them; a new loop needs a new client.
+        if entry is None or entry[0].is_closed or (entry[1] is not None and entry[1] is not loop):
+            if entry is not None:
+                self._retire(*entry)
+            entry = (self._build(origin), loop)
+            self._clients[origin] = entry
+        return entry[0]
+
+    def _retire(self, client: httpx.AsyncClient, owner: asyncio.AbstractEventLoop | None) -> None:
+        """Close a client replaced after a loop change, on its own loop if that still runs."""
+        if client.is_closed:
+            return
+        if owner is not None and owner.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), owner)
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_quietly(client))
+        except RuntimeError:
+            return  # no loop to close it on; its connections died with the owning loop
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    @staticmethod
+    async def _close_quietly(client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:  # noqa: BLE001 - transports of a closed loop may fail to close
+            logger.debug("closing stale http client failed: %s", e)
+
+    def open(self, *urls: str) -> None:
+        """Pre-create clients for known upstreams (no connection is made yet)."""
+        for url in urls:
+            self.get(url)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+        for client, _loop in clients.values():
+            if not client.is_closed:
+                await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"origins": sorted(self._clients.keys())}
+
+
+http_pool = HTTPClientPool()
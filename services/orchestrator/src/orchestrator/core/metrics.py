@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger("orchestrator.chat")
+
+# Every duration below is measured with time.perf_counter(); wall clock is only used for timestamps.
+registry = CollectorRegistry(auto_describe=True)
+
+_LATENCY = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_GAP = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+_LONG = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUEST = Histogram("orchestrator_http_request_seconds", "Time to response headers",
+                         ("method", "route", "status"), buckets=_LATENCY, registry=registry)
+TTFT = Histogram("orchestrator_chat_ttft_seconds", "Time from upstream call to first token",
+                 ("provider", "model"), buckets=_LATENCY, registry=registry)
+TOKEN_GAP = Histogram("orchestrator_chat_token_gap_seconds", "Gap between consecutive token events",
+                      ("provider",), buckets=_GAP, registry=registry)
+STREAM = Histogram("orchestrator_chat_stream_seconds", "Total provider stream duration",
+                   ("provider", "status"), buckets=_LONG, registry=registry)
+TOKENS = Counter("orchestrator_chat_token_events_total", "Token events streamed", ("provider",),
+                 registry=registry)
+TOOL = Histogram("orchestrator_tool_seconds", "Tool call latency", ("tool", "status"),
+                 buckets=_LATENCY, registry=registry)
+DB_WRITE = Histogram("orchestrator_db_write_seconds", "Database write latency", ("op",),
+                     buckets=_LATENCY, registry=registry)
+DB_ROWS = Counter("orchestrator_db_rows_written_total", "Rows committed by the background writer",
+                  registry=registry)
+SPEECH = Histogram("orchestrator_speech_seconds", "Speech provider latency",
+                   ("provider", "op", "status"), buckets=_LONG, registry=registry)
+ADMISSION_WAIT = Histogram("orchestrator_admission_wait_seconds",
+                           "Time queued for an upstream slot", ("provider",), buckets=_LATENCY,
+                           registry=registry)
+EMBED_BATCH = Histogram("orchestrator_embedding_batch_seconds",
+                        "Embedding provider call latency per batch", ("provider", "status"),
+                        buckets=_LONG, registry=registry)
+EMBED_TEXTS = Counter("orchestrator_embedding_texts_total",
+                      "Texts submitted for embedding by outcome", ("provider", "result"),
+                      registry=registry)
+RETRIEVAL_AXIS = Histogram("orchestrator_retrieval_axis_seconds",
+                           "Hybrid retrieval latency per axis", ("axis", "status"),
+                           buckets=_LATENCY, registry=registry)
+
+
+class _StatsCollector:
+    """Exposes the in-process counters of caches, gates and pools as gauges at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        from ..api.ws import ws_stats
+        from ..providers.admission import admission
+        from ..providers.cache import response_cache
+        from ..tools.cache import tool_cache
+        from ..tools.process import process_scheduler
+        from .streams import stream_registry
+
+        depth = GaugeMetricFamily("orchestrator_admission_queue_depth",
+                                  "Calls waiting for an upstream slot", labels=["gate"])
+        active = GaugeMetricFamily("orchestrator_admission_active", "Upstream calls in flight",
+                                   labels=["gate"])
+        for key, gate in admission.stats()["gates"].items():
+            depth.add_metric([key], gate["queued"])
+            active.add_metric([key], gate["active"])
+        yield depth
+        yield active
+        procs = process_scheduler.stats()
+        yield GaugeMetricFamily("orchestrator_subprocesses_running", "Running subprocesses",
+                                value=procs["running"])
+        yield GaugeMetricFamily("orchestrator_subprocesses_waiting",
+                                "Subprocesses waiting for a slot", value=procs["waiting"])
+        tc = tool_cache.stats()
+        yield GaugeMetricFamily("orchestrator_tool_cache_bytes", "Tool result cache size",
+                                value=tc.get("bytes", 0))
+        rc = response_cache.stats()
+        yield GaugeMetricFamily("orchestrator_response_cache_entries",
+                                "Response cache entries (memory tier)", value=rc["memory_entries"])
+        streams = stream_registry.stats()
+        yield GaugeMetricFamily("orchestrator_sse_streams_live", "Chat streams still generating",
+                                value=streams["live"])
+        yield GaugeMetricFamily("orchestrator_sse_stream_followers",
+                                "Connections following a chat stream", value=streams["followers"])
+        yield GaugeMetricFamily("orchestrator_ws_connections", "Open WebSocket connections",
+                                value=ws_stats["active"])
+
+
+registry.register(_StatsCollector())
+
+
+def model_label(model: str | None) -> str:
+    """``model`` if it is configured (DEFAULT_MODEL or a MODEL_CLASSES target), else ``"other"``.
+
+    The model comes from the client, so using it verbatim would make label cardinality unbounded.
+    """
+    from ..config import settings
+
+    model = model or settings.default_model
+    if model == settings.default_model:
+        return model
+    for specs in settings.model_classes.values():
+        for spec in specs:
+            if spec.partition(":")[2] == model:
+                return model
+    return "other"
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+async def instrument_stream(events: AsyncIterator[Dict[str, Any]], provider: str,
+                            model: str | None) -> AsyncIterator[Dict[str, Any]]:
+    """Pass provider events through while recording TTFT, inter-token gaps and stream time.
+
+    A ``route`` event (model-class routing) relabels the stream with the chosen provider.
+    """
+    start = time.perf_counter()
+    first: float | None = None
+    last = start
+    tokens = 0
+    status = "error"
+    try:
+        async for evt in events:
+            kind = evt.get("type")
+            if kind == "route":
+                provider, model = evt["provider"], evt["model"]
+            elif kind == "admission":
+                wait_s = evt.get("wait_ms", 0) / 1000
+                ADMISSION_WAIT.labels(evt.get("provider", provider)).observe(wait_s)
+            elif kind == "token":
+                now = time.perf_counter()
+                if first is None:
+                    first = now
+                    TTFT.labels(provider, model_label(model)).observe(now - start)
+                else:
+                    TOKEN_GAP.labels(provider).observe(now - last)
+                last = now
+                tokens += 1
+            yield evt
+        status = "ok"
+    finally:
+        total = time.perf_counter() - start
+        STREAM.labels(provider, status).observe(total)
+        if tokens:
+            TOKENS.labels(provider).inc(tokens)
+        logger.info("chat_stream", extra={
+            "provider": provider,
+            "model": model,
+            "status": status,
+            "tokens": tokens,
+            "ttft_ms": None if first is None else round((first - start) * 1000, 2),
+            "ms": round(total * 1000, 2),
+        })
+
+
+@contextlib.contextmanager
+def observe_speech(provider: str, op: str) -> Iterator[None]:
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        SPEECH.labels(provider, op, status).observe(time.perf_counter() - start)
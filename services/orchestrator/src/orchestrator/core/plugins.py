@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import time
+from dataclasses import dataclass, field
+from importlib.metadata import entry_points
+from typing import Any, Dict, Generic, Iterable, List, TypeVar
+
+logger = logging.getLogger("orchestrator.plugins")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PluginSpec:
+    """What a registry knows about an implementation before importing it.
+
+    ``target`` is ``"package.module:Attr"``; importing the module is expected to register the
+    instance (the existing convention), otherwise ``Attr`` is instantiated and registered.
+    """
+
+    name: str
+    target: str
+    description: str = ""
+    meta: Dict[str, Any] = field(default_factory=dict)
+    source: str = "manifest"
+
+
+class LazyRegistry(Generic[T]):
+    """Name -> implementation map whose entries can be declared up front and imported on first
+    ``get``."""
+
+    kind = "Plugin"
+
+    def __init__(self) -> None:
+        self._items: Dict[str, T] = {}
+        self._specs: Dict[str, PluginSpec] = {}
+        self.load_ms: Dict[str, float] = {}
+
+    def register(self, item: T) -> None:
+        self._items[item.name] = item  # type: ignore[attr-defined]
+
+    def declare(self, specs: Iterable[PluginSpec]) -> None:
+        for spec in specs:
+            self._specs.setdefault(spec.name, spec)
+
+    def discover(self, group: str) -> None:
+        """Declare third-party implementations published under an entry-point group (not
+        imported)."""
+        for ep in entry_points(group=group):
+            dist = getattr(ep, "dist", None)
+            source = f"entry_point:{dist.name if dist else group}"
+            self.declare([PluginSpec(ep.name, ep.value, source=source)])
+
+    def _load(self, name: str) -> None:
+        spec = self._specs[name]
+        module_name, _, attr = spec.target.partition(":")
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        if name not in self._items:
+            obj = getattr(module, attr)
+            self.register(obj() if isinstance(obj, type) else obj)
+        ms = round((time.perf_counter() - start) * 1000, 2)
+        self.load_ms[name] = ms
+        logger.info("plugin_loaded",
+                    extra={"kind": self.kind, "plugin": name, "target": spec.target, "ms": ms})
+
+    def get(self, name: str) -> T:
+        item = self._items.get(name)
+        if item is None:
+            if name not in self._specs:
+                raise KeyError(f"{self.kind} '{name}' not registered")
+            self._load(name)
+            item = self._items[name]
+        return item
+
+    def load_all(self) -> None:
+        for name in self._specs:
+            if name not in self._items:
+                self._load(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._items or name in self._specs
+
+    def list(self) -> List[str]:
+        return list(self._specs) + [n for n in self._items if n not in self._specs]
+
+    def describe(self) -> List[Dict[str, Any]]:
+        out = []
+        for name in self.list():
+            spec = self._specs.get(name)
+            item = self._items.get(name)
+            if spec and spec.description:
+                description = spec.description
+            else:
+                description = getattr(item, "description", "")
+            out.append({
+                "name": name,
+                "description": description,
+                "source": spec.source if spec else "registered",
+                "loaded": item is not None,
+                "load_ms": self.load_ms.get(name),
+                **(spec.meta if spec else {}),
+            })
+        return out
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (Linux /proc, falling back to peak RSS)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,203 @@
+"""Event streams that outlive the HTTP connection that started them.
+
+A chat turn runs as its own task and appends numbered events to a bounded ring buffer. Connections
+only follow the buffer: a client that drops and comes back with ``Last-Event-ID`` gets the events it
+missed and then the live tail, and the tools and upstream generation are never restarted. Finished
+streams stay replayable for ``SSE_REPLAY_TTL_S`` in memory and, with ``SSE_REPLAY_SPILL``, in the
+database afterwards.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, AsyncIterator, Deque, Dict, List, Tuple
+
+import orjson
+
+from ..config import settings
+
+logger = logging.getLogger("orchestrator.streams")
+
+Numbered = Tuple[int, Dict[str, Any]]
+
+
+def event_id(stream_id: str, seq: int) -> str:
+    return f"{stream_id}:{seq}"
+
+
+def parse_event_id(value: str | None) -> Tuple[str, int] | None:
+    """``"<stream>:<seq>"`` -> (stream, seq); None for anything else."""
+    stream_id, sep, seq = (value or "").strip().rpartition(":")
+    if not sep or not stream_id or not seq.lstrip("-").isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+def _replay(events: List[Numbered], after: int) -> List[Numbered]:
+    """Events after ``after``, preceded by a ``gap`` marker when some have already been dropped."""
+    out = [(seq, evt) for seq, evt in events if seq > after]
+    if out and out[0][0] > after + 1:
+        out.insert(0, (out[0][0] - 1, {"type": "gap", "missed": out[0][0] - after - 1}))
+    return out
+
+
+class EventStream:
+    def __init__(self, stream_id: str, max_events: int):
+        self.id = stream_id
+        self.buffer: Deque[Numbered] = deque(maxlen=max(1, max_events))
+        self.next_seq = 0
+        self.done = False
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        self.followers = 0
+        self.detached: float | None = None  # when the last follower left
+        self.task: asyncio.Task[Any] | None = None
+        self._changed = asyncio.Event()
+
+    def emit(self, evt: Dict[str, Any]) -> None:
+        self.buffer.append((self.next_seq, evt))
+        self.next_seq += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def close(self) -> None:
+        self.done = True
+        self.finished = time.monotonic()
+        self._changed.set()
+
+    def abandoned(self) -> bool:
+        return (self.followers == 0 and self.detached is not None
+                and time.monotonic() - self.detached > settings.sse_detached_timeout_s)
+
+    async def follow(self, after: int = -1) -> AsyncGenerator[Numbered, None]:
+        """Buffered events after ``after`` (a ``gap`` event if some were overwritten), then live
+        ones."""
+        nxt = after + 1
+        self.followers += 1
+        self.detached = None
+        try:
+            while True:
+                while nxt < self.next_seq:
+                    first = self.buffer[0][0]
+                    if nxt < first:
+                        yield first - 1, {"type": "gap", "missed": first - nxt}
+                        nxt = first
+                    seq, evt = self.buffer[nxt - first]
+                    nxt = seq + 1
+                    yield seq, evt
+                if self.done:
+                    return
+                await self._changed.wait()
+        finally:
+            self.followers -= 1
+            if not self.followers:
+                self.detached = time.monotonic()
+
+
+class StreamRegistry:
+    def __init__(self) -> None:
+        self.streams: "OrderedDict[str, EventStream]" = OrderedDict()
+        self.counters = {"started": 0, "resumed": 0, "resumed_from_db": 0, "abandoned": 0,
+                         "spilled": 0}
+        self._purged = time.monotonic()  # spilled rows are purged at most every 10 minutes
+
+    def start(self, events: AsyncIterator[Dict[str, Any]]) -> EventStream:
+        """Run ``events`` to completion in the background, independent of any connection."""
+        self._sweep()
+        stream = EventStream(uuid.uuid4().hex[:16], settings.sse_replay_events)
+        stream.task = asyncio.create_task(self._pump(stream, events))
+        self.streams[stream.id] = stream
+        self.counters["started"] += 1
+        return stream
+
+    async def _pump(self, stream: EventStream, events: AsyncIterator[Dict[str, Any]]) -> None:
+        try:
+            async for evt in events:
+                stream.emit(evt)
+                if stream.abandoned():
+                    self.counters["abandoned"] += 1
+                    logger.info("stream_abandoned",
+                                extra={"stream": stream.id, "events": stream.next_seq})
+                    stream.emit({"type": "error", "error": "abandoned"})
+                    break
+        except asyncio.CancelledError:
+            stream.emit({"type": "error", "error": "cancelled"})
+            raise
+        except Exception as e:  # noqa: BLE001 - delivered to every follower as an event
+            stream.emit({"type": "error", "error": str(e)})
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            stream.close()
+            self._spill(stream)
+
+    def _spill(self, stream: EventStream) -> None:
+        if not settings.sse_replay_spill:
+            return
+        # Imported here: the memory package imports core.metrics, whose collector imports this
+        # module.
+        from ..memory import models
+        from ..memory.writer import db_writer
+
+        if not db_writer.running:
+            return
+        events_json = orjson.dumps(list(stream.buffer)).decode()
+        db_writer.submit(models.StreamLog(stream_id=stream.id, events_json=events_json))
+        self.counters["spilled"] += 1
+
+    async def open(self, stream_id: str, after: int = -1) -> AsyncGenerator[Numbered, None]:
+        """Replay-then-follow iterator for a stream; KeyError once it is neither in memory nor
+        spilled."""
+        stream = self.streams.get(stream_id)
+        if stream is not None:
+            self.counters["resumed"] += 1
+            return stream.follow(after)
+        if settings.sse_replay_spill:
+            from ..memory import store
+
+            events = await asyncio.to_thread(store.load_stream_log, stream_id)
+            if events is not None:
+                self.counters["resumed_from_db"] += 1
+                return _iterate(_replay(events, after))
+        raise KeyError(stream_id)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        expired = [s.id for s in self.streams.values()
+                   if s.done and (now - (s.finished or now) > settings.sse_replay_ttl_s)]
+        finished = [s.id for s in self.streams.values() if s.done and s.id not in expired]
+        excess = len(self.streams) - len(expired) - settings.sse_replay_max_streams
+        expired += finished[:max(0, excess)]
+        for stream_id in expired:
+            del self.streams[stream_id]
+        if settings.sse_replay_spill and now - self._purged > 600:
+            self._purged = now
+            from ..memory import store
+
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.sse_replay_spill_ttl_s)
+            asyncio.get_running_loop().run_in_executor(None, store.purge_stream_logs, cutoff)
+
+    async def shutdown(self) -> None:
+        tasks = [s.task for s in self.streams.values() if s.task is not None and not s.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        live = sum(1 for s in self.streams.values() if not s.done)
+        return {**self.counters, "live": live, "finished": len(self.streams) - live,
+                "followers": sum(s.followers for s in self.streams.values()),
+                "buffered_events": sum(len(s.buffer) for s in self.streams.values())}
+
+
+async def _iterate(items: List[Numbered]) -> AsyncGenerator[Numbered, None]:
+    for item in items:
+        yield item
+
+
+stream_registry = StreamRegistry()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import List
+
+from .. import manifest
+from ..core.http_pool import HTTPClientPool, http_pool
+from ..core.plugins import LazyRegistry
+
+
+class EmbeddingProvider(ABC):
+    name: str
+    http_pool: HTTPClientPool = http_pool
+    # Upstream per-request input limit; the pipeline never sends larger batches.
+    max_batch: int = 2048
+
+    @abstractmethod
+    async def embed(self, texts: List[str], model: str | None = None,
+                    dimensions: int | None = None) -> List[List[float]]:
+        """One vector per input text, in input order."""
+
+
+class EmbeddingRegistry(LazyRegistry[EmbeddingProvider]):
+    kind = "Embedding provider"
+
+
+embedding_registry = EmbeddingRegistry()
+embedding_registry.declare(manifest.EMBEDDING_PROVIDERS)
+embedding_registry.discover("orchestrator.embeddings")
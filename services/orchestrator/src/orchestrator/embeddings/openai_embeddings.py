@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List
+
+from ..config import settings
+from ..providers.openai_provider import OPENAI_API_BASE
+from .base import EmbeddingProvider, embedding_registry
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+
+    async def embed(self, texts: List[str], model: str | None = None,
+                    dimensions: int | None = None) -> List[List[float]]:
+        api_key = settings.openai_api_key or os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("Missing OPENAI_API_KEY")
+        payload: Dict[str, Any] = {"model": model or settings.embedding_model, "input": texts,
+                                   "encoding_format": "float"}
+        if dimensions:
+            payload["dimensions"] = dimensions
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        client = self.http_pool.get(OPENAI_API_BASE)
+        resp = await client.post(f"{OPENAI_API_BASE}/embeddings", json=payload, headers=headers)
+        resp.raise_for_status()
+        data = sorted(resp.json()["data"], key=lambda d: d["index"])
+        return [d["embedding"] for d in data]
+
+
+embedding_registry.register(OpenAIEmbeddingProvider())
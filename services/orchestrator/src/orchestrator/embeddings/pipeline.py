@@ -0,0 +1,265 @@
+"""Batched, deduplicated embedding with a persistent content-hash cache.
+
+Texts are keyed by the sha256 of their content within an embedding space (provider, model,
+dimensions). Each distinct text is embedded at most once per space: repeats inside a call
+collapse, concurrent callers wait on the batch already in flight, and vectors persist in their own
+SQLite file, so re-indexing unchanged chunks costs one lookup instead of an API call.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..core.metrics import EMBED_BATCH, EMBED_TEXTS
+from ..memory import store
+from ..providers.admission import admission, backoff_delay, is_retryable
+from .base import EmbeddingProvider, embedding_registry
+
+logger = logging.getLogger("orchestrator.embeddings")
+
+_SQL_VARS = 500  # keys per IN (...) lookup, below SQLite's bound-parameter limit
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def plan_batches(items: Sequence[Tuple[str, str]], max_items: int,
+                 max_tokens: int) -> List[List[Tuple[str, str]]]:
+    """Greedy split of ``(key, text)`` pairs into batches bounded by count and estimated tokens."""
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    tokens = 0
+    for item in items:
+        cost = estimate_tokens(item[1])
+        if current and (len(current) >= max_items or tokens + cost > max_tokens):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(item)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class VectorCache:
+    """(space, sha256) -> float32 vector, in its own SQLite file like the response cache."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache (space TEXT NOT NULL, "
+                "key TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (space, key)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, space: str, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        with self._lock:
+            db = self._db()
+            for start in range(0, len(keys), _SQL_VARS):
+                part = keys[start:start + _SQL_VARS]
+                marks = ",".join("?" * len(part))
+                rows = db.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE space = ? AND key IN ({marks})",
+                    (space, *part),
+                )
+                for key, blob in rows:
+                    out[key] = np.frombuffer(blob, dtype="<f4")
+        return out
+
+    def put_many(self, space: str, rows: Iterable[Tuple[str, np.ndarray]]) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?, ?)",
+                ((space, key, int(vec.shape[0]), vec.astype("<f4").tobytes(), now)
+                 for key, vec in rows),
+            )
+            db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._db().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM embedding_cache")
+            self._db().commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EmbeddingPipeline:
+    def __init__(self, cache_path: str | None = None):
+        self.cache = VectorCache(cache_path or settings.embedding_cache_path)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future[Any]] = {}
+        self.counters = {"requested": 0, "unique": 0, "cache_hits": 0, "joined": 0, "embedded": 0,
+                         "batches": 0, "failed_batches": 0, "tokens": 0}
+
+    def _space(self, prov: EmbeddingProvider, model: str) -> str:
+        return f"{prov.name}:{model}:{settings.embedding_dimensions or ''}"
+
+    async def embed(self, texts: Sequence[str], provider: str | None = None,
+                    model: str | None = None) -> List[np.ndarray]:
+        """One float32 vector per text, in order; only texts new to the space reach the provider."""
+        prov = embedding_registry.get(provider or settings.embedding_provider)
+        model = model or settings.embedding_model
+        space = self._space(prov, model)
+        keys = [content_hash(t) for t in texts]
+        unique = dict(zip(keys, texts))
+        self.counters["requested"] += len(keys)
+        self.counters["unique"] += len(unique)
+        EMBED_TEXTS.labels(prov.name, "deduped").inc(len(keys) - len(unique))
+        vectors: Dict[str, np.ndarray] = {}
+        if settings.embedding_cache_enabled and unique:
+            vectors = await asyncio.to_thread(self.cache.get_many, space, list(unique))
+        self.counters["cache_hits"] += len(vectors)
+        EMBED_TEXTS.labels(prov.name, "cached").inc(len(vectors))
+
+        loop = asyncio.get_running_loop()
+        waiting: Dict[str, asyncio.Future[Any]] = {}
+        todo: List[Tuple[str, str]] = []
+        for key, text in unique.items():
+            if key in vectors:
+                continue
+            fut = self._inflight.get((space, key))
+            if fut is None:
+                fut = self._inflight[(space, key)] = loop.create_future()
+                todo.append((key, text))
+            else:
+                self.counters["joined"] += 1
+            waiting[key] = fut
+        if todo:
+            size = max(1, min(settings.embedding_batch_size, prov.max_batch))
+            sem = asyncio.Semaphore(settings.embedding_concurrency)
+            batches = plan_batches(todo, size, settings.embedding_batch_tokens)
+            await asyncio.gather(*(self._run_batch(prov, model, space, b, sem) for b in batches))
+        if waiting:
+            await asyncio.wait(waiting.values())
+            for fut in waiting.values():
+                error = fut.exception()
+                if error is not None:
+                    raise error
+            vectors.update((key, fut.result()) for key, fut in waiting.items())
+        return [vectors[key] for key in keys]
+
+    async def _run_batch(self, prov: EmbeddingProvider, model: str, space: str,
+                         batch: List[Tuple[str, str]], sem: asyncio.Semaphore) -> None:
+        # Resolves the batch's futures in every case; callers read errors from them, not gather.
+        limit = settings.embedding_max_input_tokens * 4
+        texts = [text[:limit] for _, text in batch]
+        start = time.perf_counter()
+        try:
+            async with sem, admission.slot(prov.name, model, "embeddings"):
+                raw = await self._call(prov, texts, model)
+            if len(raw) != len(batch):
+                raise RuntimeError(
+                    f"{prov.name} returned {len(raw)} vectors for {len(batch)} texts")
+            vecs = [np.asarray(v, dtype=np.float32) for v in raw]
+            if settings.embedding_cache_enabled:
+                rows = [(key, vec) for (key, _), vec in zip(batch, vecs)]
+                await asyncio.to_thread(self.cache.put_many, space, rows)
+            for (key, _), vec in zip(batch, vecs):
+                self._inflight[(space, key)].set_result(vec)
+            self.counters["batches"] += 1
+            self.counters["embedded"] += len(batch)
+            self.counters["tokens"] += sum(estimate_tokens(t) for t in texts)
+            EMBED_TEXTS.labels(prov.name, "embedded").inc(len(batch))
+            EMBED_BATCH.labels(prov.name, "ok").observe(time.perf_counter() - start)
+        except BaseException as e:
+            self.counters["failed_batches"] += 1
+            EMBED_BATCH.labels(prov.name, "error").observe(time.perf_counter() - start)
+            error = e if isinstance(e, Exception) else RuntimeError("embedding cancelled")
+            for key, _ in batch:
+                fut = self._inflight[(space, key)]
+                if not fut.done():
+                    fut.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            for key, _ in batch:
+                self._inflight.pop((space, key), None)
+
+    async def _call(self, prov: EmbeddingProvider, texts: List[str],
+                    model: str) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return await prov.embed(texts, model=model,
+                                        dimensions=settings.embedding_dimensions or None)
+            except Exception as e:
+                if attempt >= settings.retry_max_attempts or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                attempt += 1
+                admission.retries += 1
+                logger.warning("embedding_retry",
+                               extra={"provider": prov.name, "attempt": attempt, "delay_s": delay})
+                await asyncio.sleep(delay)
+
+    async def embed_pending(
+        self, limit: int | None = None, progress: Callable[[Dict[str, Any]], None] | None = None,
+    ) -> Dict[str, Any]:
+        """Embed every ``VectorChunk`` that has no embedding yet and write the vectors back."""
+        start = time.perf_counter()
+        before = dict(self.counters)
+        total = await asyncio.to_thread(store.count_pending_vector_chunks)
+        if limit is not None:
+            total = min(total, limit)
+        page = max(1, settings.embedding_batch_size * settings.embedding_concurrency)
+        rows = after = 0
+        while rows < total:
+            chunk = await asyncio.to_thread(store.pending_vector_chunks, after,
+                                            min(page, total - rows))
+            if not chunk:
+                break
+            vecs = await self.embed([content for _, content in chunk])
+            pairs = [(row_id, vec) for (row_id, _), vec in zip(chunk, vecs)]
+            await asyncio.to_thread(store.set_vector_embeddings, pairs)
+            rows += len(chunk)
+            after = chunk[-1][0]
+            if progress is not None:
+                progress({"phase": "embed", "done": rows, "total": total})
+        summary: Dict[str, Any] = {"rows": rows}
+        deltas = ("unique", "cache_hits", "joined", "embedded", "batches", "tokens")
+        summary.update((k, self.counters[k] - before[k]) for k in deltas)
+        summary["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": settings.embedding_provider, "model": settings.embedding_model,
+                **self.counters, "inflight": len(self._inflight),
+                "cached_vectors": self.cache.count()}
+
+
+embedding_pipeline = EmbeddingPipeline()
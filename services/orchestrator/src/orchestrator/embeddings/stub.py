@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import re
+from typing import List
+
+from .base import EmbeddingProvider, embedding_registry
+
+_WORD = re.compile(r"\w+")
+DEFAULT_DIM = 256
+
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Deterministic offline embedder: signed feature hashing of lower-cased words.
+
+    Texts sharing words get similar vectors, so vector search behaves sensibly in tests and
+    benchmarks. ``latency``/``per_text_latency`` simulate an upstream; ``calls``/``texts`` count
+    usage.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, per_text_latency: float = 0.0, max_batch: int = 2048):
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.max_batch = max_batch
+        self.calls = 0
+        self.texts = 0
+
+    @staticmethod
+    def vector(text: str, dim: int = DEFAULT_DIM) -> List[float]:
+        vec = [0.0] * dim
+        for word in _WORD.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            vec[h % dim] += 1.0 if (h >> 63) else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    async def embed(self, texts: List[str], model: str | None = None,
+                    dimensions: int | None = None) -> List[List[float]]:
+        if len(texts) > self.max_batch:
+            raise ValueError(f"batch of {len(texts)} exceeds {self.max_batch}")
+        self.calls += 1
+        self.texts += len(texts)
+        delay = self.latency + self.per_text_latency * len(texts)
+        if delay:
+            await asyncio.sleep(delay)
+        return [self.vector(t, dimensions or DEFAULT_DIM) for t in texts]
+
+
+embedding_registry.register(StubEmbeddingProvider())
@@ -0,0 +1,69 @@
+"""Built-in tools and providers, declared without importing them.
+
+Registries list these at startup and import the module on first use, so a dependency that only
+a plugin needs (NumPy for vector search, ...) loads when a request first uses it. The app itself
+still imports SQLModel (session history, the DB writer) and pathspec (the repo indexer).
+Third-party packages add to the same registries through the ``orchestrator.tools``,
+``orchestrator.providers``, ``orchestrator.speech`` and ``orchestrator.embeddings`` entry-point
+groups. tests/test_plugins.py keeps this file in sync with the classes.
+"""
+from __future__ import annotations
+
+from .core.plugins import PluginSpec
+
+TOOLS = [
+    PluginSpec("fs.read", "orchestrator.tools.fs_tools:FSReadTool",
+               "Read a text file (optionally a byte or line range) from allowed base path",
+               {"cacheable": True, "streaming": True}),
+    PluginSpec("fs.read_many", "orchestrator.tools.fs_tools:FSReadManyTool",
+               "Read several files concurrently (same range options as fs.read)"),
+    PluginSpec("fs.write", "orchestrator.tools.fs_tools:FSWriteTool",
+               "Write text content to file inside allowed base path"),
+    PluginSpec("fs.apply_patch", "orchestrator.tools.fs_tools:FSApplyPatchTool",
+               "Apply a unified diff (one or many files, incl. additions/deletions). "
+               "With 'path' the patch targets that file; "
+               "otherwise paths are resolved under 'base_dir'."),
+    PluginSpec("git.status", "orchestrator.tools.git_tools:GitStatusTool",
+               "Get git status for repository containing path", {"cacheable": True}),
+    PluginSpec("terminal.exec", "orchestrator.tools.terminal_tool:TerminalExecTool",
+               "Execute a safe shell command (restricted)", {"streaming": True}),
+    PluginSpec("speech.transcribe", "orchestrator.tools.speech_tools:SpeechTranscribeTool",
+               "Transcribe audio (base64) to text using speech provider"),
+    PluginSpec("speech.synthesize", "orchestrator.tools.speech_tools:SpeechSynthesizeTool",
+               "Synthesize text to speech returning base64 audio"),
+    PluginSpec("memory.search", "orchestrator.tools.memory_tools:MemorySearchTool",
+               "Search memory (ontology/parsing/vector fallback) for a query string",
+               {"cacheable": True}),
+    PluginSpec("memory.vector_search", "orchestrator.tools.memory_tools:MemoryVectorSearchTool",
+               "Cosine-similarity search over VectorChunk embeddings (exact or IVF); "
+               "pass a vector or a query to embed"),
+    PluginSpec("memory.index_repo", "orchestrator.tools.memory_tools:MemoryIndexRepoTool",
+               "Incrementally index a directory under the allowed base "
+               "into ParsingItem/VectorChunk",
+               {"streaming": True}),
+    PluginSpec("memory.graph_expand", "orchestrator.tools.memory_tools:MemoryGraphExpandTool",
+               "Expand ontology item ids along GraphEdge relations "
+               "(k hops, optional relation filter) or find a shortest path"),
+    PluginSpec("retrieval.search", "orchestrator.tools.retrieval_tools:RetrievalSearchTool",
+               "Hybrid search: lexical, vector and ontology key/tag axes in parallel, "
+               "fused by reciprocal rank"),
+]
+
+CHAT_PROVIDERS = [
+    PluginSpec("openai", "orchestrator.providers.openai_provider:OpenAIProvider",
+               "OpenAI chat completions (streaming)"),
+    PluginSpec("gemini", "orchestrator.providers.gemini_stub:GeminiStubProvider",
+               "Offline echo stub"),
+]
+
+SPEECH_PROVIDERS = [
+    PluginSpec("openai", "orchestrator.speech.openai_speech:OpenAISpeechProvider",
+               "OpenAI transcription and TTS"),
+]
+
+EMBEDDING_PROVIDERS = [
+    PluginSpec("openai", "orchestrator.embeddings.openai_embeddings:OpenAIEmbeddingProvider",
+               "OpenAI embeddings"),
+    PluginSpec("stub", "orchestrator.embeddings.stub:StubEmbeddingProvider",
+               "Deterministic offline hashing embedder"),
+]
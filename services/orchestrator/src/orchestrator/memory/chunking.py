@@ -0,0 +1,213 @@
+"""Language-aware chunking for the repository indexer.
+
+Pure stdlib on purpose: ``parse_file`` runs in worker processes, which should not have to import the
+rest of the service.
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+BINARY_SNIFF_BYTES = 8192
+
+LANGUAGES = {
+    ".py": "python", ".pyi": "python",
+    ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript",
+    ".go": "go", ".rs": "rust", ".java": "java", ".kt": "kotlin", ".cs": "csharp",
+    ".c": "c", ".h": "c", ".cc": "cpp", ".cpp": "cpp", ".hpp": "cpp",
+    ".rb": "ruby", ".php": "php", ".swift": "swift", ".scala": "scala",
+    ".sh": "shell", ".bash": "shell",
+    ".md": "markdown", ".mdx": "markdown", ".rst": "rst",
+}
+
+# Lines that open a new top-level unit. Group 1, when present, is the unit's name.
+_BOUNDARIES: Dict[str, re.Pattern[str]] = {
+    "javascript": re.compile(r"^(?:export\s+(?:default\s+)?)?(?:async\s+)?"
+                             r"(?:function\*?|class|const|let|var)\s+([A-Za-z_$][\w$]*)"),
+    "go": re.compile(r"^(?:func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)|type\s+([A-Za-z_]\w*))"),
+    "rust": re.compile(r"^(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?"
+                       r"(?:fn|struct|enum|trait|impl|mod|macro_rules!)\s*<?\s*([A-Za-z_]\w*)?"),
+    "java": re.compile(r"^\s{0,4}(?:(?:public|private|protected|static|final|abstract|sealed"
+                       r"|override|internal)\s+)*"
+                       r"(?:class|interface|enum|record|[\w<>\[\],\s]+?)\s+([A-Za-z_]\w*)\s*[({]"),
+    "c": re.compile(r"^(?:[A-Za-z_][\w\s\*]*?)\b([A-Za-z_]\w*)\s*\([^;]*$"),
+    "ruby": re.compile(r"^\s{0,2}(?:def|class|module)\s+([\w.:]+)"),
+    "php": re.compile(r"^\s{0,4}(?:(?:public|private|protected|static|final|abstract)\s+)*"
+                      r"(?:function|class|interface|trait)\s+(\w+)"),
+    "shell": re.compile(r"^(?:function\s+)?([A-Za-z_][\w-]*)\s*\(\)\s*\{?"),
+    "markdown": re.compile(r"^#{1,6}\s+(.*)"),
+}
+_BOUNDARIES["typescript"] = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|interface|type|enum|namespace|const|let|var)\s+([A-Za-z_$][\w$]*)")
+for _alias, _target in (("kotlin", "java"), ("csharp", "java"), ("scala", "java"),
+                        ("swift", "java"), ("cpp", "c")):
+    _BOUNDARIES[_alias] = _BOUNDARIES[_target]
+
+
+class Chunk(NamedTuple):
+    start: int  # 1-based, inclusive
+    end: int
+    kind: str
+    name: str
+    text: str
+
+
+Unit = Tuple[int, int, str, str]  # (start, end, kind, name), 1-based inclusive lines
+
+
+def detect_language(path: str) -> str | None:
+    return LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def _python_units(text: str, max_lines: int) -> List[Unit] | None:
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    units: List[Unit] = []
+
+    def visit(nodes: List[ast.stmt], prefix: str) -> None:
+        for node in nodes:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            end = node.end_lineno or node.lineno
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            name = prefix + node.name
+            methods = [n for n in node.body
+                       if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+            if kind == "class" and end - start + 1 > max_lines and methods:
+                # Large class: header up to the first member, then one unit per member.
+                first = min([methods[0].lineno] + [d.lineno for d in methods[0].decorator_list])
+                if first > start:
+                    units.append((start, first - 1, "class", name))
+                visit(node.body, name + ".")
+            else:
+                units.append((start, end, kind, name))
+
+    visit(tree.body, "")
+    return units
+
+
+def _regex_units(lines: List[str], pattern: re.Pattern[str]) -> List[Unit]:
+    starts: List[Tuple[int, str]] = []
+    for i, line in enumerate(lines, 1):
+        m = pattern.match(line)
+        if m:
+            name = next((g for g in m.groups() if g), "") if m.groups() else ""
+            starts.append((i, name.strip()))
+    units: List[Unit] = []
+    for idx, (start, name) in enumerate(starts):
+        end = starts[idx + 1][0] - 1 if idx + 1 < len(starts) else len(lines)
+        # Trailing blank lines belong to the gap, not the unit.
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        kind = "section" if pattern is _BOUNDARIES["markdown"] else "symbol"
+        units.append((start, end, kind, name))
+    return units
+
+
+def _fill_gaps(units: List[Unit], total: int) -> List[Unit]:
+    out: List[Unit] = []
+    line = 1
+    for start, end, kind, name in sorted(units):
+        if start < line:  # nested / overlapping match: keep the outer unit
+            continue
+        if start > line:
+            out.append((line, start - 1, "code", ""))
+        out.append((start, end, kind, name))
+        line = end + 1
+    if line <= total:
+        out.append((line, total, "code", ""))
+    return out
+
+
+def _pack(units: List[Unit], lines: List[str], max_lines: int, min_lines: int) -> List[Chunk]:
+    """Merge small neighbours up to ``max_lines``, split oversized units into windows."""
+    chunks: List[Chunk] = []
+    pending: List[Unit] = []
+
+    def flush() -> None:
+        if not pending:
+            return
+        start, end = pending[0][0], pending[-1][1]
+        named = [u for u in pending if u[3]]
+        kind, name = (named[0][2], ", ".join(u[3] for u in named)) if named else ("code", "")
+        text = "".join(lines[start - 1:end])
+        if text.strip():
+            chunks.append(Chunk(start, end, kind, name, text))
+        pending.clear()
+
+    for unit in units:
+        start, end, kind, name = unit
+        size = end - start + 1
+        if size > max_lines:
+            flush()
+            for lo in range(start, end + 1, max_lines):
+                hi = min(end, lo + max_lines - 1)
+                text = "".join(lines[lo - 1:hi])
+                if text.strip():
+                    chunks.append(Chunk(lo, hi, kind, name, text))
+            continue
+        if pending and (end - pending[0][0] + 1 > max_lines
+                        or (pending[-1][1] - pending[0][0] + 1 >= min_lines and kind != "code")):
+            flush()
+        pending.append(unit)
+    flush()
+    return chunks
+
+
+def chunk_text(text: str, language: str | None, max_lines: int = 80,
+               min_lines: int = 8) -> List[Chunk]:
+    lines = text.splitlines(keepends=True)
+    if not lines:
+        return []
+    units: List[Unit] | None = None
+    if language == "python":
+        units = _python_units(text, max_lines)
+    elif language in _BOUNDARIES:
+        units = _regex_units(lines, _BOUNDARIES[language])
+    if units is None:
+        # Unknown language (or unparsable source): paragraphs separated by blank lines.
+        units = []
+        start = None
+        for i, line in enumerate(lines, 1):
+            if line.strip():
+                start = start or i
+            elif start:
+                units.append((start, i - 1, "code", ""))
+                start = None
+        if start:
+            units.append((start, len(lines), "code", ""))
+    return _pack(_fill_gaps(units, len(lines)), lines, max_lines, min_lines)
+
+
+def outline(rel: str, language: str | None, chunks: List[Chunk], total_lines: int) -> str:
+    head = f"{rel} ({language or 'text'}, {total_lines} lines)"
+    return "\n".join([head] + [f"{c.kind} {c.name} L{c.start}-L{c.end}" for c in chunks if c.name])
+
+
+def parse_file(path: str, rel: str, known_sha: str | None, max_lines: int,
+               max_bytes: int) -> Dict[str, Any]:
+    """Hash and (if the content changed) chunk one file. Runs in a worker process."""
+    with open(path, "rb") as f:
+        data = f.read(max_bytes + 1)
+    sha = hashlib.sha256(data).hexdigest()
+    out: Dict[str, Any] = {"rel": rel, "sha256": sha, "size": len(data)}
+    if sha == known_sha:
+        out["unchanged"] = True
+        return out
+    if len(data) > max_bytes or b"\0" in data[:BINARY_SNIFF_BYTES]:
+        out["skipped"] = "binary" if len(data) <= max_bytes else "too_large"
+        return out
+    text = data.decode("utf-8", errors="replace")
+    language = detect_language(rel)
+    chunks = chunk_text(text, language, max_lines)
+    out.update(language=language, chunks=[tuple(c) for c in chunks],
+               outline=outline(rel, language, chunks, text.count("\n") + (not text.endswith("\n"))))
+    return out
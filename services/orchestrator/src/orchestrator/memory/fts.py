@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("orchestrator.memory")
+
+# (axis name, table, title column, body column, rowid code). SQLite packs the axis into the
+# FTS rowid (id * 4 + code) so trigger-side deletes are primary-key lookups.
+AXES = (
+    ("OntologyItem", "ontologyitem", "title", "body", 1),
+    ("ParsingItem", "parsingitem", "source", "content", 2),
+    ("VectorChunk", "vectorchunk", "source", "content", 3),
+)
+_AXIS_BY_CODE = {code: axis for axis, _t, _ti, _b, code in AXES}
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+HIGHLIGHT = ("<mark>", "</mark>")
+
+_backend: str | None = None  # "fts5" | "postgres" | None (fallback scan)
+
+
+def backend() -> str | None:
+    return _backend
+
+
+def _sqlite_ddl() -> List[str]:
+    stmts = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5("
+        "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    for _axis, table, title, body, code in AXES:
+        rowid = f"{{row}}.id * 4 + {code}"
+        insert = (f"INSERT INTO memory_fts(rowid, title, body) "
+                  f"VALUES ({rowid.format(row='new')}, new.{title}, new.{body}); END")
+        stmts += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert}",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM memory_fts WHERE rowid = {rowid.format(row='old')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {title}, {body} "
+            f"ON {table} BEGIN "
+            f"DELETE FROM memory_fts WHERE rowid = {rowid.format(row='old')}; {insert}",
+        ]
+    return stmts
+
+
+def _postgres_ddl() -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_fts_idx ON {table} USING GIN "
+        f"(to_tsvector('simple', coalesce({title}, '') || ' ' || coalesce({body}, '')))"
+        for _axis, table, title, body, _code in AXES
+    ]
+
+
+def ensure_index(engine: Engine) -> str | None:
+    """Create the full-text index (and sync triggers) for the engine's dialect."""
+    global _backend
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                existed = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_fts'")
+                ).first()
+                for stmt in _sqlite_ddl():
+                    conn.execute(text(stmt))
+                if not existed:
+                    for _axis, table, title, body, code in AXES:
+                        conn.execute(text(
+                            f"INSERT INTO memory_fts(rowid, title, body) "
+                            f"SELECT id * 4 + {code}, {title}, {body} FROM {table}"
+                        ))
+                _backend = "fts5"
+            elif dialect == "postgresql":
+                for stmt in _postgres_ddl():
+                    conn.execute(text(stmt))
+                _backend = "postgres"
+            else:
+                _backend = None
+    except OperationalError as e:  # e.g. SQLite built without FTS5
+        logger.warning("full-text index unavailable, falling back to scans: %s", e)
+        _backend = None
+    return _backend
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every token so user input can't inject FTS syntax; prefix-match for substring-like
+    # recall.
+    return " ".join(f'"{tok}"*' for tok in _TOKEN_RE.findall(query))
+
+
+def _postgres_search_sql() -> str:
+    # Rank and limit first; ts_headline re-parses the whole body, so it only runs on the top rows.
+    ranked = []
+    for axis, table, title, body, _code in AXES:
+        doc = f"to_tsvector('simple', coalesce({title}, '') || ' ' || coalesce({body}, ''))"
+        ranked.append(f"SELECT '{axis}' AS axis, id, ts_rank_cd({doc}, q) AS score "
+                      f"FROM {table}, websearch_to_tsquery('simple', :q) q WHERE {doc} @@ q")
+    joins = " ".join(f"LEFT JOIN {table} t{code} ON hits.axis = '{axis}' AND t{code}.id = hits.id"
+                     for axis, table, _title, _body, code in AXES)
+    bodies = ", ".join(f"t{code}.{body}" for _axis, _table, _title, body, code in AXES)
+    return (
+        "SELECT hits.axis, hits.id, hits.score, "
+        f"ts_headline('simple', coalesce({bodies}), websearch_to_tsquery('simple', :q), "
+        f"'StartSel={HIGHLIGHT[0]}, StopSel={HIGHLIGHT[1]}, MaxWords=40') AS snip "
+        f"FROM ({' UNION ALL '.join(ranked)} ORDER BY score DESC LIMIT :limit) hits {joins} "
+        "ORDER BY hits.score DESC"
+    )
+
+
+def search(engine: Engine, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """BM25-ranked (Postgres: ts_rank_cd) matches across all axes with highlighted snippets."""
+    if _backend == "fts5":
+        match = _fts5_query(query)
+        if not match:
+            return []
+        sql = text(
+            "SELECT rowid, bm25(memory_fts, 2.0, 1.0) AS score, "
+            f"snippet(memory_fts, -1, '{HIGHLIGHT[0]}', '{HIGHLIGHT[1]}', '…', 24) AS snip "
+            "FROM memory_fts WHERE memory_fts MATCH :q ORDER BY score LIMIT :limit"
+        )
+        with engine.connect() as conn:
+            rows = conn.execute(sql, {"q": match, "limit": limit}).all()
+        # bm25() is "lower is better"; flip the sign so higher scores rank first everywhere.
+        return [
+            {"axis": _AXIS_BY_CODE[rowid % 4], "id": rowid // 4, "score": -float(score),
+             "snippet": snip}
+            for rowid, score, snip in rows
+        ]
+    if _backend == "postgres":
+        if not _TOKEN_RE.search(query):
+            return []
+        sql = text(_postgres_search_sql())
+        with engine.connect() as conn:
+            rows = conn.execute(sql, {"q": query, "limit": limit}).all()
+        return [{"axis": a, "id": i, "score": float(sc), "snippet": sn} for a, i, sc, sn in rows]
+    raise RuntimeError("full-text index not available")
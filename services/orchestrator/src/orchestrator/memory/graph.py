@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger("orchestrator.memory")
+
+_PAGE = 50_000
+_DIRECTIONS = ("out", "in", "both")
+# (row pointers, column indices, uncompacted delta) for one direction of a relation.
+_Side = Tuple[np.ndarray, np.ndarray, Dict[int, List[int]]]
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row pointers and column indices of the ``src -> dst`` adjacency over ``n`` nodes."""
+    order = np.argsort(src, kind="stable")
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=ptr[1:])
+    return ptr, dst[order].astype(np.int32)
+
+
+def _gather(ptr: np.ndarray, idx: np.ndarray,
+            frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """All (neighbour, source) pairs of the frontier rows, without a Python loop."""
+    frontier = frontier[frontier < ptr.shape[0] - 1]  # nodes added after the last compaction
+    starts, lens = ptr[frontier], ptr[frontier + 1] - ptr[frontier]
+    total = int(lens.sum())
+    if not total:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    pos = np.arange(total) - np.repeat(np.cumsum(lens) - lens - starts, lens)
+    return idx[pos], np.repeat(frontier, lens).astype(np.int32)
+
+
+class _Relation:
+    """Edges of one relation: CSR in both directions plus an adjacency delta not yet compacted."""
+
+    def __init__(self, code: int):
+        self.code = code
+        self.src = np.empty(0, dtype=np.int32)
+        self.dst = np.empty(0, dtype=np.int32)
+        self.out_ptr = self.in_ptr = np.zeros(1, dtype=np.int64)
+        self.out_idx = self.in_idx = np.empty(0, dtype=np.int32)
+        self.pending: List[Tuple[int, int]] = []
+        self.out_delta: Dict[int, List[int]] = {}
+        self.in_delta: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return int(self.src.shape[0]) + len(self.pending)
+
+    def add(self, a: int, b: int) -> None:
+        self.pending.append((a, b))
+        self.out_delta.setdefault(a, []).append(b)
+        self.in_delta.setdefault(b, []).append(a)
+
+    def compact(self, n: int) -> None:
+        if self.pending:
+            extra = np.asarray(self.pending, dtype=np.int32)
+            self.src = np.concatenate([self.src, extra[:, 0]])
+            self.dst = np.concatenate([self.dst, extra[:, 1]])
+        self.out_ptr, self.out_idx = _csr(self.src, self.dst, n)
+        self.in_ptr, self.in_idx = _csr(self.dst, self.src, n)
+        self.pending, self.out_delta, self.in_delta = [], {}, {}
+
+    def sides(self, direction: str) -> Iterator[_Side]:
+        if direction in ("out", "both"):
+            yield self.out_ptr, self.out_idx, self.out_delta
+        if direction in ("in", "both"):
+            yield self.in_ptr, self.in_idx, self.in_delta
+
+
+class GraphIndex:
+    """In-memory adjacency over ``GraphEdge`` for k-hop expansion and shortest paths.
+
+    Item ids map to dense node numbers; each relation keeps CSR arrays for outgoing and incoming
+    edges. New rows (``GraphEdge.id`` above the last one loaded) land in a per-relation delta that
+    traversal reads alongside the CSR and that is folded in once it reaches ``GRAPH_COMPACT_EDGES``
+    or an eighth of the relation. Edges are append-only; ``generation = -1`` rebuilds from the
+    table.
+    """
+
+    def __init__(self) -> None:
+        self.generation = -1
+        self.last_id = 0
+        self.node_ids: List[int] = []
+        self.nodes: Dict[int, int] = {}  # item id -> dense node
+        self.relations: Dict[str, _Relation] = {}
+        self.counters = {"rebuilds": 0, "refreshes": 0, "compactions": 0, "queries": 0,
+                         "load_ms": 0.0}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self.relations.values())
+
+    # -- loading ----------------------------------------------------------------
+
+    def _node(self, item_id: int) -> int:
+        node = self.nodes.get(item_id)
+        if node is None:
+            node = self.nodes[item_id] = len(self.node_ids)
+            self.node_ids.append(item_id)
+        return node
+
+    def add_edges(self, edges: Iterable[Tuple[int, int, str]]) -> None:
+        """Add ``(src_id, dst_id, relation)`` edges without the table (benchmarks, tests)."""
+        with self._lock:
+            self._add(edges)
+
+    def _add(self, edges: Iterable[Tuple[int, int, str]]) -> None:
+        touched = set()
+        for src_id, dst_id, relation in edges:
+            rel = self.relations.get(relation)
+            if rel is None:
+                rel = self.relations[relation] = _Relation(len(self.relations))
+            rel.add(self._node(src_id), self._node(dst_id))
+            touched.add(rel)
+        n = len(self.node_ids)
+        for rel in touched:
+            if len(rel.pending) >= max(settings.graph_compact_edges, rel.src.shape[0] // 8):
+                rel.compact(n)
+                self.counters["compactions"] += 1
+
+    def ensure_current(self) -> None:
+        """Load edges written since the last call (everything on first use)."""
+        from . import store
+
+        if self.generation == store.generation("graph"):
+            return
+        with self._lock:
+            current = store.generation("graph")
+            if self.generation == current:
+                return
+            start = time.perf_counter()
+            full = self.generation < 0
+            if full:
+                self._load_all(store)
+            else:
+                while rows := store.graph_edges_after(self.last_id, _PAGE):
+                    self.last_id = rows[-1][0]
+                    self._add((a, b, r) for _, a, b, r in rows)
+            self.generation = current
+            self.counters["rebuilds" if full else "refreshes"] += 1
+            self.counters["load_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def _load_all(self, store: Any) -> None:
+        """Rebuild from the whole table with array operations instead of per-edge inserts."""
+        codes: Dict[str, int] = {}
+        src, dst, rel = [], [], []
+        self.last_id = 0
+        while rows := store.graph_edges_after(self.last_id, _PAGE):
+            self.last_id = rows[-1][0]
+            _, a, b, r = zip(*rows)
+            src.append(np.asarray(a, dtype=np.int64))
+            dst.append(np.asarray(b, dtype=np.int64))
+            rel.append(np.fromiter((codes.setdefault(x, len(codes)) for x in r), dtype=np.int16,
+                                   count=len(r)))
+        self.node_ids, self.nodes, self.relations = [], {}, {}
+        if not src:
+            return
+        ends = np.concatenate(src + dst)
+        uniq, dense = np.unique(ends, return_inverse=True)
+        dense = dense.astype(np.int32)
+        self.node_ids = uniq.tolist()
+        self.nodes = dict(zip(self.node_ids, range(len(self.node_ids))))
+        half = ends.shape[0] // 2
+        codes_arr = np.concatenate(rel)
+        for name, code in codes.items():
+            mask = codes_arr == code
+            relation = self.relations[name] = _Relation(code)
+            relation.src, relation.dst = dense[:half][mask], dense[half:][mask]
+            relation.compact(len(self.node_ids))
+
+    # -- traversal --------------------------------------------------------------
+
+    def _bfs(self, seeds: Sequence[int], hops: int, relations: Sequence[str] | None, direction: str,
+             target: int | None = None,
+             limit: int | None = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if direction not in _DIRECTIONS:
+            raise ValueError(f"direction must be one of {_DIRECTIONS}")
+        if relations:
+            rels = [self.relations[r] for r in relations if r in self.relations]
+        else:
+            rels = list(self.relations.values())
+        n = len(self.node_ids)
+        hop = np.full(n, -1, dtype=np.int32)
+        parent = np.full(n, -1, dtype=np.int32)
+        via = np.full(n, -1, dtype=np.int16)
+        frontier = np.unique(np.asarray([self.nodes[i] for i in seeds if i in self.nodes],
+                                        dtype=np.int32))
+        hop[frontier] = 0
+        reached = 0
+        for depth in range(1, hops + 1):
+            if (not frontier.size or (target is not None and hop[target] >= 0)
+                    or (limit and reached >= limit)):
+                break
+            found: List[Tuple[np.ndarray, np.ndarray, int]] = []
+            for rel in rels:
+                for ptr, idx, delta in rel.sides(direction):
+                    found.append((*_gather(ptr, idx, frontier), rel.code))
+                    if not delta:
+                        continue
+                    # Walk whichever is smaller: the delta or the frontier.
+                    pairs = ([(b, a) for a, bs in delta.items() if hop[a] == depth - 1 for b in bs]
+                             if len(delta) < frontier.size else
+                             [(b, a) for a in frontier.tolist() for b in delta.get(a, ())])
+                    if pairs:
+                        arr = np.asarray(pairs, dtype=np.int32)
+                        found.append((arr[:, 0], arr[:, 1], rel.code))
+            if not found:
+                break
+            nbrs = np.concatenate([f[0] for f in found])
+            srcs = np.concatenate([f[1] for f in found])
+            codes = np.concatenate([np.full(f[0].shape[0], f[2], dtype=np.int16) for f in found])
+            new = hop[nbrs] < 0
+            frontier, first = np.unique(nbrs[new], return_index=True)
+            hop[frontier] = depth
+            parent[frontier], via[frontier] = srcs[new][first], codes[new][first]
+            reached += int(frontier.size)
+        return hop, parent, via
+
+    def _names(self) -> Dict[int, str]:
+        return {rel.code: name for name, rel in self.relations.items()}
+
+    def neighbors(self, ids: Sequence[int], hops: int = 1, relations: Sequence[str] | None = None,
+                  direction: str = "out", limit: int | None = None) -> List[Dict[str, Any]]:
+        """Items within ``hops`` of ``ids`` (seeds excluded), nearest first, with the edge that
+        reached them."""
+        with self._lock:
+            self.counters["queries"] += 1
+            hop, parent, via = self._bfs(ids, min(hops, settings.graph_max_hops), relations,
+                                         direction, limit=limit)
+            found = np.flatnonzero(hop > 0)
+            found = found[np.lexsort((found, hop[found]))][:limit]
+            names = self._names()
+            return [{"id": self.node_ids[v], "hop": int(hop[v]), "relation": names[int(via[v])],
+                     "from": self.node_ids[parent[v]]} for v in found.tolist()]
+
+    def shortest_path(self, src_id: int, dst_id: int, relations: Sequence[str] | None = None,
+                      direction: str = "out",
+                      max_hops: int | None = None) -> List[Dict[str, Any]] | None:
+        """Fewest-edge path as ``[{id, relation}]`` (``relation`` is the edge into that item), or
+        None."""
+        with self._lock:
+            self.counters["queries"] += 1
+            if src_id not in self.nodes or dst_id not in self.nodes:
+                return None
+            target = self.nodes[dst_id]
+            hops = min(max_hops or settings.graph_max_hops, settings.graph_max_hops)
+            hop, parent, via = self._bfs([src_id], hops, relations, direction, target=target)
+            if hop[target] < 0:
+                return None
+            names, path, node = self._names(), [], target
+            while hop[node] > 0:
+                path.append({"id": self.node_ids[node], "relation": names[int(via[node])]})
+                node = int(parent[node])
+            path.append({"id": src_id, "relation": None})
+            return path[::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self.node_ids),
+            "edges": len(self),
+            "pending": sum(len(r.pending) for r in self.relations.values()),
+            "relations": {name: len(rel) for name, rel in self.relations.items()},
+            "generation": self.generation,
+            **self.counters,
+        }
+
+
+graph_index = GraphIndex()
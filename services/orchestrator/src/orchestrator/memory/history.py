@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from ..config import settings
+from . import store
+from .writer import db_writer
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token) plus per-message framing overhead."""
+    return (len(text) + 3) // 4 + 4
+
+
+class _SessionState:
+    __slots__ = ("messages", "prefix", "lock")
+
+    def __init__(self) -> None:
+        self.messages: List[Dict[str, str]] = []
+        # prefix[i] = token count of every message before messages[i]; appended once per message,
+        # never recomputed. prefix[0] counts the tokens of messages already trimmed off the front.
+        self.prefix: List[int] = [0]
+        self.lock = asyncio.Lock()
+
+    def add(self, role: str, content: str, keep_tokens: int) -> None:
+        self.messages.append({"role": role, "content": content})
+        self.prefix.append(self.prefix[-1] + count_tokens(content))
+        # Drop messages no budget can reach once they are half the list (amortised O(1)).
+        drop = min(bisect_left(self.prefix, self.prefix[-1] - keep_tokens), len(self.messages) - 1)
+        if drop and drop * 2 >= len(self.messages):
+            del self.messages[:drop]
+            del self.prefix[:drop]
+
+    def window(self, budget: int) -> Tuple[List[Dict[str, str]], int]:
+        if not self.messages:
+            return [], 0
+        total = self.prefix[-1]
+        start = min(bisect_left(self.prefix, total - budget), len(self.messages) - 1)
+        return self.messages[start:], total - self.prefix[start]
+
+
+class SessionHistory:
+    """In-process LRU of hot conversation histories backed by the Message table.
+
+    A session is read from the DB once; afterwards turns only append. Context assembly
+    uses cached prefix sums of per-message token counts, so the cost per turn is
+    O(log n) plus copying the messages that fit the budget. Only the last
+    ``CONTEXT_TOKEN_BUDGET`` tokens of a session are kept in memory.
+    """
+
+    def __init__(self, max_sessions: int | None = None):
+        self.max_sessions = max_sessions or settings.session_cache_size
+        self._sessions: "OrderedDict[int, _SessionState]" = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+
+    @staticmethod
+    def _load(session_id: int) -> List[Tuple[str, str]]:
+        store.ensure_session(session_id)
+        return store.load_session_messages(session_id)
+
+    async def _state(self, session_id: int) -> _SessionState:
+        state = self._sessions.get(session_id)
+        if state is not None:
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return state
+        # Rows for an evicted session may still be queued; make them visible first.
+        await db_writer.flush()
+        rows = await asyncio.to_thread(self._load, session_id)
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = _SessionState()
+            for role, content in rows:
+                state.add(role, content, settings.context_token_budget)
+            self._sessions[session_id] = state
+            self.loads += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return state
+
+    async def append(self, session_id: int, role: str, content: str) -> None:
+        state = await self._state(session_id)
+        async with state.lock:
+            state.add(role, content, settings.context_token_budget)
+        if db_writer.running:
+            store.queue_message(session_id, role, {"content": content})
+        else:
+            await asyncio.to_thread(store.add_message, session_id, role, {"content": content})
+
+    async def context(self, session_id: int,
+                      budget: int | None = None) -> Tuple[List[Dict[str, str]], int]:
+        """Most recent messages whose combined token estimate fits ``budget`` (at least one), and
+        that estimate. ``budget`` is capped at ``CONTEXT_TOKEN_BUDGET``."""
+        cap = settings.context_token_budget
+        state = await self._state(session_id)
+        return state.window(min(budget or cap, cap))
+
+    def evict(self, session_id: int) -> None:
+        self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self._sessions), "hits": self.hits, "loads": self.loads}
+
+
+session_history = SessionHistory()
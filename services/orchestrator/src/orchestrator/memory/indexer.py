@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Tuple
+
+import pathspec
+from sqlmodel import Session, delete, select
+
+from ..config import settings
+from . import models, store
+from .chunking import parse_file
+
+logger = logging.getLogger("orchestrator.memory")
+
+# Below this many changed files, starting worker processes costs more than it saves.
+INLINE_MAX_FILES = 16
+
+Progress = Callable[[Dict[str, Any]], None]
+FileEntry = Tuple[str, str, int, int]  # (absolute path, path relative to the base, size, mtime_ns)
+
+
+def resolve_root(path: str | None) -> Tuple[str, str]:
+    """(base, root): the allowlisted base and the directory (or file) to index under it."""
+    base = os.path.realpath(settings.allow_fs_base)
+    root = os.path.realpath(os.path.join(base, path or ""))
+    if root != base and not root.startswith(base + os.sep):
+        raise PermissionError("Path outside allowlist")
+    return base, root
+
+
+class IgnoreRules:
+    """.gitignore files from the base down; like git, the deepest file with a matching pattern
+    decides."""
+
+    def __init__(self, base: str, exclude: Iterable[str]):
+        self.base = base
+        self.exclude = frozenset(exclude)
+        self._specs: Dict[str, pathspec.GitIgnoreSpec | None] = {}
+
+    def _spec(self, rel_dir: str) -> pathspec.GitIgnoreSpec | None:
+        if rel_dir not in self._specs:
+            lines: List[str] = []
+            sources = [os.path.join(self.base, rel_dir, ".gitignore")]
+            if not rel_dir:
+                sources.append(os.path.join(self.base, ".git", "info", "exclude"))
+            for src in sources:
+                try:
+                    with open(src, encoding="utf-8", errors="replace") as f:
+                        lines += f.read().splitlines()
+                except OSError:
+                    pass
+            self._specs[rel_dir] = pathspec.GitIgnoreSpec.from_lines(lines) if lines else None
+        return self._specs[rel_dir]
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        parts = rel.split("/")
+        if parts[-1] in self.exclude:
+            return True
+        for depth in range(len(parts) - 1, -1, -1):
+            spec = self._spec("/".join(parts[:depth]))
+            if spec is None:
+                continue
+            result = spec.check_file("/".join(parts[depth:]) + ("/" if is_dir else ""))
+            if result.include is not None:
+                return result.include
+        return False
+
+
+def walk(base: str, root: str, rules: IgnoreRules) -> List[FileEntry]:
+    if os.path.isfile(root):
+        st = os.stat(root)
+        rel = os.path.relpath(root, base).replace(os.sep, "/")
+        return [(root, rel, st.st_size, st.st_mtime_ns)]
+    out: List[FileEntry] = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = os.path.relpath(entry.path, base).replace(os.sep, "/")
+                try:
+                    if entry.is_symlink():
+                        continue
+                    is_dir = entry.is_dir()
+                    if rules.ignored(rel, is_dir):
+                        continue
+                    if is_dir:
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        out.append((entry.path, rel, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    continue
+    return out
+
+
+def _known(rel_root: str) -> Dict[str, models.IndexedFile]:
+    stmt = select(models.IndexedFile)
+    if rel_root != ".":
+        # Range scan on the path index: "a/b" itself plus everything in "a/b/" ("0" sorts right
+        # after "/").
+        path = models.IndexedFile.path
+        stmt = stmt.where(((path >= rel_root + "/") & (path < rel_root + "0")) | (path == rel_root))
+    with Session(store.get_engine(), expire_on_commit=False) as s:
+        return {row.path: row for row in s.exec(stmt).all()}
+
+
+def _drop_rows(s: Session, row: models.IndexedFile) -> int:
+    parsing, chunks = json.loads(row.parsing_ids), json.loads(row.chunk_ids)
+    if parsing:
+        s.exec(delete(models.ParsingItem).where(models.ParsingItem.id.in_(parsing)))  # type: ignore[union-attr]
+    if chunks:
+        s.exec(delete(models.VectorChunk).where(models.VectorChunk.id.in_(chunks)))  # type: ignore[union-attr]
+    return len(chunks)
+
+
+def _apply(results: List[Dict[str, Any]], known: Dict[str, models.IndexedFile],
+           stat: Dict[str, FileEntry]) -> Dict[str, int]:
+    """Write one batch of parse results in a single transaction."""
+    counts = {"changed": 0, "unchanged": 0, "skipped": 0, "chunks_added": 0, "chunks_removed": 0}
+    with Session(store.get_engine(), expire_on_commit=False) as s:
+        for res in results:
+            rel = res["rel"]
+            _path, _rel, size, mtime_ns = stat[rel]
+            row = known.get(rel)
+            if res.get("unchanged"):
+                counts["unchanged"] += 1
+                if row is not None:
+                    row.size, row.mtime_ns = size, mtime_ns
+                    known[rel] = s.merge(row)
+                continue
+            if row is not None:
+                counts["chunks_removed"] += _drop_rows(s, row)
+            row = row or models.IndexedFile(path=rel, sha256="", size=0, mtime_ns=0)
+            row.sha256, row.language = res["sha256"], res.get("language")
+            row.size, row.mtime_ns = size, mtime_ns
+            row.indexed_at = models._utcnow()
+            if res.get("skipped"):
+                # Binary / oversized: remember the hash so the file is not re-read until it changes.
+                counts["skipped"] += 1
+                row.parsing_ids = row.chunk_ids = "[]"
+                known[rel] = s.merge(row)
+                continue
+            parsing = models.ParsingItem(source=rel, content=res["outline"])
+            chunks = [models.VectorChunk(source=f"{rel}#L{start}-L{end}", content=text)
+                      for start, end, _kind, _name, text in res["chunks"]]
+            s.add(parsing)
+            s.add_all(chunks)
+            s.flush()
+            row.parsing_ids = json.dumps([parsing.id])
+            row.chunk_ids = json.dumps([c.id for c in chunks])
+            known[rel] = s.merge(row)
+            counts["changed"] += 1
+            counts["chunks_added"] += len(chunks)
+        s.commit()
+    return counts
+
+
+def _remove(rows: List[models.IndexedFile]) -> int:
+    removed = 0
+    with Session(store.get_engine()) as s:
+        for row in rows:
+            removed += _drop_rows(s, row)
+            s.exec(delete(models.IndexedFile).where(models.IndexedFile.id == row.id))  # type: ignore[arg-type]
+        s.commit()
+    return removed
+
+
+async def index_tree(path: str | None = None, progress: Progress | None = None) -> Dict[str, Any]:
+    """Bring ParsingItem/VectorChunk in line with the files under ``path`` (relative to
+    ALLOW_FS_BASE).
+
+    Files whose size and mtime are unchanged are not read; the rest are hashed, and only those
+    whose content hash changed are re-chunked. Rows of deleted or newly ignored files are removed.
+    """
+    start = time.perf_counter()
+    emit = progress or (lambda _evt: None)
+    base, root = resolve_root(path)
+    rel_root = os.path.relpath(root, base).replace(os.sep, "/")
+    files = await asyncio.to_thread(walk, base, root, IgnoreRules(base, settings.index_exclude))
+    known = await asyncio.to_thread(_known, rel_root)
+    stat = {entry[1]: entry for entry in files}
+    todo = [entry for entry in files if (row := known.get(entry[1])) is None
+            or (row.size, row.mtime_ns) != (entry[2], entry[3])]
+    summary: Dict[str, Any] = {
+        "root": root, "files": len(files), "candidates": len(todo), "changed": 0, "unchanged": 0,
+        "skipped": 0, "errors": 0, "removed": 0, "chunks_added": 0, "chunks_removed": 0,
+        "workers": 0,
+    }
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - start) * 1000, 2)
+
+    emit({"phase": "scan", "files": len(files), "candidates": len(todo), "ms": elapsed_ms()})
+
+    loop = asyncio.get_running_loop()
+    pool = None
+    if len(todo) > INLINE_MAX_FILES and settings.index_workers > 1:
+        # spawn: workers import only the chunking module, and forking a threaded server is unsafe.
+        pool = ProcessPoolExecutor(settings.index_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        summary["workers"] = settings.index_workers
+    done = 0
+    try:
+        futures = [
+            loop.run_in_executor(pool, parse_file, abs_path, rel,
+                                 known[rel].sha256 if rel in known else None,
+                                 settings.index_chunk_lines, settings.index_max_file_bytes)
+            for abs_path, rel, _size, _mtime in todo
+        ]
+        batch: List[Dict[str, Any]] = []
+        for fut in asyncio.as_completed(futures):
+            try:
+                batch.append(await fut)
+            except OSError as e:  # vanished or unreadable since the walk: keep what was indexed
+                summary["errors"] += 1
+                logger.warning("index_read_failed", extra={"error": str(e)})
+            done += 1
+            if len(batch) >= settings.index_batch_files or done == len(futures):
+                counts = await asyncio.to_thread(_apply, batch, known, stat)
+                for key, value in counts.items():
+                    summary[key] += value
+                batch = []
+                emit({"phase": "parse", "done": done, "total": len(todo),
+                      "changed": summary["changed"], "chunks_added": summary["chunks_added"],
+                      "ms": elapsed_ms()})
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    stale = [row for rel, row in known.items() if rel not in stat]
+    if stale:
+        summary["chunks_removed"] += await asyncio.to_thread(_remove, stale)
+        summary["removed"] = len(stale)
+        emit({"phase": "remove", "removed": len(stale), "ms": elapsed_ms()})
+    if summary["changed"] or summary["removed"] or summary["chunks_removed"]:
+        store._bump_generation("parsing")
+        store._bump_generation("vector")
+    summary["ms"] = elapsed_ms()
+    logger.info("index_tree", extra={k: v for k, v in summary.items() if k != "root"})
+    return summary
+
+
+@dataclass
+class IndexJob:
+    id: str
+    root: str
+    status: str = "running"
+    result: Dict[str, Any] | None = None
+    error: str | None = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    started: float = field(default_factory=time.time)
+    task: asyncio.Task[Any] | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def emit(self, evt: Dict[str, Any]) -> None:
+        self.events.append({"type": "index_progress", "job": self.id, "seq": len(self.events),
+                            **evt})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Replay events from ``after``, then follow the live ones until the job ends."""
+        i = after
+        while True:
+            while i < len(self.events):
+                yield self.events[i]
+                i += 1
+            if self.status != "running":
+                return
+            await self._changed.wait()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"job": self.id, "root": self.root, "status": self.status, "started": self.started,
+                "events": len(self.events), "progress": self.events[-1] if self.events else None,
+                "result": self.result, "error": self.error}
+
+
+class RepoIndexer:
+    """Background index jobs; at most one running job per root, later requests join it."""
+
+    def __init__(self, keep: int = 32):
+        self.jobs: "OrderedDict[str, IndexJob]" = OrderedDict()
+        self.keep = keep
+
+    def start(self, path: str | None = None) -> IndexJob:
+        _base, root = resolve_root(path)
+        for job in self.jobs.values():
+            if job.root == root and job.status == "running":
+                return job
+        job = IndexJob(uuid.uuid4().hex[:12], root)
+        job.task = asyncio.create_task(self._run(job, path))
+        self.jobs[job.id] = job
+        finished = [j for j in self.jobs.values() if j.status != "running"]
+        for old in finished[:max(0, len(self.jobs) - self.keep)]:
+            del self.jobs[old.id]
+        return job
+
+    async def _run(self, job: IndexJob, path: str | None) -> None:
+        try:
+            job.result = await index_tree(path, job.emit)
+            if settings.index_embed and job.result["chunks_added"]:
+                from ..embeddings.pipeline import embedding_pipeline
+
+                job.result["embeddings"] = await embedding_pipeline.embed_pending(progress=job.emit)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:  # noqa: BLE001 - reported through the job
+            logger.exception("index job %s failed", job.id)
+            job.status, job.error = "failed", str(e) or type(e).__name__
+        finally:
+            job.emit({"phase": "done", "status": job.status, "result": job.result,
+                      "error": job.error})
+
+    def get(self, job_id: str) -> IndexJob:
+        return self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        tasks = [j.task for j in self.jobs.values() if j.task is not None and not j.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+repo_indexer = RepoIndexer()
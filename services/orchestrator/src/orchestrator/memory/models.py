@@ -1,7 +1,15 @@
 from __future__ import annotations
-from datetime import datetime
+
+from datetime import datetime, timezone
 from typing import Optional
-from sqlmodel import SQLModel, Field
+
+from sqlmodel import Field, SQLModel
+
+
+def _utcnow() -> datetime:
+    # SQLModel maps datetime fields to UTCDateTime, which rejects naive values on write and
+    # reads rows stored naive by older releases back as UTC, so existing data needs no change.
+    return datetime.now(timezone.utc)
 
 
 class OntologyItem(SQLModel, table=True):
@@ -10,24 +18,48 @@ class OntologyItem(SQLModel, table=True):
     title: str
     body: str
     tags: str | None = None  # JSON string
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
 
 
 class ParsingItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     source: str = Field(index=True)
     content: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
 
 
 class VectorChunk(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     source: str = Field(index=True)
     content: str
-    embedding: str | None = None  # JSON list
+    embedding: bytes | None = None  # packed little-endian float32 (see vector_index.pack_vector)
     dim: int | None = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+
+
+class IndexedFile(SQLModel, table=True):
+    """Repository indexer state: one row per indexed file and the rows it produced."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    path: str = Field(index=True, unique=True)  # relative to ALLOW_FS_BASE
+    sha256: str
+    size: int
+    mtime_ns: int
+    language: str | None = None
+    parsing_ids: str = "[]"  # JSON list of ParsingItem ids
+    chunk_ids: str = "[]"  # JSON list of VectorChunk ids
+    indexed_at: datetime = Field(default_factory=_utcnow)
+
+
+class StreamLog(SQLModel, table=True):
+    """Buffered events of a finished /chat/stream, kept for Last-Event-ID replay
+    (SSE_REPLAY_SPILL)."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    stream_id: str = Field(index=True, unique=True)
+    events_json: str  # JSON list of [seq, event]
+    created_at: datetime = Field(default_factory=_utcnow, index=True)
 
 
 class GraphEdge(SQLModel, table=True):
@@ -35,14 +67,14 @@ class GraphEdge(SQLModel, table=True):
     src_id: int
     dst_id: int
     relation: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
 
 
 class Session(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str | None = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    last_activity: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    last_activity: datetime = Field(default_factory=_utcnow)
 
 
 class Message(SQLModel, table=True):
@@ -50,7 +82,7 @@ class Message(SQLModel, table=True):
     session_id: int = Field(index=True)
     role: str
     content_json: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
 
 
 class ToolExecution(SQLModel, table=True):
@@ -60,5 +92,5 @@ class ToolExecution(SQLModel, table=True):
     input_json: str
     output_json: str | None = None
     status: str = Field(default="completed")
-    started_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime = Field(default_factory=_utcnow)
     finished_at: datetime | None = None
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..core.metrics import RETRIEVAL_AXIS
+from . import store
+from .vector_index import vector_index
+
+logger = logging.getLogger("orchestrator.memory")
+
+AXES = ("lexical", "vector", "ontology")
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# A ranked hit: ((table axis, row id), snippet). Ranks are list positions, best first.
+Hit = Tuple[Tuple[str, int], str]
+
+
+def _terms(query: str) -> List[str]:
+    return list(dict.fromkeys(t.lower() for t in _TERM_RE.findall(query)))
+
+
+def _ontology_score(terms: Sequence[str], key: str, tags: str | None) -> int:
+    key = key.lower()
+    try:
+        tag_set = [str(t).lower() for t in json.loads(tags or "[]")]
+    except ValueError:
+        tag_set = []
+    score = 0
+    for term in terms:
+        score += 4 if key == term else 2 if key.startswith(term) else 0
+        score += sum(3 if tag == term else 1 for tag in tag_set if tag.startswith(term))
+    return score
+
+
+def reciprocal_rank_fusion(ranked: Dict[str, List[Hit]], limit: int,
+                           k: int = 60) -> List[Dict[str, Any]]:
+    """Fuse per-axis rankings: score(doc) = sum over axes of 1 / (k + rank), rank starting at 1.
+
+    Candidates are already capped per axis; only the best ``limit`` survive the heap.
+    """
+    fused: Dict[Tuple[str, int], List[Any]] = {}  # doc -> [score, ranks, snippet]
+    for axis, hits in ranked.items():
+        for rank, (doc, snippet) in enumerate(hits, 1):
+            entry = fused.setdefault(doc, [0.0, {}, snippet])
+            entry[0] += 1.0 / (k + rank)
+            entry[1][axis] = rank
+    top = heapq.nlargest(limit, fused.items(),
+                         key=lambda item: (item[1][0], -min(item[1][1].values())))
+    return [{"axis": doc[0], "id": doc[1], "score": round(score, 6), "ranks": ranks,
+             "snippet": snippet}
+            for doc, (score, ranks, snippet) in top]
+
+
+class HybridRetriever:
+    """Runs the lexical (full-text), vector (embedded query) and ontology (key/tag) axes
+    concurrently and fuses them with reciprocal rank fusion. Each axis returns at most
+    ``limit * RETRIEVAL_FANOUT`` hits and is given ``RETRIEVAL_AXIS_TIMEOUT_S``; a slow or failing
+    axis is reported in ``errors`` and simply contributes nothing."""
+
+    def _lexical(self, query: str, n: int) -> List[Hit]:
+        return [((r["axis"], r["id"]), r["snippet"]) for r in store.simple_lexical_search(query, n)]
+
+    def _ontology(self, query: str, n: int) -> List[Hit]:
+        terms = _terms(query)
+        if not terms:
+            return []
+        scored = ((_ontology_score(terms, key, tags), rid, body)
+                  for rid, key, tags, body in store.ontology_by_terms(terms))
+        return [(("OntologyItem", rid), body[:400])
+                for score, rid, body in heapq.nlargest(n, scored) if score]
+
+    async def _vector(self, query: str, n: int, vector: Sequence[float] | None) -> List[Hit]:
+        await asyncio.to_thread(vector_index.ensure_current)
+        if not len(vector_index):
+            return []  # nothing to match: don't pay for embedding the query
+        if vector is None:
+            from ..embeddings.pipeline import embedding_pipeline
+
+            query_vector = (await embedding_pipeline.embed([query]))[0]
+        else:
+            query_vector = np.asarray(vector, dtype=np.float32)
+
+        def _search() -> List[Hit]:
+            hits = vector_index.search(query_vector, k=n)
+            rows = store.get_vector_chunks([i for i, _ in hits])
+            return [(("VectorChunk", i), rows[i].content[:400]) for i, _ in hits if i in rows]
+
+        return await asyncio.to_thread(_search)
+
+    async def _timed(self, axis: str, work: Awaitable[List[Hit]], timings: Dict[str, float],
+                     errors: Dict[str, str]) -> List[Hit]:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            hits = await asyncio.wait_for(work, settings.retrieval_axis_timeout_s)
+            status = "ok"
+            return hits
+        except asyncio.TimeoutError:
+            status = "timeout"
+            errors[axis] = "timeout"
+        except Exception as e:  # noqa: BLE001 - one axis failing must not fail the search
+            errors[axis] = str(e) or type(e).__name__
+            logger.warning("retrieval axis %s failed: %s", axis, errors[axis])
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[axis] = round(elapsed * 1000, 3)
+            RETRIEVAL_AXIS.labels(axis, status).observe(elapsed)
+        return []
+
+    async def search(self, query: str, limit: int = 10, axes: Sequence[str] | None = None,
+                     vector: Sequence[float] | None = None) -> Dict[str, Any]:
+        axes = list(axes or settings.retrieval_axes)
+        unknown = set(axes) - set(AXES)
+        if unknown:
+            raise ValueError(f"Unknown retrieval axes {sorted(unknown)}; expected {list(AXES)}")
+        n = max(1, limit * settings.retrieval_fanout)
+        work: Dict[str, Callable[[], Awaitable[List[Hit]]]] = {
+            "lexical": lambda: asyncio.to_thread(self._lexical, query, n),
+            "vector": lambda: self._vector(query, n, vector),
+            "ontology": lambda: asyncio.to_thread(self._ontology, query, n),
+        }
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        start = time.perf_counter()
+        ranked = await asyncio.gather(*(self._timed(a, work[a](), timings, errors) for a in axes))
+        fuse_start = time.perf_counter()
+        results = reciprocal_rank_fusion(dict(zip(axes, ranked)), limit, settings.retrieval_rrf_k)
+        end = time.perf_counter()
+        timings.update(fuse=round((end - fuse_start) * 1000, 3),
+                       total=round((end - start) * 1000, 3))
+        return {"query": query, "results": results,
+                "candidates": {a: len(h) for a, h in zip(axes, ranked)},
+                "timings_ms": timings, "errors": errors}
+
+
+hybrid_retriever = HybridRetriever()
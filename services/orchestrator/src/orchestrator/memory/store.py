@@ -1,27 +1,149 @@
 from __future__ import annotations
-from sqlmodel import SQLModel, Session, create_engine, select
+
+import heapq
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import (
+    LargeBinary,
+    String,
+    bindparam,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    or_,
+    text,
+    update,
+)
+from sqlmodel import Session, SQLModel, create_engine, select
+
 from ..config import settings
-from . import models
-import json, os
-from typing import List, Dict
+from ..core.metrics import DB_WRITE
+from . import fts, models
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from datetime import datetime
+
+    from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("orchestrator.memory")
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+# PRAGMA user_version once legacy JSON embeddings are converted (SQLite).
+_SCHEMA_VERSION = 1
+_MIGRATE_PAGE = 1000
+# Per-axis write counters; bumped on every write that can change search results
+# (used as cache validators and to detect a stale vector index).
+_generations: Dict[str, int] = {}
+
+
+def generation(axis: str | None = None) -> int:
+    if axis is None:
+        return sum(_generations.values())
+    return _generations.get(axis, 0)
+
 
-_engine = None
+def _bump_generation(axis: str) -> None:
+    _generations[axis] = _generations.get(axis, 0) + 1
 
 
-def get_engine():
+def get_engine() -> Engine:
     global _engine
     if _engine is None:
-        url = settings.database_url or "sqlite:///./data/orchestrator.db"
-        if url.startswith("sqlite"):
-            os.makedirs("data", exist_ok=True)
-        _engine = create_engine(url, echo=False)
-        SQLModel.metadata.create_all(_engine)
+        # The writer thread and to_thread callers can race to create it (and its tables).
+        with _engine_lock:
+            if _engine is None:
+                url = settings.database_url or "sqlite:///./data/orchestrator.db"
+                if url.startswith("sqlite:///") and url != "sqlite:///:memory:":
+                    os.makedirs(os.path.dirname(url[len("sqlite:///"):]) or ".", exist_ok=True)
+                engine = create_engine(url, echo=False)
+                if url.startswith("sqlite"):
+                    event.listen(engine, "connect", _sqlite_pragmas)
+                SQLModel.metadata.create_all(engine)
+                _migrate_legacy_embeddings(engine)
+                fts.ensure_index(engine)
+                _engine = engine
     return _engine
 
 
-def add_message(session_id: int, role: str, content: Dict):
+def _migrate_legacy_embeddings(engine: Engine) -> None:
+    """Rewrite ``VectorChunk.embedding`` values stored by older releases as JSON-list text.
+
+    Runs once per database: SQLite records it in ``PRAGMA user_version``, other dialects by the
+    column type. Rows are converted a page at a time; unparsable values are cleared and counted
+    as skipped.
+    """
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            if conn.execute(text("PRAGMA user_version")).scalar_one() >= _SCHEMA_VERSION:
+                return
+        # Column affinity lets the old VARCHAR column hold blobs; only the values change.
+        source = "embedding"
+        legacy = "typeof(embedding) = 'text'"
+    else:
+        columns = {c["name"]: c["type"] for c in inspect(engine).get_columns("vectorchunk")}
+        source = "embedding_json"
+        if isinstance(columns.get("embedding"), String):
+            blob = LargeBinary().compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE vectorchunk RENAME COLUMN embedding TO {source}"))
+                conn.execute(text(f"ALTER TABLE vectorchunk ADD COLUMN embedding {blob}"))
+        elif source not in columns:  # never legacy, or a previous run finished
+            return
+        legacy = f"{source} IS NOT NULL"
+    from .vector_index import pack_vector
+
+    migrated = skipped = 0
+    after = 0
+    while True:
+        # Keyset pages keep memory flat and let an interrupted run resume where it stopped.
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(f"SELECT id, {source} FROM vectorchunk WHERE {legacy} AND id > :after "
+                     f"ORDER BY id LIMIT {_MIGRATE_PAGE}"), {"after": after}).all()
+            if not rows:
+                break
+            after = rows[-1][0]
+            params = []
+            for rid, raw in rows:
+                try:
+                    vec = json.loads(raw)
+                    params.append({"rid": rid, "blob": pack_vector(vec), "size": len(vec)})
+                    migrated += 1
+                except (TypeError, ValueError):
+                    # Unreadable: drop the vector rather than fail every later index build.
+                    params.append({"rid": rid, "blob": None, "size": None})
+                    skipped += 1
+            conn.execute(text("UPDATE vectorchunk SET embedding = :blob, dim = :size "
+                              "WHERE id = :rid"), params)
+    with engine.begin() as conn:
+        if source != "embedding":
+            conn.execute(text(f"ALTER TABLE vectorchunk DROP COLUMN {source}"))
+        else:
+            conn.execute(text(f"PRAGMA user_version = {_SCHEMA_VERSION}"))
+    if migrated or skipped:
+        logger.info("embeddings_migrated", extra={"rows": migrated, "skipped": skipped})
+
+
+def _sqlite_pragmas(dbapi_conn: Any, _record: Any) -> None:
+    # WAL lets readers proceed while the background writer commits.
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+def add_message(session_id: int, role: str, content: Dict[str, Any]) -> int | None:
     eng = get_engine()
-    with Session(eng) as s:
+    with DB_WRITE.labels("message").time(), Session(eng) as s:
         msg = models.Message(session_id=session_id, role=role, content_json=json.dumps(content))
         s.add(msg)
         s.commit()
@@ -29,31 +151,238 @@ def add_message(session_id: int, role: str, content: Dict):
         return msg.id
 
 
-def add_ontology_item(key: str, title: str, body: str, tags: List[str] | None = None):
+def ensure_session(session_id: int) -> None:
+    eng = get_engine()
+    with Session(eng) as s:
+        if s.get(models.Session, session_id) is None:
+            s.add(models.Session(id=session_id))
+            s.commit()
+
+
+def load_session_messages(session_id: int) -> List[Tuple[str, str]]:
+    """(role, content) pairs for a session in insertion order."""
     eng = get_engine()
     with Session(eng) as s:
+        stmt = select(models.Message.role, models.Message.content_json).where(
+            models.Message.session_id == session_id
+        ).order_by(models.Message.id)  # type: ignore[arg-type]
+        return [(role, json.loads(raw).get("content", "")) for role, raw in s.exec(stmt)]
+
+
+def queue_message(session_id: int, role: str, content: Dict[str, Any]) -> Future[Any]:
+    """Non-blocking insert through the background writer (see memory/writer.py)."""
+    from .writer import db_writer
+
+    return db_writer.submit(models.Message(session_id=session_id, role=role,
+                                           content_json=json.dumps(content)))
+
+
+def queue_tool_execution(
+    tool_name: str,
+    params: Dict[str, Any],
+    output: Any,
+    status: str,
+    started_at: datetime,
+    finished_at: datetime,
+    message_id: int | None = None,
+) -> Future[Any]:
+    from .writer import db_writer
+
+    def build() -> models.ToolExecution:
+        # Runs on the writer thread: tool output can be large, keep json.dumps off the loop.
+        return models.ToolExecution(
+            message_id=message_id,
+            tool_name=tool_name,
+            input_json=json.dumps(params, default=str),
+            output_json=json.dumps(output, default=str) if output is not None else None,
+            status=status,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+
+    return db_writer.submit(build)
+
+
+def add_ontology_item(key: str, title: str, body: str,
+                      tags: List[str] | None = None) -> int | None:
+    eng = get_engine()
+    with DB_WRITE.labels("ontology_item").time(), Session(eng) as s:
         item = models.OntologyItem(key=key, title=title, body=body, tags=json.dumps(tags or []))
         s.add(item)
         s.commit()
         s.refresh(item)
+        _bump_generation("ontology")
         return item.id
 
 
-def simple_lexical_search(query: str, limit: int = 5) -> List[Dict]:
+def get_ontology_items(ids: Sequence[int]) -> Dict[int, models.OntologyItem]:
+    if not ids:
+        return {}
+    eng = get_engine()
+    with Session(eng) as s:
+        id_col = models.OntologyItem.id
+        rows = s.exec(select(models.OntologyItem).where(id_col.in_(list(ids)))).all()  # type: ignore[union-attr]
+        return {r.id: r for r in rows if r.id is not None}
+
+
+def ontology_by_terms(terms: Sequence[str], limit: int = 500) -> List[Tuple[Any, ...]]:
+    """(id, key, tags, body) of items whose key, or one of whose tags, starts with one of
+    ``terms``, best matches first."""
+    if not terms:
+        return []
+    e = models.OntologyItem
+    key, tags = func.lower(e.key), func.lower(e.tags)
+    conds = []
+    rank: Any = 0
+    for term in terms:
+        term = term.lower()
+        key_prefix = key.startswith(term, autoescape=True)
+        tag_prefix = tags.contains(f'"{term}', autoescape=True)
+        conds += [key_prefix, tag_prefix]
+        # Same weights as retrieval._ontology_score, so the limit keeps the best-scoring rows.
+        rank = (rank + case((key == term, 4), (key_prefix, 2), else_=0)
+                + case((tags.contains(f'"{term}"', autoescape=True), 3), (tag_prefix, 1), else_=0))
+    stmt = (select(e.id, e.key, e.tags, e.body).where(or_(*conds))
+            .order_by(rank.desc(), e.id).limit(limit))  # type: ignore[arg-type]
     eng = get_engine()
-    out: List[Dict] = []
     with Session(eng) as s:
+        return list(s.exec(stmt))
+
+
+def add_graph_edges(edges: Sequence[Tuple[int, int, str]]) -> int:
+    """Insert ``(src_id, dst_id, relation)`` edges in one transaction."""
+    if not edges:
+        return 0
+    now = models._utcnow()
+    eng = get_engine()
+    with DB_WRITE.labels("graph_edges").time(), eng.begin() as conn:
+        conn.execute(insert(models.GraphEdge), [{"src_id": a, "dst_id": b, "relation": r,
+                                                 "created_at": now} for a, b, r in edges])
+    _bump_generation("graph")
+    return len(edges)
+
+
+def graph_edges_after(after_id: int, limit: int) -> List[Tuple[Any, ...]]:
+    """(id, src_id, dst_id, relation) of edges in id order after ``after_id``."""
+    e = models.GraphEdge
+    stmt = (select(e.id, e.src_id, e.dst_id, e.relation)
+            .where(e.id > after_id)  # type: ignore[operator]
+            .order_by(e.id).limit(limit))  # type: ignore[arg-type]
+    # Core connection, not an ORM session: this pages through the whole table on a graph rebuild.
+    with get_engine().connect() as conn:
+        return [tuple(row) for row in conn.execute(stmt)]
+
+
+def add_vector_chunk(source: str, content: str,
+                     embedding: Sequence[float] | None = None) -> int | None:
+    from .vector_index import pack_vector
+
+    eng = get_engine()
+    with DB_WRITE.labels("vector_chunk").time(), Session(eng) as s:
+        chunk = models.VectorChunk(
+            source=source,
+            content=content,
+            embedding=pack_vector(embedding) if embedding is not None else None,
+            dim=len(embedding) if embedding is not None else None,
+        )
+        s.add(chunk)
+        s.commit()
+        s.refresh(chunk)
+        _bump_generation("vector")
+        return chunk.id
+
+
+def get_vector_chunks(ids: Sequence[int]) -> Dict[int, models.VectorChunk]:
+    if not ids:
+        return {}
+    eng = get_engine()
+    with Session(eng) as s:
+        id_col = models.VectorChunk.id
+        rows = s.exec(select(models.VectorChunk).where(id_col.in_(list(ids)))).all()  # type: ignore[union-attr]
+        return {r.id: r for r in rows if r.id is not None}
+
+
+def count_pending_vector_chunks() -> int:
+    eng = get_engine()
+    with Session(eng) as s:
+        pending = models.VectorChunk.embedding.is_(None)  # type: ignore[union-attr]
+        stmt = select(func.count()).select_from(models.VectorChunk).where(pending)
+        return int(s.exec(stmt).one())
+
+
+def pending_vector_chunks(after_id: int, limit: int) -> List[Tuple[int, str]]:
+    """(id, content) of chunks without an embedding, in id order after ``after_id``."""
+    eng = get_engine()
+    with Session(eng) as s:
+        v = models.VectorChunk
+        stmt = select(v.id, v.content).where(
+            v.embedding.is_(None), v.id > after_id  # type: ignore[union-attr, operator]
+        ).order_by(v.id).limit(limit)  # type: ignore[arg-type]
+        return [(int(rid), content) for rid, content in s.exec(stmt) if rid is not None]
+
+
+def set_vector_embeddings(rows: Sequence[Tuple[int, Any]]) -> None:
+    """Write ``(id, vector)`` pairs back into ``VectorChunk`` in one transaction."""
+    from .vector_index import pack_vector
+
+    if not rows:
+        return
+    id_col = models.VectorChunk.id
+    stmt = update(models.VectorChunk).where(id_col == bindparam("row_id")).values(  # type: ignore[arg-type]
+        embedding=bindparam("blob"), dim=bindparam("size"))
+    eng = get_engine()
+    with DB_WRITE.labels("embeddings").time(), eng.begin() as conn:
+        conn.execute(stmt, [{"row_id": i, "blob": pack_vector(v), "size": len(v)} for i, v in rows])
+    _bump_generation("vector")
+
+
+def load_stream_log(stream_id: str) -> List[Any] | None:
+    eng = get_engine()
+    with Session(eng) as s:
+        log = models.StreamLog
+        raw = s.exec(select(log.events_json).where(log.stream_id == stream_id)).first()
+        return json.loads(raw) if raw is not None else None
+
+
+def purge_stream_logs(before: datetime) -> int:
+    eng = get_engine()
+    with DB_WRITE.labels("stream_log_purge").time(), eng.begin() as conn:
+        stmt = delete(models.StreamLog).where(models.StreamLog.created_at < before)  # type: ignore[arg-type]
+        return int(conn.execute(stmt).rowcount)
+
+
+def simple_lexical_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Relevance-ranked full-text search across all memory axes.
+
+    Falls back to a bounded substring scan when the database has no full-text support.
+    """
+    eng = get_engine()
+    if fts.backend() is not None:
+        return fts.search(eng, query, limit=limit)
+    return _scan_lexical_search(query, limit)
+
+
+def _scan_lexical_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Substring scan of the first 500 rows per axis, ranked by occurrences (title counts double).
+
+    Every axis is scanned before ranking, so a full page of weak matches in one table cannot crowd
+    out better ones in the next; ``heapq.nlargest`` keeps only ``limit`` candidates at a time.
+    """
+    needle = query.lower()
+    if not needle:
+        return []
+
+    def scored(s: Session) -> Iterator[Tuple[int, str, int, str]]:
         for model_cls in (models.OntologyItem, models.ParsingItem, models.VectorChunk):
-            stmt = select(model_cls).limit(500)
-            rows = s.exec(stmt).all()
-            for r in rows:
+            for r in s.exec(select(model_cls).limit(500)):
                 text = getattr(r, 'body', None) or getattr(r, 'content', '') or ''
-                if query.lower() in text.lower() or query.lower() in (getattr(r, 'title', '') or '').lower():
-                    out.append({
-                        "axis": model_cls.__name__,
-                        "id": r.id,
-                        "snippet": text[:400],
-                    })
-                if len(out) >= limit:
-                    return out
-    return out
+                title = getattr(r, 'title', '') or ''
+                score = text.lower().count(needle) + 2 * title.lower().count(needle)
+                if score:
+                    yield score, model_cls.__name__, r.id, text  # type: ignore[attr-defined]
+
+    eng = get_engine()
+    with Session(eng) as s:
+        top = heapq.nlargest(limit, scored(s), key=lambda hit: hit[0])
+    return [{"axis": axis, "id": rid, "score": float(score), "snippet": text[:400]}
+            for score, axis, rid, text in top]
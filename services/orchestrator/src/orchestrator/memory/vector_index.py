@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger("orchestrator.memory")
+
+_BATCH_ROWS = 65536
+
+
+def pack_vector(vec: Sequence[float] | np.ndarray) -> bytes:
+    """Pack a vector as little-endian float32 bytes for ``VectorChunk.embedding``."""
+    return np.asarray(vec, dtype="<f4").tobytes()
+
+
+def unpack_vector(blob: bytes | str | None) -> np.ndarray | None:
+    """Inverse of ``pack_vector``; also accepts legacy JSON-list strings."""
+    if blob is None:
+        return None
+    if isinstance(blob, str):
+        return np.asarray(json.loads(blob), dtype=np.float32)
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    out: np.ndarray = mat / norms
+    return out
+
+
+def _topk(scores: np.ndarray, k: int) -> np.ndarray:
+    if scores.shape[0] <= k:
+        return np.argsort(-scores)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+class VectorIndex:
+    """Memory-mapped matrix of L2-normalised float32 embeddings plus their row ids.
+
+    Search is exact, batched cosine similarity for small corpora and IVF (k-means
+    coarse quantiser, ``nprobe`` lists scanned per query) once the corpus is larger
+    than ``VECTOR_IVF_THRESHOLD`` rows or when ``mode="ivf"`` is requested.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or settings.vector_index_dir
+        self.ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.dim = 0
+        self.generation = -1
+        self.skipped = 0  # rows left out of the last build because their dim differed
+        self.centroids: np.ndarray | None = None
+        self.list_offsets: np.ndarray | None = None
+        self.list_rows: np.ndarray | None = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    # -- building ---------------------------------------------------------------
+
+    def _paths(self) -> Tuple[str, str, str]:
+        return (
+            os.path.join(self.directory, "vectors.npy"),
+            os.path.join(self.directory, "ids.i64"),
+            os.path.join(self.directory, "meta.json"),
+        )
+
+    def write(self, rows: Iterable[Tuple[int, np.ndarray]], dim: int, count: int,
+              generation: int = 0) -> None:
+        """Stream ``count`` (id, vector) rows of width ``dim`` into the memory-mapped files."""
+        os.makedirs(self.directory, exist_ok=True)
+        vec_path, ids_path, meta_path = self._paths()
+        ids = np.empty(count, dtype=np.int64)
+        mat = (np.lib.format.open_memmap(vec_path + ".tmp", mode="w+", dtype=np.float32,
+                                         shape=(count, dim)) if count else None)
+        n = skipped = 0
+        for row_id, vec in rows:
+            if n >= count:
+                break
+            if vec.shape[0] != dim:
+                skipped += 1
+                continue
+            norm = float(np.linalg.norm(vec))
+            mat[n] = vec / norm if norm else vec  # type: ignore[index]
+            ids[n] = row_id
+            n += 1
+        if mat is not None:
+            mat.flush()
+            del mat
+            os.replace(vec_path + ".tmp", vec_path)
+        ids[:n].tofile(ids_path)
+        with open(meta_path, "w") as f:
+            json.dump({"dim": dim, "count": n, "generation": generation}, f)
+        if skipped:
+            logger.warning("vector_index_skipped", extra={"rows": skipped, "dim": dim})
+        self.skipped = skipped
+        self.open()
+
+    def open(self) -> None:
+        """Map the on-disk index read-only (pages are loaded lazily by the OS)."""
+        vec_path, ids_path, meta_path = self._paths()
+        with open(meta_path) as f:
+            meta = json.load(f)
+        count, dim = meta["count"], meta["dim"]
+        with self._lock:
+            self.dim = dim
+            self.generation = meta.get("generation", 0)
+            if count:
+                self.ids = np.fromfile(ids_path, dtype=np.int64)
+                self.matrix = np.load(vec_path, mmap_mode="r")[:count]
+            else:
+                self.ids = np.empty(0, dtype=np.int64)
+                self.matrix = np.empty((0, dim), dtype=np.float32)
+            self.centroids = self.list_offsets = self.list_rows = None
+
+    def build_from_store(self) -> None:
+        """Rebuild from every ``VectorChunk`` row with an embedding."""
+        from sqlmodel import Session, func, select
+
+        from . import models, store
+
+        eng = store.get_engine()
+        generation = store.generation("vector")
+        with Session(eng) as s:
+            has_vec = models.VectorChunk.embedding.is_not(None)  # type: ignore[union-attr]
+            count = s.exec(
+                select(func.count()).select_from(models.VectorChunk).where(has_vec)).one()
+            dim_row = s.exec(select(models.VectorChunk.dim).where(has_vec).limit(1)).first()
+            if not count or not dim_row:
+                self.write((), dim=0, count=0, generation=generation)
+                return
+            stmt = select(models.VectorChunk.id, models.VectorChunk.embedding).where(has_vec)
+
+            def rows() -> Iterator[Tuple[int, np.ndarray]]:
+                for rid, blob in s.exec(stmt.execution_options(yield_per=5000)):
+                    vec = unpack_vector(blob)
+                    if rid is not None and vec is not None:
+                        yield rid, vec
+
+            self.write(rows(), dim=int(dim_row), count=int(count), generation=generation)
+
+    def ensure_current(self) -> None:
+        """(Re)build from the table on first use and whenever vector rows were written."""
+        from . import store
+
+        if self.generation == store.generation("vector"):
+            return
+        with self._build_lock:
+            if self.generation == store.generation("vector"):
+                return
+            self.build_from_store()
+            if len(self) >= settings.vector_ivf_threshold:
+                self.build_ivf()
+
+    def build_ivf(self, nlist: int | None = None, iters: int = 8, seed: int = 0) -> None:
+        """Train a spherical k-means coarse quantiser and bucket every row by centroid."""
+        n = len(self)
+        if not n:
+            return
+        nlist = max(1, min(n, nlist or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample_idx = np.sort(rng.choice(n, size=min(n, nlist * 64), replace=False))
+        sample = np.asarray(self.matrix[sample_idx])
+        centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, _BATCH_ROWS):
+            block = np.asarray(self.matrix[start:start + _BATCH_ROWS])
+            assign[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        with self._lock:
+            self.centroids, self.list_rows, self.list_offsets = centroids, order, offsets
+
+    # -- search -----------------------------------------------------------------
+
+    def _prepare_query(self, query: Sequence[float] | np.ndarray) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        if q.shape[0] != self.dim:
+            raise ValueError(f"Query dim {q.shape[0]} != index dim {self.dim}")
+        return _normalize(q)
+
+    def search_exact(self, query: Sequence[float] | np.ndarray,
+                     k: int = 10) -> List[Tuple[int, float]]:
+        q = self._prepare_query(query)
+        best_rows: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for start in range(0, len(self), _BATCH_ROWS):
+            scores = np.asarray(self.matrix[start:start + _BATCH_ROWS]) @ q
+            top = _topk(scores, k)
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+        if not best_rows:
+            return []
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        top = _topk(scores, k)
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+    def search_ivf(self, query: Sequence[float] | np.ndarray, k: int = 10,
+                   nprobe: int | None = None) -> List[Tuple[int, float]]:
+        if self.centroids is None:
+            self.build_ivf()
+        assert self.centroids is not None
+        assert self.list_rows is not None and self.list_offsets is not None
+        q = self._prepare_query(query)
+        nprobe = max(1, min(nprobe or settings.vector_ivf_nprobe, self.centroids.shape[0]))
+        lists = _topk(self.centroids @ q, nprobe)
+        offsets = self.list_offsets
+        cand = np.concatenate([self.list_rows[offsets[c]:offsets[c + 1]] for c in lists])
+        if not cand.size:
+            return []
+        cand.sort()  # sequential access into the memory map
+        scores = np.asarray(self.matrix[cand]) @ q
+        top = _topk(scores, k)
+        return [(int(self.ids[cand[i]]), float(scores[i])) for i in top]
+
+    def search(self, query: Sequence[float] | np.ndarray, k: int = 10, mode: str = "auto",
+               nprobe: int | None = None) -> List[Tuple[int, float]]:
+        if not len(self):
+            return []
+        if mode == "auto":
+            mode = "ivf" if len(self) >= settings.vector_ivf_threshold else "exact"
+        if mode == "ivf":
+            return self.search_ivf(query, k, nprobe)
+        if mode == "exact":
+            return self.search_exact(query, k)
+        raise ValueError(f"Unknown search mode '{mode}'")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self),
+            "dim": self.dim,
+            "generation": self.generation,
+            "skipped": self.skipped,
+            "ivf_lists": 0 if self.centroids is None else int(self.centroids.shape[0]),
+        }
+
+
+vector_index = VectorIndex()
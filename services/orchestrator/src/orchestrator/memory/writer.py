@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from sqlmodel import Session, SQLModel
+
+from ..config import settings
+from ..core.metrics import DB_ROWS, DB_WRITE
+
+logger = logging.getLogger("orchestrator.memory")
+
+_STOP = object()
+
+# A row, or a callable building it on the writer thread (to keep serialisation off the loop).
+Row = Union[SQLModel, Callable[[], SQLModel]]
+
+
+class _Flush:
+    __slots__ = ("future",)
+
+    def __init__(self) -> None:
+        self.future: Future[Any] = Future()
+
+
+class BatchWriter:
+    """Dedicated thread that commits queued inserts in batches.
+
+    ``submit`` never blocks the event loop: rows are queued and committed together once
+    ``max_batch`` rows are pending or ``max_delay_ms`` has passed since the first one.
+    ``flush`` resolves after everything submitted before it is committed; ``shutdown``
+    flushes and joins the thread. Each ``submit`` returns a future resolving to the row id.
+    If a batch fails to commit, its rows are retried one by one so only the bad rows fail.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], Any] | None = None,
+        max_batch: int | None = None,
+        max_delay_ms: float | None = None,
+    ):
+        self._engine_factory = engine_factory
+        self.max_batch = max_batch or settings.db_writer_batch
+        if max_delay_ms is None:
+            max_delay_ms = settings.db_writer_delay_ms
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.batches = 0
+        self.failed = 0
+        self.last_batch_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._loop, name="orchestrator-db-writer",
+                                            daemon=True)
+            self._thread.start()
+
+    def submit(self, row: Row) -> Future[Any]:
+        if not self.running:
+            raise RuntimeError("BatchWriter is not running")
+        fut: Future[Any] = Future()
+        self._queue.put((row, fut))
+        return fut
+
+    def flush_sync(self, timeout: float | None = None) -> None:
+        if not self.running:
+            return
+        marker = _Flush()
+        self._queue.put(marker)
+        marker.future.result(timeout)
+
+    async def flush(self) -> None:
+        if not self.running:
+            return
+        marker = _Flush()
+        self._queue.put(marker)
+        await asyncio.wrap_future(marker.future)
+
+    def stop(self, timeout: float | None = 10.0) -> bool:
+        """Drain the queue and join the thread; False if it is still running after ``timeout``."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return True
+            if not self._stopping:
+                self._stopping = True
+                self._queue.put(_STOP)
+            thread.join(timeout)
+            if thread.is_alive():
+                # Keep the reference: the thread still owns queued rows and may finish later.
+                logger.warning("db_writer still running after %.1fs", timeout or 0.0)
+                return False
+            self._thread, self._stopping = None, False
+            return True
+
+    async def shutdown(self, timeout: float | None = 10.0) -> bool:
+        return await asyncio.to_thread(self.stop, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "committed": self.committed,
+            "batches": self.batches,
+            "failed": self.failed,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+        }
+
+    # -- writer thread ------------------------------------------------------------
+
+    def _engine(self) -> Any:
+        if self._engine_factory is not None:
+            return self._engine_factory()
+        from .store import get_engine
+
+        return get_engine()
+
+    def _insert(self, rows: List[SQLModel]) -> None:
+        with Session(self._engine(), expire_on_commit=False) as s:
+            s.add_all(rows)
+            s.commit()
+
+    def _commit(self, batch: List[Tuple[Row, Future[Any]]]) -> None:
+        built: List[Tuple[SQLModel, Future[Any]]] = []
+        for row, fut in batch:
+            try:
+                built.append((row if isinstance(row, SQLModel) else row(), fut))
+            except Exception as e:  # noqa: BLE001 - surfaced through the future
+                self.failed += 1
+                fut.set_exception(e)
+        if not built:
+            return
+        start = time.perf_counter()
+        # A rolled-back flush leaves generated ids on the rows; restore them before a retry.
+        ids = [getattr(row, "id", None) for row, _ in built]
+        try:
+            self._insert([row for row, _ in built])
+        except Exception:  # noqa: BLE001 - retried row by row below
+            logger.exception("db_writer batch failed (%d rows), retrying rows one by one",
+                             len(built))
+            DB_WRITE.labels("batch_failed").observe(time.perf_counter() - start)
+            self._commit_each(built, ids)
+            return
+        elapsed = time.perf_counter() - start
+        DB_WRITE.labels("batch").observe(elapsed)
+        DB_ROWS.inc(len(built))
+        self.last_batch_ms = elapsed * 1000
+        self.committed += len(built)
+        self.batches += 1
+        for row, fut in built:
+            fut.set_result(getattr(row, "id", None))
+
+    def _commit_each(self, batch: List[Tuple[SQLModel, Future[Any]]],
+                     ids: List[Any]) -> None:
+        for (row, fut), row_id in zip(batch, ids):
+            if hasattr(row, "id"):
+                row.id = row_id
+            try:
+                self._insert([row])
+            except Exception as e:  # noqa: BLE001 - surfaced through the future
+                self.failed += 1
+                fut.set_exception(e)
+                continue
+            DB_ROWS.inc()
+            self.committed += 1
+            fut.set_result(getattr(row, "id", None))
+
+    def _loop(self) -> None:
+        pending: List[Tuple[Row, Future[Any]]] = []
+        while True:
+            item = self._queue.get()
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            markers: List[_Flush] = []
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    pending.append(item)
+                if stop or markers or len(pending) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._commit(pending)
+            pending = []
+            for marker in markers:
+                marker.future.set_result(None)
+            if stop:
+                return
+
+
+db_writer = BatchWriter()
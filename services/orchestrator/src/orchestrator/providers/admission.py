@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import email.utils
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, List
+
+import httpx
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .base import ChatProvider
+
+logger = logging.getLogger("orchestrator.providers")
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504, 529})
+_rng = random.Random()
+
+
+class AdmissionRejected(RuntimeError):
+    pass
+
+
+class RetryableError(RuntimeError):
+    """Raised by providers for transient upstream failures; ``retry_after`` is in seconds."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FairGate:
+    """Concurrency limit whose waiters are served round-robin by session.
+
+    A session that queues many requests only gets every n-th free slot when n sessions are
+    waiting, so one busy client cannot starve the others.
+    """
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit, self.max_queue = limit, max_queue
+        self.active = 0
+        self.queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future[Any]]]" = OrderedDict()
+        self.admitted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    async def acquire(self, session: str) -> int:
+        """Take a slot; returns the queue depth seen on arrival (0 = admitted immediately)."""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return 0
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(f"admission queue full ({self.queued})")
+        fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(session, deque()).append(fut)
+        self.queued += 1
+        depth = self.queued
+        start = time.perf_counter()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was handed over just as we were cancelled
+            else:
+                q = self._waiters.get(session)
+                if q is not None and fut in q:
+                    q.remove(fut)
+                    self.queued -= 1
+                    if not q:
+                        del self._waiters[session]
+            raise
+        ms = (time.perf_counter() - start) * 1000
+        self.admitted += 1
+        self.waited += 1
+        self.wait_ms_total += ms
+        self.wait_ms_max = max(self.wait_ms_max, ms)
+        return depth
+
+    def release(self) -> None:
+        while self._waiters:
+            session, q = next(iter(self._waiters.items()))
+            fut = q.popleft()
+            self.queued -= 1
+            if q:
+                self._waiters.move_to_end(session)
+            else:
+                del self._waiters[session]
+            if not fut.done():
+                fut.set_result(None)  # the slot passes straight to the waiter
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "sessions_waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_ms_total / self.waited, 2) if self.waited else 0.0,
+            "wait_ms_max": round(self.wait_ms_max, 2),
+        }
+
+
+class TokenBucket:
+    """Request-rate limiter; ``reserve`` books a token and returns how long to wait for it."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.delayed = 0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        self.delayed += 1
+        return -self.tokens / self.rate
+
+
+def retry_after(exc: BaseException) -> float | None:
+    if isinstance(exc, RetryableError):
+        return exc.retry_after
+    if isinstance(exc, httpx.HTTPStatusError):
+        value = exc.response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None  # malformed: fall back to jittered backoff
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (RetryableError, httpx.TransportError)):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt: int, exc: BaseException, rng: random.Random | None = None) -> float:
+    """Retry-After when the upstream sent one (capped), else full-jitter exponential backoff."""
+    hinted = retry_after(exc)
+    if hinted is not None:
+        return min(hinted, settings.retry_after_cap_s)
+    ceiling = min(settings.retry_max_ms, settings.retry_base_ms * (2 ** attempt)) / 1000
+    return (rng or _rng).uniform(0, ceiling)
+
+
+class AdmissionController:
+    """Per-provider and per-model concurrency (fair between sessions), per-provider token
+    buckets, and retries of upstream calls that fail before producing any output."""
+
+    def __init__(self) -> None:
+        self._gates: Dict[str, FairGate] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.retries = 0
+
+    def _gate(self, key: str, limit: int) -> FairGate:
+        gate = self._gates.get(key)
+        if gate is None or gate.limit != limit and not gate.active and not gate.queued:
+            gate = self._gates[key] = FairGate(limit, settings.admission_max_queue)
+        return gate
+
+    def _bucket(self, provider: str) -> TokenBucket | None:
+        rate = settings.provider_rate_limits.get(provider)
+        if not rate:
+            return None
+        bucket = self._buckets.get(provider)
+        if bucket is None or bucket.rate != rate:
+            bucket = self._buckets[provider] = TokenBucket(rate)
+        return bucket
+
+    @contextlib.asynccontextmanager
+    async def slot(self, provider: str, model: str, session: str) -> AsyncIterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        limit = settings.provider_max_concurrency.get(provider,
+                                                      settings.provider_default_concurrency)
+        gates: List[FairGate] = [self._gate(provider, limit)]
+        model_limit = settings.model_max_concurrency.get(f"{provider}:{model}")
+        if model_limit:
+            gates.append(self._gate(f"{provider}:{model}", model_limit))
+        held: List[FairGate] = []
+        depth = 0
+        try:
+            for gate in gates:
+                depth = max(depth, await gate.acquire(session))
+                held.append(gate)
+            bucket = self._bucket(provider)
+            delay = bucket.reserve() if bucket is not None else 0.0
+            if delay:
+                await asyncio.sleep(delay)
+            yield {"queue_depth": depth, "wait_ms": round((time.perf_counter() - start) * 1000, 2),
+                   "rate_limited": delay > 0}
+        finally:
+            for gate in reversed(held):
+                gate.release()
+
+    async def stream(
+        self,
+        prov: ChatProvider,
+        messages: List[Dict[str, Any]],
+        model: str,
+        session: str | None = None,
+        opener: Callable[[], AsyncIterator[Dict[str, Any]]] | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Admit, then stream; emits ``admission`` when the call had to wait and ``retry`` per
+        retry."""
+        open_stream = opener or (lambda: prov.stream_chat(messages, model=model))
+        session = session or f"anon-{id(messages)}"
+        async with self.slot(prov.name, model, session) as info:
+            if info["queue_depth"] or info["rate_limited"]:
+                yield {"type": "admission", "provider": prov.name, "model": model, **info}
+            attempt = 0
+            while True:
+                produced = False
+                try:
+                    async for evt in open_stream():
+                        produced = True
+                        yield evt
+                    return
+                except Exception as e:
+                    if produced or attempt >= settings.retry_max_attempts or not is_retryable(e):
+                        raise
+                    delay = backoff_delay(attempt, e)
+                    attempt += 1
+                    self.retries += 1
+                    logger.warning("provider_retry", extra={"provider": prov.name,
+                                                            "attempt": attempt, "delay_s": delay})
+                    yield {"type": "retry", "provider": prov.name, "model": model,
+                           "attempt": attempt, "delay_ms": round(delay * 1000, 1),
+                           "error": str(e) or type(e).__name__}
+                    # A retry is another upstream request: it spends a token like the first one.
+                    bucket = self._bucket(prov.name)
+                    await asyncio.sleep(max(delay, bucket.reserve() if bucket is not None else 0.0))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "gates": {key: gate.stats() for key, gate in self._gates.items()},
+            "rate_limited": {key: b.delayed for key, b in self._buckets.items()},
+            "retries": self.retries,
+        }
+
+
+admission = AdmissionController()
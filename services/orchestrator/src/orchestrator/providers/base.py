@@ -1,24 +1,26 @@
 from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import AsyncIterator, Dict, Any
+from typing import Any, AsyncIterator
+
+from .. import manifest
+from ..core.http_pool import HTTPClientPool, http_pool
+from ..core.plugins import LazyRegistry
+
 
 class ChatProvider(ABC):
     name: str
+    # Shared, app-owned client pool; providers should never build their own clients per call.
+    http_pool: HTTPClientPool = http_pool
 
     @abstractmethod
-    async def stream_chat(self, messages: list[dict[str, str]], model: str | None = None) -> AsyncIterator[dict[str, Any]]:
-        ...
-
-class ProviderRegistry:
-    def __init__(self):
-        self._providers: dict[str, ChatProvider] = {}
-
-    def register(self, provider: ChatProvider):
-        self._providers[provider.name] = provider
+    def stream_chat(self, messages: list[dict[str, str]],
+                    model: str | None = None) -> AsyncIterator[dict[str, Any]]:
+        """Implemented as an async generator."""
 
-    def get(self, name: str) -> ChatProvider:
-        if name not in self._providers:
-            raise KeyError(f"Provider '{name}' not registered")
-        return self._providers[name]
+class ProviderRegistry(LazyRegistry[ChatProvider]):
+    kind = "Provider"
 
 provider_registry = ProviderRegistry()
+provider_registry.declare(manifest.CHAT_PROVIDERS)
+provider_registry.discover("orchestrator.providers")
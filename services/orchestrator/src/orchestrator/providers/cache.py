@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import orjson
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .base import ChatProvider
+
+logger = logging.getLogger("orchestrator.providers")
+
+Events = List[Dict[str, Any]]
+# Per-call status events (admission control, retries) are streamed live but never replayed.
+TRANSIENT_EVENTS = frozenset({"admission", "retry"})
+
+
+def canonical_key(provider: str, model: str | None, messages: List[Dict[str, Any]]) -> str:
+    """sha256 over provider, model and the messages serialised with sorted keys."""
+    doc = {"provider": provider, "model": model, "messages": messages}
+    return hashlib.sha256(orjson.dumps(doc, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class _MemoryTier:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self._data: "OrderedDict[str, Tuple[float, Events, int]]" = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Events | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self._pop(key)
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, expires_at: float, events: Events, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._data:
+            self._pop(key)
+        self._data[key] = (expires_at, events, size)
+        self.bytes += size
+        while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def _pop(self, key: str) -> None:
+        self.bytes -= self._data.pop(key)[2]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _SQLiteTier:
+    """Second tier in its own SQLite file so it works whatever ``DATABASE_URL`` points at."""
+
+    def __init__(self, path: str, max_rows: int):
+        self.path, self.max_rows = path, max_rows
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, provider TEXT, model TEXT, events BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS response_cache_lru ON response_cache(last_access)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Events | None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT events, expires_at FROM response_cache WHERE key = ?",
+                             (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+        events: List[Dict[str, Any]] = orjson.loads(row[0])
+        return events
+
+    def put(self, key: str, provider: str, model: str | None, expires_at: float,
+            blob: bytes) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, blob, expires_at, time.time()),
+            )
+            over = db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_rows
+            if over > 0:
+                db.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY last_access LIMIT ?)", (over,)
+                )
+                self.evictions += over
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM response_cache")
+            self._db().commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class _Flight:
+    """One upstream stream being recorded; identical concurrent requests attach to it."""
+
+    def __init__(self) -> None:
+        self.events: Events = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.cancelled = False
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.task: asyncio.Task[Any] | None = None
+
+    def publish(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class ResponseCache:
+    """Exact-match cache of provider token streams (memory LRU in front of SQLite).
+
+    A hit replays the recorded events with their original chunking. Concurrent identical
+    requests share one upstream call: later callers replay the prefix recorded so far and
+    then follow the live tail, without the leader's admission and retry events. Only streams that
+    complete without error are stored.
+    """
+
+    def __init__(self, sqlite_path: str | None = None):
+        self.ttl = settings.response_cache_ttl_s
+        self.memory = _MemoryTier(settings.response_cache_max_entries,
+                                  settings.response_cache_max_bytes)
+        path = settings.response_cache_path if sqlite_path is None else sqlite_path
+        self.sqlite = _SQLiteTier(path, settings.response_cache_sqlite_max_rows) if path else None
+        self._flights: Dict[str, _Flight] = {}
+        self.hits = {"memory": 0, "sqlite": 0, "inflight": 0}
+        self.misses = 0
+        self.stores = 0
+
+    async def lookup(self, key: str) -> Tuple[str, Events] | None:
+        events = self.memory.get(key)
+        if events is not None:
+            return "memory", events
+        if self.sqlite is not None:
+            events = await asyncio.to_thread(self.sqlite.get, key)
+            if events is not None:
+                blob = orjson.dumps(events)
+                self.memory.put(key, time.time() + self.ttl, events, len(blob))
+                return "sqlite", events
+        return None
+
+    async def store(self, key: str, provider: str, model: str | None, events: Events) -> None:
+        blob = orjson.dumps(events)
+        expires_at = time.time() + self.ttl
+        self.memory.put(key, expires_at, events, len(blob))
+        if self.sqlite is not None:
+            try:
+                await asyncio.to_thread(self.sqlite.put, key, provider, model, expires_at, blob)
+            except sqlite3.Error:
+                logger.exception("response cache write failed")
+        self.stores += 1
+
+    async def _record(self, key: str, flight: _Flight, prov: ChatProvider,
+                      messages: List[Dict[str, Any]], model: str | None,
+                      opener: Callable[[], AsyncIterator[Dict[str, Any]]] | None) -> None:
+        try:
+            async for evt in (opener() if opener else prov.stream_chat(messages, model=model)):
+                flight.events.append(evt)
+                flight.publish()
+                if evt.get("type") == "error":
+                    flight.error = RuntimeError(str(evt.get("error", "provider error")))
+            if flight.error is None:
+                kept = [e for e in flight.events if e.get("type") not in TRANSIENT_EVENTS]
+                await self.store(key, prov.name, model, kept)
+        except asyncio.CancelledError:
+            flight.cancelled = True  # remaining subscribers start over instead of failing
+            raise
+        except BaseException as e:  # noqa: BLE001 - handed to every subscriber
+            flight.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            flight.done = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.publish()
+
+    async def stream(
+        self, prov: ChatProvider, messages: List[Dict[str, Any]], model: str | None = None,
+        opener: Callable[[], AsyncIterator[Dict[str, Any]]] | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """``opener`` produces the upstream stream on a miss (default ``prov.stream_chat``)."""
+        key = canonical_key(prov.name, model, messages)
+        found = await self.lookup(key)
+        if found is not None:
+            self.hits[found[0]] += 1
+            for evt in found[1]:
+                yield dict(evt)
+            return
+        delivered = restarted = False
+        while True:
+            flight = self._flights.get(key)
+            # Admission and retry events describe the leader's own upstream call; joiners skip them.
+            leader = flight is None
+            if flight is None:
+                if not restarted:
+                    self.misses += 1
+                flight = self._flights[key] = _Flight()
+                flight.task = asyncio.create_task(
+                    self._record(key, flight, prov, messages, model, opener))
+            else:
+                self.hits["inflight"] += 1
+            flight.subscribers += 1
+            pos = 0
+            try:
+                while True:
+                    changed = flight.changed
+                    while pos < len(flight.events):
+                        evt = flight.events[pos]
+                        pos += 1
+                        if evt.get("type") not in TRANSIENT_EVENTS:
+                            delivered = True
+                        elif not leader:
+                            continue
+                        yield dict(evt)
+                    if flight.done:
+                        break
+                    await changed.wait()
+            finally:
+                flight.subscribers -= 1
+                if not flight.subscribers and not flight.done and flight.task is not None:
+                    # Nobody is listening any more; later callers start a call of their own.
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                    flight.task.cancel()
+            if not flight.cancelled:
+                break
+            # The shared call was cancelled under this caller: open a fresh one, unless part of
+            # the answer was already sent (a new call need not produce the same text).
+            if delivered or restarted:
+                raise RuntimeError("shared upstream call was cancelled")
+            restarted = True
+        errored = bool(flight.events) and flight.events[-1].get("type") == "error"
+        if flight.error is not None and not errored:
+            raise flight.error
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.sqlite is not None:
+            self.sqlite.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "stores": self.stores,
+            "inflight": len(self._flights),
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "evictions": self.memory.evictions + (self.sqlite.evictions if self.sqlite else 0),
+        }
+
+
+response_cache = ResponseCache()
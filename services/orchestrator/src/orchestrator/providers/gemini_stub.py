@@ -1,14 +1,37 @@
 from __future__ import annotations
-from typing import AsyncIterator, Any
+
+import asyncio
+from typing import Any, AsyncIterator
+
 from .base import ChatProvider, provider_registry
 
+
 class GeminiStubProvider(ChatProvider):
     name = "gemini"
 
-    async def stream_chat(self, messages: list[dict[str, str]], model: str | None = None) -> AsyncIterator[dict[str, Any]]:
+    def __init__(self, name: str | None = None, first_token_delay: float = 0.0,
+                 token_delay: float = 0.0, fail: bool = False):
+        # Artificial latency / failures let routing and load tests run without a network.
+        if name:
+            self.name = name
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.fail = fail
+
+    async def stream_chat(self, messages: list[dict[str, str]],
+                          model: str | None = None) -> AsyncIterator[dict[str, Any]]:
         # Simple echo stub for now
+        if self.first_token_delay:
+            await asyncio.sleep(self.first_token_delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
         user_content = " ".join(m["content"] for m in messages if m["role"] == "user")
-        for piece in [f"[gemini-stub] {user_content}"]:
+        pieces = [f"[{self.name}-stub] {user_content}"]
+        if self.token_delay:
+            pieces = [f"[{self.name}-stub]"] + [f" {w}" for w in user_content.split()]
+        for i, piece in enumerate(pieces):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
             yield {"type": "token", "token": piece}
 
 provider_registry.register(GeminiStubProvider())
@@ -1,16 +1,20 @@
 from __future__ import annotations
+
 import os
-from typing import AsyncIterator, Any
-import httpx
-from .base import ChatProvider, provider_registry
+from typing import Any, AsyncIterator
+
+import orjson
+
 from ..config import settings
+from .base import ChatProvider, provider_registry
 
 OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
 
 class OpenAIProvider(ChatProvider):
     name = "openai"
 
-    async def stream_chat(self, messages: list[dict[str, str]], model: str | None = None) -> AsyncIterator[dict[str, Any]]:
+    async def stream_chat(self, messages: list[dict[str, str]],
+                          model: str | None = None) -> AsyncIterator[dict[str, Any]]:
         api_key = settings.openai_api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("Missing OPENAI_API_KEY")
@@ -21,8 +25,9 @@ class OpenAIProvider(ChatProvider):
             "stream": True,
         }
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(f"{OPENAI_API_BASE}/chat/completions", json=payload, headers=headers, timeout=None)
+        client = self.http_pool.get(OPENAI_API_BASE)
+        url = f"{OPENAI_API_BASE}/chat/completions"
+        async with client.stream("POST", url, json=payload, headers=headers) as resp:
             resp.raise_for_status()
             # Using streaming chunks with SSE-like data lines (OpenAI style)
             async for line in resp.aiter_lines():
@@ -32,6 +37,11 @@ class OpenAIProvider(ChatProvider):
                     data = line[len("data: "):].strip()
                     if data == "[DONE]":
                         break
-                    yield {"type": "token", "token": data}
+                    # Parse each chunk once here so downstream only ever sees text deltas.
+                    chunk = orjson.loads(data)
+                    for choice in chunk.get("choices") or ():
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            yield {"type": "token", "token": content}
 
 provider_registry.register(OpenAIProvider())
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Tuple
+
+from ..config import settings
+from .base import ChatProvider, provider_registry
+
+logger = logging.getLogger("orchestrator.providers")
+
+Target = Tuple[str, str]  # (provider name, model)
+Opener = Callable[[ChatProvider, List[Dict[str, Any]], str], AsyncIterator[Dict[str, Any]]]
+
+
+def _default_opener(prov: ChatProvider, messages: List[Dict[str, Any]],
+                    model: str) -> AsyncIterator[Dict[str, Any]]:
+    return prov.stream_chat(messages, model=model)
+
+
+def parse_target(spec: str) -> Target:
+    provider, _, model = spec.partition(":")
+    return provider, model or settings.default_model
+
+
+class TargetStats:
+    """EWMA time-to-first-token and error rate for one (provider, model)."""
+
+    __slots__ = ("ttft_ms", "error_rate", "samples", "errors", "recent", "inflight")
+
+    def __init__(self, window: int = 256):
+        self.ttft_ms: float | None = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.errors = 0
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.inflight = 0
+
+    def observe_ttft(self, ms: float, alpha: float) -> None:
+        self.ttft_ms = ms if self.ttft_ms is None else alpha * ms + (1 - alpha) * self.ttft_ms
+        self.recent.append(ms)
+        self.samples += 1
+
+    def observe_censored(self, ms: float, alpha: float) -> None:
+        """A lower bound (the attempt was cancelled first): only ever raises the estimate."""
+        if self.ttft_ms is None or self.ttft_ms < ms:
+            self.ttft_ms = ms if self.ttft_ms is None else alpha * ms + (1 - alpha) * self.ttft_ms
+
+    def observe_outcome(self, ok: bool, alpha: float) -> None:
+        self.error_rate = alpha * (0.0 if ok else 1.0) + (1 - alpha) * self.error_rate
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float | None:
+        if len(self.recent) < settings.router_hedge_min_samples:
+            return None
+        data = sorted(self.recent)
+        return data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))]
+
+    def score(self) -> float:
+        # Untried targets look fast so they get tried; ones that only ever failed are assumed to be
+        # as slow as the hedge delay. Errors inflate the expected latency.
+        ttft = self.ttft_ms
+        if ttft is None:
+            ttft = settings.router_hedge_after_ms if self.errors else 0.0
+        return (ttft + 1.0) * (1.0 + settings.router_error_penalty * self.error_rate)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "ttft_ewma_ms": None if self.ttft_ms is None else round(self.ttft_ms, 2),
+            "error_rate": round(self.error_rate, 4),
+            "samples": self.samples,
+            "errors": self.errors,
+            "inflight": self.inflight,
+        }
+
+
+class ModelRouter:
+    """Routes a request for a model class to the (provider, model) expected to answer first.
+
+    Targets are ranked by EWMA TTFT scaled by EWMA error rate. If the chosen target has not
+    produced a token within its TTFT percentile (``ROUTER_HEDGE_PERCENTILE``; a fixed
+    ``ROUTER_HEDGE_AFTER_MS`` until enough samples exist), a hedged request goes to the next
+    target; the first to produce a token wins and the other is cancelled. Targets that fail
+    before their first token fall through to the next one.
+    """
+
+    def __init__(self, classes: Dict[str, List[str]] | None = None,
+                 rng: random.Random | None = None):
+        self.classes = classes if classes is not None else settings.model_classes
+        self.stats: Dict[Target, TargetStats] = {}
+        self.rng = rng or random.Random()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _stats(self, target: Target) -> TargetStats:
+        stats = self.stats.get(target)
+        if stats is None:
+            stats = self.stats[target] = TargetStats()
+        return stats
+
+    def rank(self, model_class: str) -> List[Target]:
+        if model_class not in self.classes:
+            raise KeyError(f"Model class '{model_class}' not configured")
+        targets = [parse_target(spec) for spec in self.classes[model_class]]
+        # Stable sort: config order breaks ties.
+        ranked = sorted(targets, key=lambda t: self._stats(t).score())
+        if len(ranked) > 1 and self.rng.random() < settings.router_explore:
+            ranked.insert(0, ranked.pop(self.rng.randrange(1, len(ranked))))
+        return ranked
+
+    def hedge_delay(self, target: Target) -> float:
+        p = self._stats(target).percentile(settings.router_hedge_percentile)
+        return (p if p is not None else settings.router_hedge_after_ms) / 1000
+
+    async def _pump(self, idx: int, target: Target, messages: List[Dict[str, Any]], opener: Opener,
+                    out: asyncio.Queue[Tuple[int, str, Any]]) -> None:
+        stats = self._stats(target)
+        stats.inflight += 1
+        try:
+            prov = provider_registry.get(target[0])
+            async for evt in opener(prov, messages, target[1]):
+                await out.put((idx, "event", evt))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # noqa: BLE001 - handed to the routing loop
+            await out.put((idx, "error", e))
+            return
+        finally:
+            stats.inflight -= 1
+        await out.put((idx, "done", None))
+
+    async def stream(
+        self,
+        model_class: str,
+        messages: List[Dict[str, Any]],
+        hedge: bool | None = None,
+        opener: Opener | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        alpha = settings.router_ewma_alpha
+        opener = opener or _default_opener
+        remaining = self.rank(model_class)
+        hedge = settings.router_hedge_enabled if hedge is None else hedge
+        out: asyncio.Queue[Tuple[int, str, Any]] = asyncio.Queue()
+        attempts: List[Tuple[asyncio.Task[Any], Target, float]] = []
+        live: set[int] = set()
+
+        def launch() -> float | None:
+            target = remaining.pop(0)
+            task = asyncio.create_task(self._pump(len(attempts), target, messages, opener, out))
+            attempts.append((task, target, time.perf_counter()))
+            live.add(len(attempts) - 1)
+            return time.monotonic() + self.hedge_delay(target) if hedge and remaining else None
+
+        hedge_at = launch()
+        hedged = False
+        winner: int | None = None
+        buffered: Dict[int, List[Dict[str, Any]]] = {}
+        try:
+            while winner is None:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+                try:
+                    idx, kind, payload = await asyncio.wait_for(out.get(), timeout)
+                except asyncio.TimeoutError:
+                    self.hedges += 1
+                    hedged = True
+                    hedge_at = launch()
+                    continue
+                _task, target, started = attempts[idx]
+                if kind == "event":
+                    buffered.setdefault(idx, []).append(payload)
+                    if payload.get("type") == "token":
+                        winner = idx
+                elif kind == "done":  # finished without tokens: an empty answer still wins
+                    winner = idx
+                else:
+                    live.discard(idx)
+                    stats = self._stats(target)
+                    stats.observe_outcome(False, alpha)
+                    logger.warning("route_attempt_failed", extra={
+                        "provider": target[0], "model": target[1], "error": str(payload)})
+                    if not live:
+                        if not remaining:
+                            raise payload
+                        self.failovers += 1
+                        hedge_at = launch()
+            now = time.perf_counter()
+            _task, target, started = attempts[winner]
+            stats = self._stats(target)
+            stats.observe_ttft((now - started) * 1000, alpha)
+            for idx in live - {winner}:
+                task, loser, loser_started = attempts[idx]
+                task.cancel()
+                # Censored: the loser took at least this long, so it is not a TTFT sample.
+                self._stats(loser).observe_censored((now - loser_started) * 1000, alpha)
+            if hedged and winner > 0:
+                self.hedge_wins += 1
+            yield {"type": "route", "model_class": model_class, "provider": target[0],
+                   "model": target[1], "attempts": len(attempts), "hedged": hedged}
+            for evt in buffered.get(winner, ()):
+                yield evt
+            done = kind == "done"
+            while not done:
+                idx, kind, payload = await out.get()
+                if idx != winner:
+                    continue
+                if kind == "event":
+                    yield payload
+                elif kind == "error":
+                    stats.observe_outcome(False, alpha)
+                    raise payload
+                else:
+                    done = True
+            stats.observe_outcome(True, alpha)
+        finally:
+            pending = [task for task, _t, _s in attempts if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        return {
+            "classes": self.classes,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "targets": {f"{p}:{m}": s.as_dict() for (p, m), s in self.stats.items()},
+        }
+
+
+model_router = ModelRouter()
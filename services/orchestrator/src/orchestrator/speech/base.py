@@ -1,6 +1,13 @@
 from __future__ import annotations
+
+import base64
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
+
+from .. import manifest
+from ..core.plugins import LazyRegistry
+
+STREAM_CHUNK_BYTES = 64 * 1024
 
 
 class SpeechProvider(ABC):
@@ -11,24 +18,35 @@ class SpeechProvider(ABC):
         """Return transcription text and metadata."""
 
     @abstractmethod
-    async def synthesize(self, text: str, voice: str | None = None, format: str = "mp3") -> Dict[str, Any]:
+    async def synthesize(self, text: str, voice: str | None = None,
+                         format: str = "mp3") -> Dict[str, Any]:
         """Return synthesized audio bytes (base64) and metadata."""
 
+    async def transcribe_stream(self, chunks: AsyncIterator[bytes],
+                                language: str | None = None) -> AsyncIterator[Dict[str, Any]]:
+        """Consume audio as it arrives and yield ``{"type": "partial"|"final", ...}`` results.
 
-class SpeechRegistry:
-    def __init__(self):
-        self._providers: dict[str, SpeechProvider] = {}
+        Providers with incremental recognition override this; the default buffers the
+        upload and yields a single final result from ``transcribe``.
+        """
+        buf = bytearray()
+        async for chunk in chunks:
+            buf += chunk
+        yield {"type": "final", **await self.transcribe(bytes(buf), language=language)}
 
-    def register(self, provider: SpeechProvider):
-        self._providers[provider.name] = provider
+    async def synthesize_stream(self, text: str, voice: str | None = None,
+                                format: str = "mp3") -> AsyncIterator[bytes]:
+        """Yield raw audio bytes as they are produced. Default: chunk ``synthesize`` output."""
+        result = await self.synthesize(text, voice=voice, format=format)
+        audio = base64.b64decode(result["audio_base64"])
+        for start in range(0, len(audio), STREAM_CHUNK_BYTES):
+            yield audio[start:start + STREAM_CHUNK_BYTES]
 
-    def get(self, name: str) -> SpeechProvider:
-        if name not in self._providers:
-            raise KeyError(f"Speech provider '{name}' not registered")
-        return self._providers[name]
 
-    def list(self):  # pragma: no cover - simple
-        return list(self._providers.keys())
+class SpeechRegistry(LazyRegistry[SpeechProvider]):
+    kind = "Speech provider"
 
 
 speech_registry = SpeechRegistry()
+speech_registry.declare(manifest.SPEECH_PROVIDERS)
+speech_registry.discover("orchestrator.speech")
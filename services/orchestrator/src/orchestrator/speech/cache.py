@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Tuple
+
+import aiofiles
+
+from ..config import settings
+from ..core.metrics import observe_speech
+from .base import STREAM_CHUNK_BYTES, SpeechProvider
+
+logger = logging.getLogger("orchestrator.speech")
+
+# Formats the cache (and the streaming endpoint) accept; the value becomes a file extension.
+AUDIO_MEDIA_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "opus": "audio/ogg",
+                     "aac": "audio/aac", "flac": "audio/flac", "pcm": "audio/L16"}
+
+
+def check_format(format: str) -> str:
+    if format not in AUDIO_MEDIA_TYPES:
+        raise ValueError(f"Unsupported audio format {format!r}; "
+                         f"expected one of {sorted(AUDIO_MEDIA_TYPES)}")
+    return format
+
+
+def audio_key(provider: str, voice: str, format: str, text: str) -> str:
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{provider}\0{voice}\0{format}\0{text_hash}".encode()).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed, size-bounded LRU of synthesised audio on disk.
+
+    Files live at ``<dir>/<key[:2]>/<key>.<format>``; recency is tracked in memory and
+    persisted through mtime so a restart rebuilds the same LRU order from a directory scan.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None):
+        self.directory = directory or settings.speech_cache_dir
+        self.max_bytes = settings.speech_cache_max_bytes if max_bytes is None else max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()  # key -> (path, size)
+        self._bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        found = []
+        if os.path.isdir(self.directory):
+            for sub in os.scandir(self.directory):
+                if not sub.is_dir():
+                    continue
+                for entry in os.scandir(sub.path):
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    key = entry.name.split(".", 1)[0]
+                    found.append((st.st_mtime_ns, key, entry.path, st.st_size))
+        for _mtime, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self._bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _path(self, key: str, format: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{check_format(format)}")
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry[0]):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(entry[0])
+        except OSError:
+            pass
+        return entry[0]
+
+    def new_temp(self, key: str) -> Tuple[int, str]:
+        os.makedirs(os.path.join(self.directory, key[:2]), exist_ok=True)
+        return tempfile.mkstemp(prefix=".tts-", dir=os.path.join(self.directory, key[:2]))
+
+    def commit(self, key: str, format: str, tmp_path: str) -> str:
+        path = self._path(key, format)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._load()
+            if key in self._entries:
+                self._bytes -= self._entries[key][1]
+            self._entries[key] = (path, size)
+            self._entries.move_to_end(key)
+            self._bytes += size
+            self._evict()
+        return path
+
+    def _drop(self, key: str) -> None:
+        path, size = self._entries.pop(key)
+        self._bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load()
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+audio_cache = AudioCache()
+
+
+async def read_chunks(f: Any, chunk_bytes: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Stream an open aiofiles handle and close it when done."""
+    try:
+        while True:
+            data = await f.read(chunk_bytes)
+            if not data:
+                return
+            yield data
+    finally:
+        await f.close()
+
+
+async def synthesize_cached(
+    provider: SpeechProvider,
+    text: str,
+    voice: str | None = None,
+    format: str = "mp3",
+    cache: AudioCache | None = None,
+) -> Tuple[bool, AsyncIterator[bytes]]:
+    """Return ``(hit, chunks)``. Misses stream from the provider while teeing into the cache;
+    the entry is only committed once the provider finished, so partial audio is never served."""
+    cache = cache or audio_cache
+    voice = voice or settings.tts_voice
+    check_format(format)
+    key = audio_key(provider.name, voice, format, text)
+    path = await asyncio.to_thread(cache.get, key) if settings.speech_cache_enabled else None
+    if path is not None:
+        try:
+            # Open before reporting the hit: eviction may unlink the file right after get(),
+            # and an open handle still reads it; a file already gone is served as a miss.
+            return True, read_chunks(await aiofiles.open(path, "rb"))
+        except FileNotFoundError:
+            pass
+
+    async def tee() -> AsyncIterator[bytes]:
+        if not settings.speech_cache_enabled:
+            with observe_speech(provider.name, "synthesize"):
+                async for chunk in provider.synthesize_stream(text, voice=voice, format=format):
+                    yield chunk
+            return
+        fd, tmp = await asyncio.to_thread(cache.new_temp, key)
+        done = False
+        try:
+            async with aiofiles.open(fd, "wb") as f:
+                with observe_speech(provider.name, "synthesize"):
+                    async for chunk in provider.synthesize_stream(text, voice=voice,
+                                                                  format=format):
+                        await f.write(chunk)
+                        yield chunk
+            await asyncio.to_thread(cache.commit, key, format, tmp)
+            done = True
+        finally:
+            if not done and os.path.exists(tmp):
+                os.remove(tmp)
+
+    return False, tee()
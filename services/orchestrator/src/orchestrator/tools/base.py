@@ -1,26 +1,54 @@
 from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
+
+from .. import manifest
+from ..core.plugins import LazyRegistry
+
+
+class ToolResult:
+    """Final item of ``Tool.stream``; everything yielded before it is a partial chunk."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
 
 class Tool(ABC):
     name: str
     description: str
+    timeout: float | None = None  # seconds; None -> settings.tool_timeout_s
+    # Read-only tools can opt into the result cache (see tools/cache.py)
+    cacheable: bool = False
+    cache_ttl: float | None = None
+    # Tools that can emit partial output implement stream(); callers opt in per call.
+    streaming: bool = False
 
     @abstractmethod
-    async def run(self, **kwargs) -> Any:  # noqa: ANN401
+    async def run(self, **kwargs: Any) -> Any:  # noqa: ANN401
         ...
 
-class ToolRegistry:
-    def __init__(self):
-        self._tools: Dict[str, Tool] = {}
+    async def stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """Yield partial chunks, then a ``ToolResult``. Default: a single ``run``."""
+        yield ToolResult(await self.run(**kwargs))
+
+    def cache_key(self, **kwargs: Any) -> Dict[str, Any]:
+        """Normalised params used as the cache key."""
+        return kwargs
 
-    def register(self, tool: Tool):
-        self._tools[tool.name] = tool
+    def cache_fingerprint(self, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Cheap validator; a cached entry is stale once this value changes."""
+        return None
 
-    def get(self, name: str) -> Tool:
-        return self._tools[name]
+    def cache_paths(self, **kwargs: Any) -> List[str]:
+        """Filesystem paths whose modification should evict the entry eagerly."""
+        return []
 
-    def list(self):
-        return list(self._tools.keys())
+class ToolRegistry(LazyRegistry[Tool]):
+    kind = "Tool"
 
 tool_registry = ToolRegistry()
+tool_registry.declare(manifest.TOOLS)
+tool_registry.discover("orchestrator.tools")
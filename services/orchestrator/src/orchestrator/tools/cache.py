@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Set, Tuple
+
+import orjson
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .base import Tool
+
+_Key = Tuple[str, bytes]
+
+
+class _Entry:
+    __slots__ = ("value", "fingerprint", "size", "paths", "expires")
+
+    def __init__(self, value: Any, fingerprint: Any, size: int, paths: Tuple[str, ...],
+                 expires: float | None):
+        self.value = value
+        self.fingerprint = fingerprint
+        self.size = size
+        self.paths = paths
+        self.expires = expires
+
+
+class ToolResultCache:
+    """LRU, size-bounded cache of read-only tool results.
+
+    Entries are keyed on (tool name, normalised params) and validated on every hit
+    with the tool's ``cache_fingerprint`` (e.g. file mtime/inode, git index/HEAD).
+    Writers call ``invalidate_path`` to drop dependent entries eagerly.
+    Cached values are shared; callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        self.max_entries = max_entries or settings.tool_cache_max_entries
+        self.max_bytes = max_bytes or settings.tool_cache_max_bytes
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._by_path: Dict[str, Set[_Key]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(tool: Tool, params: Dict[str, Any]) -> _Key:
+        return tool.name, orjson.dumps(tool.cache_key(**params), option=orjson.OPT_SORT_KEYS)
+
+    def _drop(self, key: _Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for p in entry.paths:
+            keys = self._by_path.get(p)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_path[p]
+
+    async def call(self, tool: Tool, params: Dict[str, Any]) -> Any:
+        """Return a valid cached result for ``tool(**params)`` or run the tool and cache it."""
+        if not settings.tool_cache_enabled:
+            return await tool.run(**params)
+        key = self.make_key(tool, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh = entry.expires is None or entry.expires > time.monotonic()
+            if fresh and entry.fingerprint == tool.cache_fingerprint(**params):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.stale += 1
+            self._drop(key)
+        self.misses += 1
+        # Fingerprint before running so a concurrent change during the call is never masked.
+        fingerprint = tool.cache_fingerprint(**params)
+        value = await tool.run(**params)
+        self._store(key, tool, params, value, fingerprint)
+        return value
+
+    def _store(self, key: _Key, tool: Tool, params: Dict[str, Any], value: Any,
+               fingerprint: Any) -> None:
+        try:
+            size = len(orjson.dumps(value))
+        except TypeError:
+            return
+        if size > self.max_bytes:
+            return
+        paths = tuple(os.path.abspath(p) for p in tool.cache_paths(**params))
+        expires = time.monotonic() + tool.cache_ttl if tool.cache_ttl else None
+        self._drop(key)
+        self._entries[key] = _Entry(value, fingerprint, size, paths, expires)
+        self._bytes += size
+        for p in paths:
+            self._by_path.setdefault(p, set()).add(key)
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def invalidate_path(self, path: str) -> int:
+        """Drop entries depending on ``path`` or on any directory containing it."""
+        full = os.path.abspath(path)
+        dropped = 0
+        candidates = [full]
+        parent = os.path.dirname(full)
+        while parent and parent != candidates[-1]:
+            candidates.append(parent)
+            parent = os.path.dirname(parent)
+        for p in candidates:
+            for key in list(self._by_path.get(p, ())):
+                self._drop(key)
+                dropped += 1
+        self.invalidations += dropped
+        return dropped
+
+    def invalidate_tool(self, name: str) -> int:
+        keys = [k for k in self._entries if k[0] == name]
+        for k in keys:
+            self._drop(k)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_path.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.tool_cache_enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+tool_cache = ToolResultCache()
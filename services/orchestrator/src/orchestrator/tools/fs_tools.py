@@ -1,102 +1,270 @@
 from __future__ import annotations
+
+import asyncio
+import codecs
+import mmap
 import os
+from typing import Any, AsyncIterator, Dict, List
+
 import aiofiles
-from .base import Tool, tool_registry
+
 from ..config import settings
-import difflib
-from typing import List
+from .base import Tool, ToolResult, tool_registry
+from .cache import tool_cache
+from .patch import FilePatch, PatchError, apply_hunks, atomic_write, parse_patch, read_lines
+
+
+def _allowed_path(path: str) -> str:
+    full_path = os.path.abspath(path)
+    if not full_path.startswith(settings.allow_fs_base):
+        raise PermissionError("Path outside allowlist")
+    return full_path
+
+
+def _line_span(buf: mmap.mmap | bytes, start_line: int,
+               end_line: int | None) -> tuple[int, int, int]:
+    """Byte span of 1-based, inclusive lines ``start_line..end_line`` and the last line reached."""
+    pos, line = 0, 1
+    while line < start_line:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            return len(buf), len(buf), line
+        pos, line = nl + 1, line + 1
+    start = pos
+    if end_line is None:
+        return start, len(buf), -1
+    while line <= end_line:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            return start, len(buf), line
+        pos = nl + 1
+        if line == end_line:
+            break
+        line += 1
+    return start, pos, line
+
+
+def _read_range(full_path: str, offset: int, length: int | None, start_line: int | None,
+                end_line: int | None, cap: int) -> Dict[str, Any]:
+    """Blocking ranged read; large files are memory-mapped so only touched pages are loaded."""
+    size = os.path.getsize(full_path)
+    with open(full_path, "rb") as f:
+        mm = None
+        buf: mmap.mmap | bytes | None
+        if size and size >= settings.fs_mmap_threshold:  # mmap rejects empty files
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = mm
+        elif start_line is not None:
+            buf = f.read()
+        else:
+            buf = None
+        try:
+            out: Dict[str, Any] = {"size": size}
+            if start_line is not None:
+                assert buf is not None
+                start, end, last = _line_span(buf, max(1, start_line), end_line)
+                out["start_line"] = max(1, start_line)
+                if last >= 0:
+                    out["end_line"] = last
+            else:
+                start = min(max(0, offset), size)
+                end = size if length is None else min(size, start + max(0, length))
+            truncated = end - start > cap
+            end = min(end, start + cap)
+            if buf is not None:
+                data = bytes(buf[start:end])
+            else:
+                f.seek(start)
+                data = f.read(end - start)
+        finally:
+            if mm is not None:
+                mm.close()
+    out.update({"offset": start, "bytes": len(data), "truncated": truncated, "content": data})
+    if end < size:
+        out["next_offset"] = end
+    return out
+
+
+def _stream_span(full_path: str, offset: int, length: int | None, start_line: int | None,
+                 end_line: int | None) -> tuple[int, int, int]:
+    """``(size, start, end)`` byte span for a streamed read; line ranges resolve as in
+    ``_read_range``."""
+    size = os.path.getsize(full_path)
+    if start_line is None:
+        start = min(max(0, offset), size)
+        return size, start, size if length is None else min(size, start + max(0, length))
+    if not size:
+        return 0, 0, 0
+    with open(full_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, end, _ = _line_span(mm, max(1, start_line), end_line)
+    return size, start, end
+
 
 class FSReadTool(Tool):
     name = "fs.read"
-    description = "Read a text file from allowed base path"
+    description = "Read a text file (optionally a byte or line range) from allowed base path"
+    cacheable = True
+    streaming = True
+
+    async def run(self, path: str, offset: int = 0, length: int | None = None,  # type: ignore[override]
+                  start_line: int | None = None, end_line: int | None = None,
+                  max_bytes: int | None = None, encoding: str = "utf-8") -> Dict[str, Any]:
+        full_path = _allowed_path(path)
+        # max_bytes can only tighten the configured hard cap.
+        cap = min(max_bytes or settings.fs_read_max_bytes, settings.fs_read_max_bytes)
+        out = await asyncio.to_thread(_read_range, full_path, offset, length, start_line,
+                                      end_line, cap)
+        out["content"] = out["content"].decode(encoding, errors="replace")
+        return {"path": path, **out}
 
-    async def run(self, path: str):  # type: ignore[override]
-        full_path = os.path.abspath(path)
-        if not full_path.startswith(settings.allow_fs_base):
-            raise PermissionError("Path outside allowlist")
-        async with aiofiles.open(full_path, "r") as f:
-            return {"path": path, "content": await f.read()}
+    async def stream(self, path: str, offset: int = 0, length: int | None = None,  # type: ignore[override]
+                     start_line: int | None = None, end_line: int | None = None,
+                     max_bytes: int | None = None, chunk_bytes: int = 64 * 1024,
+                     encoding: str = "utf-8") -> AsyncIterator[Any]:
+        """Yield ``{offset, content}`` chunks, then a summary ``ToolResult``.
+
+        Takes the same range options as ``run``; ``max_bytes`` can only tighten FS_STREAM_MAX_BYTES.
+        """
+        full_path = _allowed_path(path)
+        cap = min(max_bytes or settings.fs_stream_max_bytes, settings.fs_stream_max_bytes)
+        size, start, end = await asyncio.to_thread(_stream_span, full_path, offset, length,
+                                                   start_line, end_line)
+        truncated = end - start > cap
+        end = min(end, start + cap)
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        chunks = 0
+        async with aiofiles.open(full_path, "rb") as f:
+            await f.seek(start)
+            pos = start
+            while pos < end:
+                data = await f.read(min(chunk_bytes, end - pos))
+                if not data:
+                    break
+                text = decoder.decode(data, final=pos + len(data) >= end)
+                yield {"offset": pos, "content": text}
+                pos += len(data)
+                chunks += 1
+        yield ToolResult({"path": path, "size": size, "offset": start, "bytes": pos - start,
+                          "chunks": chunks, "truncated": truncated})
+
+    def cache_key(self, path: str, **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
+        return {"path": os.path.abspath(path), **kwargs}
+
+    def cache_fingerprint(self, path: str, **kwargs: Any) -> Any:  # type: ignore[override]
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def cache_paths(self, path: str, **kwargs: Any) -> List[str]:  # type: ignore[override]
+        return [path]
+
+class FSReadManyTool(Tool):
+    name = "fs.read_many"
+    description = "Read several files concurrently (same range options as fs.read)"
+
+    async def run(self, paths: List[str], concurrency: int | None = None,  # type: ignore[override]
+                  **read_opts: Any) -> Dict[str, Any]:
+        reader = tool_registry.get("fs.read")
+        sem = asyncio.Semaphore(concurrency or settings.fs_read_many_concurrency)
+
+        async def one(p: str) -> Dict[str, Any]:
+            async with sem:
+                try:
+                    result: Dict[str, Any] = await tool_cache.call(reader, {"path": p, **read_opts})
+                    return result
+                except Exception as e:  # noqa: BLE001 - per-path errors don't fail the batch
+                    return {"path": p, "error": str(e) or type(e).__name__}
+
+        return {"files": await asyncio.gather(*(one(p) for p in paths))}
 
 class FSWriteTool(Tool):
     name = "fs.write"
     description = "Write text content to file inside allowed base path"
 
-    async def run(self, path: str, content: str):  # type: ignore[override]
-        full_path = os.path.abspath(path)
-        if not full_path.startswith(settings.allow_fs_base):
-            raise PermissionError("Path outside allowlist")
+    async def run(self, path: str, content: str) -> Dict[str, Any]:  # type: ignore[override]
+        full_path = _allowed_path(path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         async with aiofiles.open(full_path, "w") as f:
             await f.write(content)
+        tool_cache.invalidate_path(full_path)
         return {"path": path, "bytes": len(content)}
 
 tool_registry.register(FSReadTool())
+tool_registry.register(FSReadManyTool())
 tool_registry.register(FSWriteTool())
 
 class FSApplyPatchTool(Tool):
     name = "fs.apply_patch"
-    description = "Apply a unified diff patch to a file (text)."
-
-    async def run(self, path: str, patch: str):  # type: ignore[override]
-        full_path = os.path.abspath(path)
-        if not full_path.startswith(settings.allow_fs_base):
-            raise PermissionError("Path outside allowlist")
-        # Read original
-        async with aiofiles.open(full_path, "r") as f:
-            original_lines = await f.readlines()
-        # Parse unified diff
-        patched = self._apply_unified_diff(original_lines, patch)
-        async with aiofiles.open(full_path, "w") as f:
-            await f.writelines(patched)
-        return {"path": path, "lines": len(patched)}
-
-    def _apply_unified_diff(self, original: List[str], patch_text: str) -> List[str]:
-        # Use difflib to apply; patch_text expected to contain unified diff with ---/+++ headers
-        diff_lines = patch_text.splitlines(keepends=True)
-        # difflib.restore requires a delta from ndiff; we have unified diff, so fallback manual patch
-        # Simplistic approach: use patch-like rebuild via Differ is non-trivial; instead attempt to apply using patch API logic.
-        # For robustness in MVP, if parsing fails, raise.
+    description = (
+        "Apply a unified diff (one or many files, incl. additions/deletions). "
+        "With 'path' the patch targets that file; otherwise paths are resolved under 'base_dir'."
+    )
+
+    async def run(self, patch: str, path: str | None = None, base_dir: str | None = None,  # type: ignore[override]
+                  fuzz: int | None = None) -> Dict[str, Any]:
+        fuzz = settings.patch_fuzz if fuzz is None else fuzz
+        touched: List[str] = []
         try:
-            # Reconstruct target using difflib.patch-like algorithm (not built-in). We'll manually apply hunks.
-            return self._apply_manual_unified(original, diff_lines)
-        except Exception as e:  # noqa: BLE001
-            raise ValueError(f"Failed to apply patch: {e}")
+            return await asyncio.to_thread(self._apply, patch, path, base_dir, fuzz, touched)
+        finally:
+            # The tool cache is loop-only state; invalidate here, even after a partial write.
+            for full_path in touched:
+                tool_cache.invalidate_path(full_path)
 
-    def _apply_manual_unified(self, original: List[str], diff_lines: List[str]) -> List[str]:
-        out = original[:]
-        i = 0
-        # Very minimal parser: supports single-file patch with @@ -a,b +c,d @@ hunks
-        for idx, line in enumerate(diff_lines):
-            if line.startswith('@@'):
-                # Extract line numbers
-                # Format: @@ -l,s +l2,s2 @@
-                header = line.split('@@')[1].strip()
-                parts = header.split(' ')
-                old_part = parts[0]  # like -12,5
-                new_part = parts[1]  # like +12,6
-                old_start = int(old_part.split(',')[0][1:])
-                # Build hunk content until next @@ or end
-                hunk: List[str] = []
-                for h in diff_lines[idx+1:]:
-                    if h.startswith('@@'):
-                        break
-                    if h.startswith('---') or h.startswith('+++'):
-                        continue
-                    hunk.append(h)
-                # Apply hunk: rebuild section
-                o_index = old_start - 1
-                # Collect new lines
-                new_lines: List[str] = []
-                remove_count = 0
-                for hline in hunk:
-                    if hline.startswith('+'):
-                        new_lines.append(hline[1:])
-                    elif hline.startswith('-'):
-                        remove_count += 1
-                    elif hline.startswith(' '):
-                        new_lines.append(hline[1:])
-                # Replace slice
-                out[o_index:o_index+remove_count] = new_lines
-        return out
+    def _apply(self, patch: str, path: str | None, base_dir: str | None,
+               fuzz: int, touched: List[str]) -> Dict[str, Any]:
+        try:
+            file_patches = parse_patch(patch)
+        except PatchError as e:
+            raise ValueError(f"Failed to apply patch: {e}")
+        if not file_patches:
+            raise ValueError("Failed to apply patch: no hunks found")
+        if path is not None and len(file_patches) > 1:
+            raise ValueError("Patch touches several files; omit 'path' and use 'base_dir'")
+        base = base_dir or settings.allow_fs_base
+        # Compute every result before writing anything so a failing hunk leaves the tree untouched.
+        plans: List[tuple[str, FilePatch, List[str] | None, Dict[str, Any]]] = []
+        for fp in file_patches:
+            if path is not None:
+                full_path = _allowed_path(path)
+            else:
+                if fp.target is None:
+                    raise ValueError(
+                        "Failed to apply patch: missing file header and no 'path' given")
+                full_path = _allowed_path(os.path.join(base, fp.target))
+            exists = os.path.exists(full_path)
+            if fp.is_new and exists and os.path.getsize(full_path):
+                raise ValueError(f"Failed to apply patch: {fp.target} already exists")
+            if not fp.is_new and not exists:
+                raise FileNotFoundError(full_path)
+            original = read_lines(full_path) if exists else []
+            try:
+                patched, info = apply_hunks(original, fp.hunks, fuzz=fuzz)
+            except PatchError as e:
+                raise ValueError(f"Failed to apply patch to {path or fp.target}: {e}")
+            if fp.is_delete:
+                if patched:
+                    raise ValueError(
+                        f"Failed to apply patch: {fp.target} not empty after deletion hunks")
+                plans.append((full_path, fp, None, info))
+            else:
+                plans.append((full_path, fp, patched, info))
+        files = []
+        for full_path, fp, new_lines, info in plans:
+            if new_lines is None:
+                os.remove(full_path)
+                action = "deleted"
+            else:
+                atomic_write(full_path, new_lines)
+                action = "created" if fp.is_new else "modified"
+            touched.append(full_path)
+            files.append({"path": full_path, "action": action, "lines": len(new_lines or ()),
+                          **info})
+        result: Dict[str, Any] = {"path": path, "files": files}
+        if path is not None:
+            result["lines"] = files[0]["lines"]
+        return result
 
 tool_registry.register(FSApplyPatchTool())
@@ -1,23 +1,251 @@
 from __future__ import annotations
+
 import os
-import git
-from .base import Tool, tool_registry
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
 from ..config import settings
+from .base import Tool, tool_registry
+from .process import ProcessExit, stream_process
+
+_STATUS_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+
+
+class NotAGitRepository(ValueError):
+    """No ancestor of the path contains a ``.git`` entry."""
+
+
+def find_repo_root(path: str) -> str | None:
+    """Nearest ancestor of ``path`` (inclusive) containing a ``.git`` entry."""
+    cur = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(cur, ".git")):
+            return cur
+        parent = os.path.dirname(cur)
+        if parent == cur:
+            return None
+        cur = parent
+
+
+def git_dir_for(root: str) -> str:
+    dot_git = os.path.join(root, ".git")
+    if os.path.isfile(dot_git):  # worktrees / submodules: "gitdir: <path>"
+        with open(dot_git) as f:
+            target = f.read().strip().removeprefix("gitdir:").strip()
+        return os.path.normpath(os.path.join(root, target))
+    return dot_git
+
+
+class RepoHandle:
+    """Resolved repository root and git directory; status itself always goes through the git CLI."""
+
+    __slots__ = ("root", "git_dir")
+
+    def __init__(self, root: str):
+        self.root = root
+        self.git_dir = git_dir_for(root)
+
+
+class RepoHandleCache:
+    """LRU of ``RepoHandle`` keyed by resolved root; path -> root lookups are memoised too."""
+
+    def __init__(self, max_handles: int = 64):
+        self.max_handles = max_handles
+        self._handles: "OrderedDict[str, RepoHandle]" = OrderedDict()
+        self._roots: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> RepoHandle:
+        full = os.path.abspath(path)
+        with self._lock:
+            root = self._roots.get(full)
+            if root is None or not os.path.exists(os.path.join(root, ".git")):
+                root = find_repo_root(full)
+                if root is None:
+                    raise NotAGitRepository(full)
+                if len(self._roots) >= self.max_handles * 64:
+                    self._roots.clear()
+                self._roots[full] = root
+            handle = self._handles.get(root)
+            if handle is None:
+                handle = self._handles[root] = RepoHandle(root)
+                while len(self._handles) > self.max_handles:
+                    self._handles.popitem(last=False)
+            else:
+                self._handles.move_to_end(root)
+            return handle
+
+    def clear(self) -> None:
+        with self._lock:
+            self._handles.clear()
+            self._roots.clear()
+
+
+repo_handles = RepoHandleCache()
+
+
+class StatusParser:
+    """Incremental parser for ``git status --porcelain=v2 -z --branch``.
+
+    Entries outside the ``offset``/``limit`` window are counted but not kept, so memory is
+    bounded by the page size rather than the number of changed files.
+    """
+
+    def __init__(self, offset: int = 0, limit: int | None = None):
+        self.offset, self.limit = offset, limit
+        self.branch: Dict[str, Any] = {}
+        self.lists: Dict[str, List[Any]] = {"untracked": [], "diff": [], "staged": [],
+                                            "conflicts": []}
+        self.totals = {name: 0 for name in self.lists}
+        self._tail = b""
+        self._orig_for: Dict[str, Any] | None = None
+
+    def _keep(self, name: str, item: Any) -> None:
+        n = self.totals[name]
+        self.totals[name] = n + 1
+        if n >= self.offset and (self.limit is None or n < self.offset + self.limit):
+            self.lists[name].append(item)
+
+    def feed(self, chunk: bytes) -> None:
+        parts = (self._tail + chunk).split(b"\0")
+        self._tail = parts.pop()
+        for part in parts:
+            self._record(os.fsdecode(part))
+
+    def close(self) -> None:
+        if self._tail:
+            self._record(os.fsdecode(self._tail))
+            self._tail = b""
+
+    def _record(self, rec: str) -> None:
+        if self._orig_for is not None:  # second path of a rename/copy record
+            self._orig_for["orig_path"] = rec
+            self._orig_for = None
+            return
+        if not rec:
+            return
+        kind = rec[0]
+        if kind == "#":
+            key, _, value = rec[2:].partition(" ")
+            if key == "branch.oid":
+                self.branch["oid"] = None if value == "(initial)" else value
+            elif key == "branch.head":
+                self.branch["head"] = None if value == "(detached)" else value
+            elif key == "branch.upstream":
+                self.branch["upstream"] = value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                self.branch["ahead"], self.branch["behind"] = int(ahead), -int(behind)
+        elif kind == "?":
+            self._keep("untracked", rec[2:])
+        elif kind in "12":
+            fields = rec.split(" ", 9 if kind == "2" else 8)
+            xy, path = fields[1], fields[-1]
+            entry: Dict[str, Any] = {"path": path, "index": xy[0], "worktree": xy[1]}
+            if kind == "2":
+                entry["score"] = fields[8]
+                self._orig_for = entry
+            if xy[0] != ".":
+                self._keep("staged", entry)
+            if xy[1] != ".":
+                self._keep("diff", entry)
+        elif kind == "u":
+            fields = rec.split(" ", 10)
+            self._keep("conflicts", {"path": fields[-1], "xy": fields[1]})
+
+    def result(self) -> Dict[str, Any]:
+        dirty = bool(self.totals["diff"] or self.totals["staged"] or self.totals["conflicts"])
+        out: Dict[str, Any] = {
+            "active_branch": self.branch.get("head"),
+            "head": self.branch.get("oid"),
+            "upstream": self.branch.get("upstream"),
+            "ahead": self.branch.get("ahead", 0),
+            "behind": self.branch.get("behind", 0),
+            "is_dirty": dirty,
+            **self.lists,
+            "totals": dict(self.totals),
+        }
+        if self.limit is not None:
+            end = self.offset + self.limit
+            out["next_offset"] = end if any(t > end for t in self.totals.values()) else None
+        return out
+
+
+def _stat_sig(path: str) -> Tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
 
 class GitStatusTool(Tool):
     name = "git.status"
     description = "Get git status for repository containing path"
+    cacheable = True
+    # Worktree edits outside fs.write/fs.apply_patch don't touch index/HEAD; bound staleness.
+    cache_ttl = 10.0
 
-    async def run(self, repo_path: str):  # type: ignore[override]
+    async def run(self, repo_path: str, limit: int | None = None, offset: int = 0,  # type: ignore[override]
+                  untracked: str = "all") -> Dict[str, Any]:
         full = os.path.abspath(repo_path)
         if not full.startswith(settings.allow_fs_base):
             raise PermissionError("Path outside allowlist")
-        repo = git.Repo(full, search_parent_directories=True)
-        return {
-            "active_branch": repo.active_branch.name if not repo.head.is_detached else None,
-            "is_dirty": repo.is_dirty(),
-            "untracked": repo.untracked_files,
-            "diff": [str(d) for d in repo.index.diff(None)],
-        }
+        if untracked not in ("all", "normal", "no"):
+            raise ValueError("untracked must be 'all', 'normal' or 'no'")
+        handle = repo_handles.get(full)
+        parser = StatusParser(offset=max(0, offset), limit=limit)
+        argv = ["git", "-C", handle.root, "status", "--porcelain=v2", "-z", "--branch",
+                f"--untracked-files={untracked}"]
+        exit_: ProcessExit | None = None
+        stderr = b""
+        async for item in stream_process(argv, env=_STATUS_ENV,
+                                         timeout=settings.git_status_timeout_s,
+                                         max_bytes=settings.git_status_max_bytes):
+            if isinstance(item, ProcessExit):
+                exit_ = item
+            elif item[0] == "stdout":
+                parser.feed(item[1])
+            else:
+                stderr += item[1]
+        if exit_ is None or exit_.timed_out:
+            raise TimeoutError("git status timed out")
+        if exit_.truncated:
+            # Output cap hit: git was killed, so its exit code says nothing. Return what was parsed;
+            # the unterminated record at the cut is dropped rather than closed.
+            return {"root": handle.root, **parser.result(), "truncated": True}
+        parser.close()
+        if exit_.code != 0:
+            message = stderr.decode(errors="replace").strip()
+            raise RuntimeError(message or f"git status exited with {exit_.code}")
+        return {"root": handle.root, **parser.result(), "truncated": False}
+
+    def cache_key(self, repo_path: str, **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
+        return {"repo_path": os.path.abspath(repo_path), **kwargs}
+
+    def cache_fingerprint(self, repo_path: str, **kwargs: Any) -> Any:  # type: ignore[override]
+        try:
+            handle = repo_handles.get(repo_path)
+        except NotAGitRepository:
+            return None
+        root, gdir = handle.root, handle.git_dir
+        try:
+            with open(os.path.join(gdir, "HEAD")) as f:
+                head = f.read().strip()
+        except OSError:
+            head = None
+        ref_sig = None
+        if head and head.startswith("ref:"):
+            ref = head[4:].strip()
+            ref_sig = (_stat_sig(os.path.join(gdir, ref)),
+                       _stat_sig(os.path.join(gdir, "packed-refs")))
+        return (root, head, ref_sig, _stat_sig(os.path.join(gdir, "index")))
+
+    def cache_paths(self, repo_path: str, **kwargs: Any) -> List[str]:  # type: ignore[override]
+        try:
+            return [repo_handles.get(repo_path).root]
+        except NotAGitRepository:
+            return [repo_path]
 
 tool_registry.register(GitStatusTool())
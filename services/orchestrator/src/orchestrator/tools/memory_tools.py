@@ -1,15 +1,122 @@
 from __future__ import annotations
-from .base import Tool, tool_registry
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+import numpy as np
+
+from ..embeddings.pipeline import embedding_pipeline
+from ..memory import store
+from ..memory.graph import graph_index
+from ..memory.indexer import repo_indexer
 from ..memory.store import simple_lexical_search
+from ..memory.vector_index import vector_index
+from .base import Tool, ToolResult, tool_registry
 
 
 class MemorySearchTool(Tool):
     name = "memory.search"
     description = "Search memory (ontology/parsing/vector fallback) for a query string"
+    cacheable = True
 
-    async def run(self, query: str, limit: int = 5):  # type: ignore[override]
-        results = simple_lexical_search(query, limit=limit)
+    async def run(self, query: str, limit: int = 5) -> Dict[str, Any]:  # type: ignore[override]
+        results = await asyncio.to_thread(simple_lexical_search, query, limit)
         return {"query": query, "results": results}
 
+    def cache_fingerprint(self, **kwargs: Any) -> int:
+        return store.generation()
+
+
+class MemoryVectorSearchTool(Tool):
+    name = "memory.vector_search"
+    description = ("Cosine-similarity search over VectorChunk embeddings (exact or IVF); "
+                   "pass a vector or a query to embed")
+
+    async def run(self, vector: List[float] | None = None, k: int = 10,  # type: ignore[override]
+                  mode: str = "auto", nprobe: int | None = None,
+                  query: str | None = None) -> Dict[str, Any]:
+        if vector is None:
+            if not query:
+                raise ValueError("vector or query required")
+            query_vector = (await embedding_pipeline.embed([query]))[0]
+        else:
+            query_vector = np.asarray(vector, dtype=np.float32)
+
+        def _search() -> List[Dict[str, Any]]:
+            vector_index.ensure_current()
+            hits = vector_index.search(query_vector, k=k, mode=mode, nprobe=nprobe)
+            rows = store.get_vector_chunks([i for i, _ in hits])
+            return [
+                {"id": i, "score": round(score, 6), "source": rows[i].source,
+                 "snippet": rows[i].content[:400]}
+                for i, score in hits
+                if i in rows
+            ]
+
+        return {"k": k, "mode": mode, "results": await asyncio.to_thread(_search)}
+
+
+class MemoryGraphExpandTool(Tool):
+    name = "memory.graph_expand"
+    description = ("Expand ontology item ids along GraphEdge relations "
+                   "(k hops, optional relation filter) or find a shortest path")
+
+    async def run(self, ids: List[int], hops: int = 1,  # type: ignore[override]
+                  relations: List[str] | None = None, direction: str = "out", limit: int = 50,
+                  target: int | None = None, items: bool = True) -> Dict[str, Any]:
+        def _expand() -> Dict[str, Any]:
+            graph_index.ensure_current()
+            if target is not None:
+                path = (graph_index.shortest_path(ids[0], target, relations, direction,
+                                                  max_hops=hops) if ids else None)
+                out = {"path": path}
+                found = [step["id"] for step in path or ()]
+            else:
+                nodes = graph_index.neighbors(ids, hops, relations, direction, limit=limit)
+                out = {"nodes": nodes}
+                found = [node["id"] for node in nodes]
+            if items:
+                rows = store.get_ontology_items(found)
+                for node in out.get("nodes") or out.get("path") or ():
+                    row = rows.get(node["id"])
+                    if row is not None:
+                        node.update(key=row.key, title=row.title, snippet=row.body[:200])
+            return out
+
+        return {"ids": ids, "hops": hops, **await asyncio.to_thread(_expand)}
+
+
+class MemoryIndexRepoTool(Tool):
+    name = "memory.index_repo"
+    description = ("Incrementally index a directory under the allowed base "
+                   "into ParsingItem/VectorChunk")
+    timeout = 1800.0
+    streaming = True
+
+    async def stream(self, path: str | None = None,  # type: ignore[override]
+                     background: bool = False) -> AsyncIterator[Any]:
+        # Runs as a job, so a timeout or disconnect leaves the indexing running; concurrent calls
+        # share it.
+        job = repo_indexer.start(path)
+        if background:
+            yield ToolResult(job.as_dict())
+            return
+        async for evt in job.follow():
+            if evt["phase"] != "done":
+                yield evt
+        if job.status != "completed":
+            raise RuntimeError(job.error or f"index job {job.status}")
+        yield ToolResult({"job": job.id, **(job.result or {})})
+
+    async def run(self, path: str | None = None, background: bool = False) -> Dict[str, Any]:  # type: ignore[override]
+        result: Dict[str, Any] = {}
+        async for item in self.stream(path=path, background=background):
+            if isinstance(item, ToolResult):
+                result = item.data
+        return result
+
 
 tool_registry.register(MemorySearchTool())
+tool_registry.register(MemoryVectorSearchTool())
+tool_registry.register(MemoryGraphExpandTool())
+tool_registry.register(MemoryIndexRepoTool())
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+DEV_NULL = "/dev/null"
+
+
+class PatchError(ValueError):
+    pass
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_len: int
+    new_start: int
+    new_len: int
+    # (" " | "-" | "+", text incl. newline)
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class FilePatch:
+    old_path: str | None
+    new_path: str | None
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def is_new(self) -> bool:
+        return self.old_path == DEV_NULL
+
+    @property
+    def is_delete(self) -> bool:
+        return self.new_path == DEV_NULL
+
+    @property
+    def target(self) -> str | None:
+        path = self.old_path if self.is_delete else self.new_path
+        if path in (None, DEV_NULL):
+            path = self.old_path
+        return strip_prefix(path) if path and path != DEV_NULL else None
+
+
+def strip_prefix(path: str) -> str:
+    """Drop git's ``a/`` / ``b/`` prefixes and any trailing timestamp."""
+    path = path.split("\t", 1)[0].strip()
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
+
+
+def split_lines(text: str) -> List[str]:
+    """Split on ``\\n`` only, keeping line endings.
+
+    str.splitlines would also split on \\f, \\x1c, ...
+    """
+    parts = text.split("\n")
+    out = [p + "\n" for p in parts[:-1]]
+    if parts[-1]:
+        out.append(parts[-1])
+    return out
+
+
+def parse_patch(patch_text: str) -> List[FilePatch]:
+    """Parse a (multi-file) unified diff in a single pass.
+
+    Hunk bodies are consumed by the counts in their ``@@`` header, so content lines that
+    look like headers (``--- x``) are handled, and a blank line inside a hunk is read as
+    empty context (editors and LLMs often strip the leading space).
+    """
+    lines = split_lines(patch_text)
+    files: List[FilePatch] = []
+    current: FilePatch | None = None
+    i, n = 0, len(lines)
+    while i < n:
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < n and lines[i + 1].startswith("+++ "):
+            old_path = line[4:].rstrip("\r\n").split("\t", 1)[0]
+            new_path = lines[i + 1][4:].rstrip("\r\n").split("\t", 1)[0]
+            current = FilePatch(old_path, new_path)
+            files.append(current)
+            i += 2
+            continue
+        m = _HUNK_RE.match(line)
+        if m is None:
+            i += 1  # "diff --git", "index ...", prose between files
+            continue
+        if current is None:
+            current = FilePatch(None, None)
+            files.append(current)
+        hunk = Hunk(
+            int(m.group(1)), int(m.group(2) or 1), int(m.group(3)), int(m.group(4) or 1)
+        )
+        i += 1
+        old_left, new_left = hunk.old_len, hunk.new_len
+        while i < n and (old_left > 0 or new_left > 0):
+            body = lines[i]
+            tag = body[:1]
+            if body.startswith("\\"):
+                i += 1
+                continue
+            if tag in ("\n", "\r") or body == "":
+                tag, text = " ", body
+            elif tag in (" ", "-", "+"):
+                text = body[1:]
+            else:
+                break
+            if tag == " ":
+                old_left -= 1
+                new_left -= 1
+            elif tag == "-":
+                old_left -= 1
+            else:
+                new_left -= 1
+            hunk.lines.append((tag, text))
+            i += 1
+        if old_left > 0 or new_left > 0:
+            raise PatchError(f"Truncated hunk at patch line {i}: "
+                             f"expected {hunk.old_len}/{hunk.new_len} lines")
+        # "\ No newline at end of file" applies to the line just before it.
+        if i < n and lines[i].startswith("\\") and hunk.lines:
+            tag, text = hunk.lines[-1]
+            hunk.lines[-1] = (tag, text.rstrip("\n"))
+            i += 1
+        current.hunks.append(hunk)
+    return files
+
+
+def _same(a: str, b: str) -> bool:
+    return a == b or a.rstrip("\r\n") == b.rstrip("\r\n")
+
+
+def _matches(lines: List[str], pos: int, block: List[str]) -> bool:
+    if pos < 0 or pos + len(block) > len(lines):
+        return False
+    for k, text in enumerate(block):
+        if not _same(lines[pos + k], text):
+            return False
+    return True
+
+
+def _locate(lines: List[str], expected: int, block: List[str], lo: int, max_drift: int) -> int:
+    """Nearest position >= ``lo`` where ``block`` matches, searching outward from ``expected``."""
+    if not block:
+        return max(lo, min(expected, len(lines)))
+    if _matches(lines, expected, block) and expected >= lo:
+        return expected
+    limit = max(expected - lo, len(lines) - expected)
+    limit = min(limit, max_drift) if max_drift >= 0 else limit
+    for d in range(1, limit + 1):
+        for pos in (expected - d, expected + d):
+            if pos >= lo and _matches(lines, pos, block):
+                return pos
+    return -1
+
+
+def apply_hunks(original: List[str], hunks: List[Hunk], fuzz: int = 2,
+                max_drift: int = -1) -> Tuple[List[str], Dict[str, Any]]:
+    """Apply hunks in order in one forward pass over ``original``.
+
+    Each hunk is placed at its header position shifted by the drift accumulated from
+    earlier hunks; if the context doesn't match there, the nearest matching position is
+    used, then up to ``fuzz`` outer context lines are ignored (like GNU patch).
+    """
+    out: List[str] = []
+    src = 0
+    drift = 0
+    applied: List[Dict[str, int]] = []
+    for h_index, hunk in enumerate(hunks):
+        old_block = [t for tag, t in hunk.lines if tag != "+"]
+        new_block = [t for tag, t in hunk.lines if tag != "-"]
+        anchor = hunk.old_start - 1 if hunk.old_len else hunk.old_start
+        expected = anchor + drift
+        pos, used_fuzz, lead = -1, 0, 0
+        for f in range(0, fuzz + 1):
+            lead = _leading_context(hunk.lines, f)
+            trail = _trailing_context(hunk.lines, f)
+            block = old_block[lead:len(old_block) - trail]
+            pos = _locate(original, expected + lead, block, src, max_drift)
+            if pos >= 0:
+                used_fuzz = f
+                new = new_block[lead:len(new_block) - trail]
+                break
+        if pos < 0:
+            raise PatchError(f"Hunk #{h_index + 1} "
+                             f"(@@ -{hunk.old_start},{hunk.old_len} @@) does not apply")
+        out.extend(original[src:pos])
+        out.extend(new)
+        src = pos + len(block)
+        drift = (pos - lead) - anchor
+        applied.append({"hunk": h_index + 1, "offset": drift, "fuzz": used_fuzz})
+    out.extend(original[src:])
+    return out, {"hunks": len(hunks), "applied": [a for a in applied if a["offset"] or a["fuzz"]]}
+
+
+def _leading_context(lines: List[Tuple[str, str]], limit: int) -> int:
+    n = 0
+    while n < limit and n < len(lines) and lines[n][0] == " ":
+        n += 1
+    return n
+
+
+def _trailing_context(lines: List[Tuple[str, str]], limit: int) -> int:
+    n = 0
+    while n < limit and n < len(lines) and lines[-1 - n][0] == " ":
+        n += 1
+    return n
+
+
+def read_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return split_lines(f.read())
+
+
+def atomic_write(path: str, lines: List[str]) -> None:
+    """Write via a temp file in the same directory and rename over the target."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    mode = os.stat(path).st_mode & 0o7777 if os.path.exists(path) else None
+    fd, tmp = tempfile.mkstemp(prefix=".patch-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
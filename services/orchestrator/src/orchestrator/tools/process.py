@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Sequence, Tuple
+
+from ..config import settings
+
+_KILL_GRACE_S = 0.5
+
+
+class SchedulerFull(RuntimeError):
+    pass
+
+
+class ProcessScheduler:
+    """Process-wide cap on concurrently running subprocesses.
+
+    Callers beyond ``max_procs`` wait in FIFO order; once ``max_queued`` are already
+    waiting new requests are rejected instead of piling up.
+    """
+
+    def __init__(self, max_procs: int | None = None, max_queued: int | None = None):
+        self.max_procs = max_procs or settings.terminal_max_procs
+        self.max_queued = max_queued if max_queued is not None else settings.terminal_max_queued
+        self._sem: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.running = 0
+        self.waiting = 0
+        self.started = 0
+        self.rejected = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._loop is not loop:
+            self._sem, self._loop = asyncio.Semaphore(self.max_procs), loop
+        return self._sem
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold one process slot; yields the time spent waiting for it in ms."""
+        sem = self._semaphore()
+        if sem.locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise SchedulerFull(f"too many queued processes ({self.waiting})")
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        self.started += 1
+        try:
+            yield (time.perf_counter() - start) * 1000
+        finally:
+            self.running -= 1
+            sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_procs": self.max_procs,
+            "running": self.running,
+            "waiting": self.waiting,
+            "started": self.started,
+            "rejected": self.rejected,
+        }
+
+
+process_scheduler = ProcessScheduler()
+
+
+@dataclass
+class ProcessExit:
+    code: int | None
+    timed_out: bool
+    truncated: bool
+    stdout_bytes: int
+    stderr_bytes: int
+    queued_ms: float
+    ms: float
+
+
+def _kill_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(proc.pid, sig)
+
+
+async def _terminate(proc: asyncio.subprocess.Process) -> None:
+    """SIGTERM the whole process group, SIGKILL it if it is still alive after a grace period."""
+    if proc.returncode is not None:
+        _kill_group(proc, signal.SIGKILL)  # leader exited; reap stragglers left in the group
+        return
+    _kill_group(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), _KILL_GRACE_S)
+    except asyncio.TimeoutError:
+        pass
+    _kill_group(proc, signal.SIGKILL)
+    await proc.wait()
+
+
+async def _pump(name: str, reader: asyncio.StreamReader,
+                out: asyncio.Queue[Tuple[str, bytes | None]], chunk_bytes: int) -> None:
+    while True:
+        data = await reader.read(chunk_bytes)
+        if not data:
+            break
+        await out.put((name, data))
+    await out.put((name, None))
+
+
+async def stream_process(
+    command: str | Sequence[str],
+    *,
+    timeout: float | None = None,
+    max_bytes: int | None = None,
+    cwd: str | None = None,
+    env: Dict[str, str] | None = None,
+    chunk_bytes: int = 64 * 1024,
+    scheduler: ProcessScheduler | None = None,
+) -> AsyncIterator[Tuple[str, bytes] | ProcessExit]:
+    """Run ``command`` (a shell string or argv) and yield ``(stream, bytes)`` as output arrives.
+
+    The process gets its own session/process group so timeouts, the output cap and
+    cancellation kill everything it spawned. The last item is a ``ProcessExit``.
+    """
+    timeout = settings.terminal_timeout_s if timeout is None else timeout
+    max_bytes = settings.terminal_max_output_bytes if max_bytes is None else max_bytes
+    scheduler = scheduler or process_scheduler
+    async with scheduler.slot() as queued_ms:
+        start = time.perf_counter()
+        kwargs: Dict[str, Any] = dict(
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,
+        )
+        if isinstance(command, str):
+            proc = await asyncio.create_subprocess_shell(command, **kwargs)
+        else:
+            proc = await asyncio.create_subprocess_exec(*command, **kwargs)
+        queue: asyncio.Queue[Tuple[str, bytes | None]] = asyncio.Queue(maxsize=8)
+        pumps = [
+            asyncio.create_task(_pump("stdout", proc.stdout, queue, chunk_bytes)),  # type: ignore[arg-type]
+            asyncio.create_task(_pump("stderr", proc.stderr, queue, chunk_bytes)),  # type: ignore[arg-type]
+        ]
+        sizes = {"stdout": 0, "stderr": 0}
+        open_streams, timed_out, truncated = 2, False, False
+        deadline = time.monotonic() + timeout
+        try:
+            while open_streams:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                try:
+                    name, data = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    break
+                if data is None:
+                    open_streams -= 1
+                    continue
+                room = max_bytes - sizes["stdout"] - sizes["stderr"]
+                if len(data) > room:
+                    data, truncated = data[:room], True
+                if data:
+                    sizes[name] += len(data)
+                    yield name, data
+                if truncated:
+                    break
+            if timed_out or truncated:
+                await _terminate(proc)
+            else:
+                remaining = max(0.0, deadline - time.monotonic())
+                try:
+                    await asyncio.wait_for(proc.wait(), remaining)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    await _terminate(proc)
+        finally:
+            # Also runs on cancellation (client gone, executor timeout) and generator close.
+            for task in pumps:
+                task.cancel()
+            if proc.returncode is None:
+                _kill_group(proc, signal.SIGKILL)
+                with contextlib.suppress(Exception):
+                    await asyncio.shield(proc.wait())
+        result = ProcessExit(
+            code=proc.returncode,
+            timed_out=timed_out,
+            truncated=truncated,
+            stdout_bytes=sizes["stdout"],
+            stderr_bytes=sizes["stderr"],
+            queued_ms=round(queued_ms, 2),
+            ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+    yield result
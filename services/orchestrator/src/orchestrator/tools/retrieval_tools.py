@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from ..memory.retrieval import hybrid_retriever
+from .base import Tool, tool_registry
+
+
+class RetrievalSearchTool(Tool):
+    name = "retrieval.search"
+    description = ("Hybrid search: lexical, vector and ontology key/tag axes in parallel, "
+                   "fused by reciprocal rank")
+
+    async def run(self, query: str, limit: int = 10, axes: List[str] | None = None,  # type: ignore[override]
+                  vector: List[float] | None = None) -> Dict[str, Any]:
+        return await hybrid_retriever.search(query, limit=limit, axes=axes, vector=vector)
+
+
+tool_registry.register(RetrievalSearchTool())
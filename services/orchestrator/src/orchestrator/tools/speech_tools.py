@@ -1,26 +1,39 @@
 from __future__ import annotations
+
 import base64
-from .base import Tool, tool_registry
+from typing import Any, Dict
+
+from ..config import settings
+from ..core.metrics import observe_speech
 from ..speech.base import speech_registry
+from ..speech.cache import synthesize_cached
+from .base import Tool, tool_registry
 
 
 class SpeechTranscribeTool(Tool):
     name = "speech.transcribe"
     description = "Transcribe audio (base64) to text using speech provider"
 
-    async def run(self, audio_base64: str, provider: str = "openai", language: str | None = None):  # type: ignore[override]
+    async def run(self, audio_base64: str, provider: str = "openai",  # type: ignore[override]
+                  language: str | None = None) -> Dict[str, Any]:
         audio_bytes = base64.b64decode(audio_base64)
         prov = speech_registry.get(provider)
-        return await prov.transcribe(audio_bytes, language=language)
+        with observe_speech(prov.name, "transcribe"):
+            return await prov.transcribe(audio_bytes, language=language)
 
 
 class SpeechSynthesizeTool(Tool):
     name = "speech.synthesize"
     description = "Synthesize text to speech returning base64 audio"
 
-    async def run(self, text: str, provider: str = "openai", voice: str | None = None, format: str = "mp3"):  # type: ignore[override]
+    async def run(self, text: str, provider: str = "openai",  # type: ignore[override]
+                  voice: str | None = None, format: str = "mp3") -> Dict[str, Any]:
         prov = speech_registry.get(provider)
-        return await prov.synthesize(text, voice=voice, format=format)
+        hit, chunks = await synthesize_cached(prov, text, voice=voice, format=format)
+        audio = b"".join([c async for c in chunks])
+        return {"audio_base64": base64.b64encode(audio).decode(),
+                "voice": voice or settings.tts_voice, "format": format, "provider": prov.name,
+                "chars": len(text), "cached": hit}
 
 
 tool_registry.register(SpeechTranscribeTool())
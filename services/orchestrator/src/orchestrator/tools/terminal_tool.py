@@ -1,32 +1,71 @@
 from __future__ import annotations
-import asyncio
+
+import codecs
 import shlex
-from .base import Tool, tool_registry
+from typing import Any, AsyncIterator, Dict, List
+
 from ..config import settings
+from .base import Tool, ToolResult, tool_registry
+from .process import ProcessExit, stream_process
 
 SAFE_PREFIXES = ["echo", "ls", "pwd", "cat", "grep", "head", "tail"]
 
 class TerminalExecTool(Tool):
     name = "terminal.exec"
     description = "Execute a safe shell command (restricted)"
+    streaming = True
 
-    async def run(self, command: str):  # type: ignore[override]
+    def _check(self, command: str) -> None:
         if not settings.enable_terminal:
             raise PermissionError("Terminal tool disabled")
         first = shlex.split(command)[0]
         if first not in SAFE_PREFIXES:
             raise PermissionError("Command not allowed")
-        proc = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        return {
-            "command": command,
-            "code": proc.returncode,
-            "stdout": stdout.decode(),
-            "stderr": stderr.decode(),
-        }
+
+    async def run(self, command: str, timeout: float | None = None,  # type: ignore[override]
+                  max_bytes: int | None = None) -> Dict[str, Any]:
+        out: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        summary: Dict[str, Any] = {}
+        async for item in self.stream(command, timeout=timeout, max_bytes=max_bytes):
+            if isinstance(item, ToolResult):
+                summary = item.data
+            else:
+                out[item["stream"]].append(item["data"])
+        return {**summary, "stdout": "".join(out["stdout"]), "stderr": "".join(out["stderr"])}
+
+    async def stream(self, command: str, timeout: float | None = None,  # type: ignore[override]
+                     max_bytes: int | None = None, **_: Any) -> AsyncIterator[Any]:
+        """Yield ``{stream, data}`` chunks as the process writes them, then an exit summary.
+
+        ``timeout`` and ``max_bytes`` may only tighten TERMINAL_TIMEOUT_S /
+        TERMINAL_MAX_OUTPUT_BYTES.
+        """
+        self._check(command)
+        timeout = min(timeout or settings.terminal_timeout_s, settings.terminal_timeout_s)
+        cap = settings.terminal_max_output_bytes
+        max_bytes = min(max_bytes or cap, cap)
+        decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+                    for name in ("stdout", "stderr")}
+        async for item in stream_process(command, timeout=timeout, max_bytes=max_bytes):
+            if isinstance(item, ProcessExit):
+                for name, dec in decoders.items():
+                    tail = dec.decode(b"", final=True)
+                    if tail:
+                        yield {"stream": name, "data": tail}
+                yield ToolResult({
+                    "command": command,
+                    "code": item.code,
+                    "timed_out": item.timed_out,
+                    "truncated": item.truncated,
+                    "stdout_bytes": item.stdout_bytes,
+                    "stderr_bytes": item.stderr_bytes,
+                    "queued_ms": item.queued_ms,
+                    "ms": item.ms,
+                })
+            else:
+                name, data = item
+                text = decoders[name].decode(data)
+                if text:
+                    yield {"stream": name, "data": text}
 
 tool_registry.register(TerminalExecTool())
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+import pytest
+
+# Runtime files default to ./data; singletons open them at import time, so redirect before any
+# orchestrator module is imported and keep test runs from writing into the tree.
+_RUNTIME = tempfile.mkdtemp(prefix="orchestrator-tests-")
+for _var, _name in (("RESPONSE_CACHE_PATH", "response_cache.db"),
+                    ("EMBEDDING_CACHE_PATH", "embedding_cache.db"),
+                    ("SPEECH_CACHE_DIR", "tts_cache"), ("VECTOR_INDEX_DIR", "vector_index")):
+    os.environ.setdefault(_var, os.path.join(_RUNTIME, _name))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_RUNTIME}/orchestrator.db")
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    """Point the memory store (and derived indexes) at a fresh SQLite file."""
+    from orchestrator import config as cfg
+    from orchestrator.memory import store
+    from orchestrator.memory.graph import graph_index
+    from orchestrator.memory.vector_index import vector_index
+    monkeypatch.setattr(cfg.settings, "database_url", f"sqlite:///{tmp_path}/memory.db")
+    monkeypatch.setattr(store, "_engine", None)
+    monkeypatch.setattr(vector_index, "directory", str(tmp_path / "vector_index"))
+    monkeypatch.setattr(vector_index, "generation", -1)
+    monkeypatch.setattr(graph_index, "generation", -1)
+    yield store
+    if store._engine is not None:
+        store._engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_response_cache(tmp_path, monkeypatch):
+    """Keep provider responses and embeddings from leaking between tests (or into ./data)."""
+    from orchestrator import config as cfg
+    from orchestrator.embeddings.pipeline import VectorCache, embedding_pipeline
+    from orchestrator.providers.cache import _SQLiteTier, response_cache
+    monkeypatch.setattr(cfg.settings, "response_cache_path", str(tmp_path / "response_cache.db"))
+    monkeypatch.setattr(cfg.settings, "embedding_cache_path", str(tmp_path / "embedding_cache.db"))
+    vectors = VectorCache(cfg.settings.embedding_cache_path)
+    monkeypatch.setattr(embedding_pipeline, "cache", vectors)
+    tier = _SQLiteTier(cfg.settings.response_cache_path, 100)
+    monkeypatch.setattr(response_cache, "sqlite", tier)
+    response_cache.memory.clear()
+    yield response_cache
+    tier.close()
+    vectors.close()
+    response_cache.memory.clear()
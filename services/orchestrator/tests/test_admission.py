@@ -0,0 +1,135 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from orchestrator.config import settings
+from orchestrator.providers.admission import (
+    AdmissionController,
+    FairGate,
+    TokenBucket,
+    backoff_delay,
+)
+from orchestrator.providers.base import ChatProvider
+
+MSGS = [{"role": "user", "content": "hi"}]
+
+
+def _http_error(status, retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://upstream.test/v1/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("upstream", request=request, response=response)
+
+
+class FlakyProvider(ChatProvider):
+    name = "test-flaky"
+
+    def __init__(self, failures=0, status=429, fail_after_token=False, hold=0.0):
+        self.failures, self.status = failures, status
+        self.fail_after_token, self.hold = fail_after_token, hold
+        self.calls = 0
+
+    async def stream_chat(self, messages, model=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _http_error(self.status, "0.01")
+        await asyncio.sleep(self.hold)
+        yield {"type": "token", "token": "ok"}
+        if self.fail_after_token:
+            raise _http_error(503)
+
+
+async def test_fair_gate_round_robins_sessions():
+    gate = FairGate(limit=1, max_queue=10)
+    await gate.acquire("a")
+    order = []
+
+    async def waiter(session, tag):
+        await gate.acquire(session)
+        order.append(tag)
+
+    tasks = [asyncio.create_task(waiter("a", f"a{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(waiter("b", "b0")))
+    await asyncio.sleep(0)
+    assert gate.queued == 4
+    for _ in range(4):
+        gate.release()
+        await asyncio.sleep(0)
+    assert order == ["a0", "b0", "a1", "a2"]
+
+    late = asyncio.create_task(gate.acquire("c"))
+    await asyncio.sleep(0)
+    late.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await late
+    assert gate.queued == 0 and gate.active == 1
+
+
+def test_token_bucket_and_backoff():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    assert backoff_delay(0, _http_error(429, "2")) == 2.0
+    past = _http_error(429, "Wed, 21 Oct 2015 07:28:00 GMT")
+    assert backoff_delay(0, past) == 0.0
+    rng = random.Random(1)
+    delays = [backoff_delay(attempt, _http_error(503), rng) for attempt in range(10)]
+    assert all(0 <= d <= settings.retry_max_ms / 1000 for d in delays)
+
+
+async def test_retries_honour_retry_after_until_output():
+    ctl = AdmissionController()
+    prov = FlakyProvider(failures=2)
+    events = [e async for e in ctl.stream(prov, MSGS, "m", session="s")]
+    assert [e["type"] for e in events] == ["retry", "retry", "token"]
+    assert events[0]["delay_ms"] == 10.0 and prov.calls == 3
+
+    with pytest.raises(httpx.HTTPStatusError):
+        [e async for e in ctl.stream(FlakyProvider(failures=10), MSGS, "m")]
+    with pytest.raises(httpx.HTTPStatusError):  # 400s are not retried
+        [e async for e in ctl.stream(FlakyProvider(failures=1, status=400), MSGS, "m")]
+    prov = FlakyProvider(fail_after_token=True)
+    with pytest.raises(httpx.HTTPStatusError):  # never replay a partially streamed answer
+        [e async for e in ctl.stream(prov, MSGS, "m")]
+    assert prov.calls == 1
+
+
+async def test_queued_calls_report_depth_and_wait(monkeypatch):
+    monkeypatch.setattr(settings, "provider_max_concurrency", {"test-flaky": 1})
+    ctl = AdmissionController()
+    prov = FlakyProvider(hold=0.05)
+
+    async def run(session):
+        return [e async for e in ctl.stream(prov, MSGS, "m", session=session)]
+
+    first, second = await asyncio.gather(run("a"), run("b"))
+    assert [e["type"] for e in first] == ["token"]
+    assert second[0]["type"] == "admission" and second[0]["queue_depth"] == 1
+    assert second[0]["wait_ms"] >= 40
+    gate = ctl.stats()["gates"]["test-flaky"]
+    assert gate["waited"] == 1 and gate["active"] == 0
+
+
+def test_malformed_retry_after_falls_back_to_backoff():
+    delay = backoff_delay(0, _http_error(503, "soon"), random.Random(1))
+    assert 0 <= delay <= settings.retry_max_ms / 1000
+
+
+async def test_retries_spend_rate_limit_tokens(monkeypatch):
+    monkeypatch.setitem(settings.provider_rate_limits, "test-flaky", 1000)
+    reserved = []
+    real_reserve = TokenBucket.reserve
+
+    def reserve(self):
+        reserved.append(self)
+        return real_reserve(self)
+
+    monkeypatch.setattr(TokenBucket, "reserve", reserve)
+    prov = FlakyProvider(failures=2)
+    events = [e async for e in AdmissionController().stream(prov, MSGS, "m")]
+    assert [e["type"] for e in events] == ["retry", "retry", "token"]
+    assert len(reserved) == prov.calls == 3
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from orchestrator.config import settings
+from orchestrator.embeddings.base import embedding_registry
+from orchestrator.embeddings.pipeline import EmbeddingPipeline, embedding_pipeline, plan_batches
+from orchestrator.embeddings.stub import StubEmbeddingProvider
+from orchestrator.tools.memory_tools import MemoryVectorSearchTool
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    prov = StubEmbeddingProvider(latency=0.01, max_batch=3)
+    monkeypatch.setitem(embedding_registry._items, "stub", prov)
+    monkeypatch.setattr(settings, "embedding_provider", "stub")
+    monkeypatch.setattr(settings, "embedding_model", "stub-model")
+    monkeypatch.setattr(embedding_pipeline, "cache",
+                        EmbeddingPipeline(str(tmp_path / "emb.db")).cache)
+    return prov
+
+
+def test_plan_batches_respects_count_and_token_limits():
+    items = [(str(i), "x" * 40) for i in range(7)]  # 10 estimated tokens each
+    assert [len(b) for b in plan_batches(items, max_items=3, max_tokens=1000)] == [3, 3, 1]
+    assert [len(b) for b in plan_batches(items, max_items=100, max_tokens=25)] == [2, 2, 2, 1]
+    # An oversized text is still sent, alone.
+    assert [len(b) for b in plan_batches([("big", "x" * 400)], 3, 25)] == [1]
+
+
+async def test_dedupes_batches_and_persists_vectors(stub, tmp_path):
+    pipe = EmbeddingPipeline(str(tmp_path / "cache.db"))
+    texts = ["alpha beta", "gamma", "alpha beta", "delta", "eps", "zeta", "gamma"]
+    vecs = await pipe.embed(texts)
+    assert stub.texts == 5 and stub.calls == 2  # 5 distinct texts, max_batch=3
+    assert np.array_equal(vecs[0], vecs[2]) and vecs[0].dtype == np.float32
+    assert np.allclose(vecs[1], StubEmbeddingProvider.vector("gamma"))
+
+    again = EmbeddingPipeline(str(tmp_path / "cache.db"))  # fresh process, same cache file
+    await again.embed(texts + ["new text"])
+    assert stub.texts == 6 and again.counters["cache_hits"] == 5
+
+    a, b = await asyncio.gather(pipe.embed(["shared one"]), pipe.embed(["shared one"]))
+    assert stub.texts == 7 and pipe.counters["joined"] == 1 and np.array_equal(a[0], b[0])
+
+
+async def test_embed_pending_writes_back_and_feeds_vector_search(stub, memory_db):
+    texts = ["parse the config file", "render html template", "parse the config file",
+             "open socket"]
+    for i, text in enumerate(texts):
+        memory_db.add_vector_chunk(f"f{i}.py#L1-2", text)
+    events = []
+    summary = await embedding_pipeline.embed_pending(progress=events.append)
+    assert summary["rows"] == 4 and summary["unique"] == 3 and summary["embedded"] == 3
+    assert events[-1] == {"phase": "embed", "done": 4, "total": 4}
+    assert memory_db.count_pending_vector_chunks() == 0
+    assert (await embedding_pipeline.embed_pending())["rows"] == 0
+
+    out = await MemoryVectorSearchTool().run(query="config parse", k=2)
+    assert {r["source"] for r in out["results"]} == {"f0.py#L1-2", "f2.py#L1-2"}
+    with pytest.raises(ValueError):
+        await MemoryVectorSearchTool().run()
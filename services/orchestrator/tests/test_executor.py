@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from orchestrator.core.executor import ToolExecutor, build_graph
+from orchestrator.tools.base import Tool, tool_registry
+
+
+class SleepTool(Tool):
+    name = "test.sleep"
+    description = "Sleep then echo"
+
+    async def run(self, delay: float, value: str = ""):  # type: ignore[override]
+        await asyncio.sleep(delay)
+        return value
+
+class FailTool(Tool):
+    name = "test.fail"
+    description = "Always fails"
+
+    async def run(self):  # type: ignore[override]
+        raise RuntimeError("boom")
+
+tool_registry.register(SleepTool())
+tool_registry.register(FailTool())
+
+def _sleep(id, delay, **extra):
+    return {"id": id, "name": "test.sleep", "params": {"delay": delay, "value": id}, **extra}
+
+async def test_independent_calls_run_concurrently_in_completion_order():
+    calls = [_sleep("slow", 0.2), _sleep("a", 0.05), _sleep("b", 0.05)]
+    start = time.perf_counter()
+    events = [e async for e in ToolExecutor(max_concurrency=4).run(calls)]
+    assert time.perf_counter() - start < 0.35
+    results = [e["id"] for e in events if e["type"] == "tool_result"]
+    assert results[-1] == "slow"
+    assert [e["type"] for e in events[:3]] == ["tool_start"] * 3
+
+async def test_dependencies_and_failures():
+    calls = [
+        _sleep("first", 0.01),
+        _sleep("second", 0.01, depends_on=["first"]),
+        {"id": "bad", "name": "test.fail"},
+        _sleep("after_bad", 0.01, depends_on=["bad", "first"]),
+        _sleep("slow", 1.0, timeout=0.05),
+    ]
+    events = [e async for e in ToolExecutor().run(calls)]
+    done = {e["id"]: e for e in events if e["type"] in ("tool_result", "tool_error")}
+    order = [e["id"] for e in events if e["type"] == "tool_result"]
+    assert order.index("first") < order.index("second")
+    assert done["bad"]["error"] == "boom"
+    assert done["after_bad"]["type"] == "tool_error"
+    assert "dependency" in done["after_bad"]["error"]
+    assert done["slow"]["error"] == "timeout"
+    assert not any(e["type"] == "tool_start" and e["id"] == "after_bad" for e in events)
+
+def test_graph_validation():
+    with pytest.raises(ValueError):
+        build_graph([{"id": "a", "name": "x", "depends_on": ["b"]},
+                     {"id": "b", "name": "x", "depends_on": ["a"]}])
+    with pytest.raises(ValueError):
+        build_graph([{"id": "a", "name": "x", "depends_on": ["missing"]}])
+
+async def test_tool_results_are_added_to_the_prompt(monkeypatch):
+    from orchestrator.core.chat import chat_stream
+    from orchestrator.providers.base import provider_registry
+    from orchestrator.providers.gemini_stub import GeminiStubProvider
+
+    seen = []
+
+    class Capture(GeminiStubProvider):
+        async def stream_chat(self, messages, model=None):  # type: ignore[override]
+            seen.append(messages)
+            async for evt in super().stream_chat(messages, model):
+                yield evt
+
+    monkeypatch.setitem(provider_registry._items, "capture", Capture("capture"))
+    msgs = [{"role": "user", "content": "hi"}]
+    calls = [_sleep("slow", 0.05), {"name": "test.fail"}]
+    _ = [e async for e in chat_stream(msgs, provider="capture", tool_calls=calls, cache=False)]
+    assert msgs == [{"role": "user", "content": "hi"}]
+    prompt = seen[0][-1]
+    assert prompt["role"] == "system"
+    # Call order, not completion order.
+    assert prompt["content"].splitlines()[1:] == [
+        '{"tool":"test.sleep","id":"slow","result":"slow"}',
+        '{"tool":"test.fail","id":"1","error":"boom"}',
+    ]
@@ -0,0 +1,72 @@
+import pytest
+
+from orchestrator.core.executor import ToolExecutor
+from orchestrator.tools.fs_tools import FSReadManyTool, FSReadTool
+
+
+@pytest.fixture
+def fs_base(tmp_path, monkeypatch):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "allow_fs_base", str(tmp_path))
+    return tmp_path
+
+@pytest.mark.parametrize("mmap_threshold", [0, 1 << 30])
+async def test_ranges_and_cap(fs_base, monkeypatch, mmap_threshold):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "fs_mmap_threshold", mmap_threshold)
+    path = fs_base / "log.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    read = FSReadTool()
+
+    out = await read.run(path=str(path), start_line=3, end_line=5)
+    assert out["content"] == "line 3\nline 4\nline 5\n"
+    assert out["end_line"] == 5
+
+    out = await read.run(path=str(path), offset=7, length=6)
+    assert out["content"] == "line 2" and out["next_offset"] == 13
+
+    monkeypatch.setattr(cfg.settings, "fs_read_max_bytes", 10)
+    out = await read.run(path=str(path), max_bytes=1000)
+    assert out["bytes"] == 10 and out["truncated"] and out["next_offset"] == 10
+
+async def test_read_many_reports_per_path_errors(fs_base):
+    (fs_base / "a").write_text("A")
+    (fs_base / "b").write_text("B")
+    out = await FSReadManyTool().run(paths=[str(fs_base / "a"), str(fs_base / "missing"),
+                                            str(fs_base / "b")])
+    files = out["files"]
+    assert [f.get("content") for f in files] == ["A", None, "B"]
+    assert "error" in files[1]
+
+async def test_streamed_read_emits_chunks(fs_base):
+    path = fs_base / "big.txt"
+    path.write_text("é" * 50)  # 100 bytes; 7-byte chunks split multibyte chars
+    calls = [{"name": "fs.read", "params": {"path": str(path), "chunk_bytes": 7}, "stream": True}]
+    events = [e async for e in ToolExecutor().run(calls)]
+    chunks = [e["data"]["content"] for e in events if e["type"] == "tool_chunk"]
+    assert len(chunks) == 15 and "".join(chunks) == "é" * 50
+    final = events[-1]
+    assert final["type"] == "tool_result" and final["data"]["bytes"] == 100
+
+async def test_streamed_read_honours_line_range_and_cap(fs_base):
+    path = fs_base / "log.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    read = FSReadTool()
+    items = [i async for i in read.stream(path=str(path), start_line=3, end_line=5, chunk_bytes=4)]
+    assert "".join(i["content"] for i in items[:-1]) == "line 3\nline 4\nline 5\n"
+    items = [i async for i in read.stream(path=str(path), start_line=3, max_bytes=10)]
+    assert "".join(i["content"] for i in items[:-1]) == "line 3\nlin"
+    assert items[-1].data["truncated"]
+    with pytest.raises(TypeError):
+        [i async for i in read.stream(path=str(path), lines="1-3")]
+
+async def test_empty_file_with_mmap_threshold_zero(fs_base, monkeypatch):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "fs_mmap_threshold", 0)
+    path = fs_base / "empty.txt"
+    path.write_text("")
+    read = FSReadTool()
+    assert (await read.run(path=str(path)))["content"] == ""
+    assert (await read.run(path=str(path), start_line=2))["content"] == ""
+    items = [i async for i in read.stream(path=str(path), start_line=1)]
+    assert items[-1].data["bytes"] == 0
@@ -0,0 +1,52 @@
+from sqlmodel import Session
+
+from orchestrator.memory import fts, models
+
+
+def test_fts_ranked_search_beyond_scan_cap(memory_db):
+    eng = memory_db.get_engine()
+    assert fts.backend() == "fts5"
+    with Session(eng) as s:
+        for i in range(700):
+            s.add(models.ParsingItem(source=f"log{i}.txt", content=f"routine entry number {i}"))
+        s.commit()
+    memory_db.add_ontology_item("k1", "Vector search", "Notes on vector search and vector indexes")
+    memory_db.add_ontology_item("k2", "Misc", "A passing mention of vector")
+    memory_db.add_vector_chunk("late.py#L1-3", "the needle appears only in row 703")
+
+    results = memory_db.simple_lexical_search("vector", limit=5)
+    assert [r["id"] for r in results[:2]] == [1, 2]
+    assert all(r["axis"] == "OntologyItem" for r in results[:2])
+    assert "<mark>" in results[0]["snippet"]
+    assert results[0]["score"] >= results[1]["score"]
+
+    late = memory_db.simple_lexical_search("needle")
+    assert late == [{"axis": "VectorChunk", "id": 1, "score": late[0]["score"],
+                     "snippet": late[0]["snippet"]}]
+
+def test_fts_tracks_updates_and_deletes(memory_db):
+    eng = memory_db.get_engine()
+    item_id = memory_db.add_ontology_item("k", "Alpha", "original body")
+    with Session(eng) as s:
+        item = s.get(models.OntologyItem, item_id)
+        item.body = "rewritten body"
+        s.add(item)
+        s.commit()
+    assert memory_db.simple_lexical_search("original") == []
+    assert len(memory_db.simple_lexical_search("rewritten")) == 1
+    with Session(eng) as s:
+        s.delete(s.get(models.OntologyItem, item_id))
+        s.commit()
+    assert memory_db.simple_lexical_search("rewritten") == []
+
+def test_query_is_sanitised(memory_db):
+    memory_db.add_ontology_item("k", "Quotes", 'he said "hi" AND NOT bye')
+    assert memory_db.simple_lexical_search('"hi" NOT (') != []
+    assert memory_db.simple_lexical_search("***") == []
+
+def test_postgres_headlines_only_the_limited_rows():
+    sql = fts._postgres_search_sql()
+    limited = sql.index("LIMIT :limit")
+    # Snippets are built by the outer query over the ranked, limited subquery.
+    assert sql.count("ts_headline") == 1 and sql.index("ts_headline") < sql.index("FROM (")
+    assert sql.index("FROM (") < limited < sql.index("LEFT JOIN")
@@ -0,0 +1,84 @@
+import subprocess
+
+import pytest
+
+from orchestrator.tools.git_tools import GitStatusTool, StatusParser, repo_handles
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True,
+                   capture_output=True)
+
+
+@pytest.fixture()
+def repo(tmp_path):
+    from orchestrator import config as cfg
+
+    old = cfg.settings.allow_fs_base
+    cfg.settings.allow_fs_base = str(tmp_path)
+    _git(tmp_path, "init", "-q", "-b", "main")
+    for name in ("a.txt", "b.txt", "old name.txt"):
+        (tmp_path / name).write_text(name + "\n")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    yield tmp_path
+    cfg.settings.allow_fs_base = old
+    repo_handles.clear()
+
+
+def test_parser_handles_split_records():
+    raw = (
+        b"# branch.oid abc\0# branch.head main\0# branch.upstream origin/main\0# branch.ab +2 -1\0"
+        b"1 .M N... 100644 100644 100644 h1 h2 a.txt\0"
+        b"2 R. N... 100644 100644 100644 h1 h2 R100 new name.txt\0old name.txt\0"
+        b"? dir/un tracked\0"
+    )
+    parser = StatusParser()
+    for i in range(0, len(raw), 7):  # arbitrary chunk boundaries, including mid-record
+        parser.feed(raw[i:i + 7])
+    parser.close()
+    out = parser.result()
+    assert out["active_branch"] == "main" and (out["ahead"], out["behind"]) == (2, 1)
+    assert out["diff"] == [{"path": "a.txt", "index": ".", "worktree": "M"}]
+    assert out["staged"][0]["orig_path"] == "old name.txt"
+    assert out["staged"][0]["path"] == "new name.txt"
+    assert out["untracked"] == ["dir/un tracked"] and out["is_dirty"]
+
+
+async def test_status_on_real_repo(repo):
+    (repo / "a.txt").write_text("changed\n")
+    (repo / "b.txt").write_text("staged\n")
+    _git(repo, "add", "b.txt")
+    _git(repo, "mv", "old name.txt", "new name.txt")
+    (repo / "sub").mkdir()
+    for i in range(5):
+        (repo / "sub" / f"u{i}.txt").write_text("x")
+    res = await GitStatusTool().run(repo_path=str(repo / "sub"))
+    assert res["root"] == str(repo) and res["active_branch"] == "main" and res["is_dirty"]
+    assert [d["path"] for d in res["diff"]] == ["a.txt"]
+    assert {d["path"] for d in res["staged"]} == {"b.txt", "new name.txt"}
+    assert sorted(res["untracked"]) == [f"sub/u{i}.txt" for i in range(5)]
+
+    page = await GitStatusTool().run(repo_path=str(repo), limit=2, offset=2)
+    assert len(page["untracked"]) == 2 and page["totals"]["untracked"] == 5
+    assert page["next_offset"] == 4
+    assert page["diff"] == []  # only one diff entry, before the window
+
+
+async def test_clean_repo_and_handle_reuse(repo):
+    tool = GitStatusTool()
+    res = await tool.run(repo_path=str(repo))
+    assert not res["is_dirty"] and res["untracked"] == [] and res["head"]
+    assert repo_handles.get(str(repo)) is repo_handles.get(str(repo / "a.txt"))
+
+
+async def test_status_output_cap_returns_partial_result(repo, monkeypatch):
+    from orchestrator import config as cfg
+
+    for i in range(200):
+        (repo / f"untracked-{i:03d}.txt").write_text("x")
+    monkeypatch.setattr(cfg.settings, "git_status_max_bytes", 500)
+    res = await GitStatusTool().run(repo_path=str(repo))
+    assert res["truncated"] and res["active_branch"] == "main"
+    assert 0 < len(res["untracked"]) < 200
+    assert all(name.startswith("untracked-") and name.endswith(".txt") for name in res["untracked"])
@@ -0,0 +1,71 @@
+import random
+from collections import deque
+
+from orchestrator.config import settings
+from orchestrator.memory.graph import GraphIndex, graph_index
+from orchestrator.tools.memory_tools import MemoryGraphExpandTool
+
+
+def _reference_hops(edges, seeds, hops, relations, direction):
+    adj = {}
+    for a, b, r in edges:
+        if relations and r not in relations:
+            continue
+        if direction in ("out", "both"):
+            adj.setdefault(a, set()).add(b)
+        if direction in ("in", "both"):
+            adj.setdefault(b, set()).add(a)
+    dist, queue = {s: 0 for s in seeds}, deque(seeds)
+    while queue:
+        node = queue.popleft()
+        if dist[node] == hops:
+            continue
+        for nxt in adj.get(node, ()):
+            if nxt not in dist:
+                dist[nxt] = dist[node] + 1
+                queue.append(nxt)
+    return {n: d for n, d in dist.items() if d > 0}
+
+
+def test_k_hop_matches_reference_across_csr_and_delta(monkeypatch):
+    monkeypatch.setattr(settings, "graph_compact_edges", 64)
+    rng = random.Random(3)
+    relations = ["is_a", "part_of", "see_also"]
+    edges = [(rng.randrange(300), rng.randrange(300), rng.choice(relations)) for _ in range(1500)]
+    graph = GraphIndex()
+    # Many small inserts: some compacted, some still in the delta.
+    for start in range(0, len(edges), 50):
+        graph.add_edges(edges[start:start + 50])
+    assert graph.counters["compactions"] and graph.stats()["pending"] and len(graph) == 1500
+    for seeds, hops, rels, direction in (([1], 2, None, "out"), ([5, 9], 3, ["is_a"], "in"),
+                                         ([7], 2, ["part_of", "see_also"], "both")):
+        got = {n["id"]: n["hop"] for n in graph.neighbors(seeds, hops, rels, direction)}
+        assert got == _reference_hops(edges, seeds, hops, rels, direction)
+
+
+def test_shortest_path_and_relation_filter():
+    graph = GraphIndex()
+    graph.add_edges([(1, 2, "is_a"), (2, 3, "is_a"), (3, 4, "part_of"), (1, 4, "see_also")])
+    assert graph.shortest_path(1, 4) == [{"id": 1, "relation": None},
+                                         {"id": 4, "relation": "see_also"}]
+    assert [s["id"] for s in graph.shortest_path(1, 4, ["is_a", "part_of"])] == [1, 2, 3, 4]
+    assert graph.shortest_path(4, 1) is None
+    assert graph.shortest_path(4, 1, direction="in")[-1] == {"id": 1, "relation": "see_also"}
+    assert [n["id"] for n in graph.neighbors([1], 1, ["is_a"])] == [2]
+
+
+async def test_graph_expand_tool_refreshes_incrementally(memory_db):
+    a, b, c = (memory_db.add_ontology_item(k, k.title(), f"{k} body")
+               for k in ("alpha", "beta", "gamma"))
+    memory_db.add_graph_edges([(a, b, "is_a")])
+    out = await MemoryGraphExpandTool().run(ids=[a], hops=2)
+    assert [(n["id"], n["hop"], n["key"]) for n in out["nodes"]] == [(b, 1, "beta")]
+
+    memory_db.add_graph_edges([(b, c, "part_of")])
+    out = await MemoryGraphExpandTool().run(ids=[a], hops=2)
+    assert [(n["id"], n["relation"], n["from"]) for n in out["nodes"]] == [(b, "is_a", a),
+                                                                           (c, "part_of", b)]
+    assert graph_index.counters["refreshes"] >= 1 and graph_index.last_id == 2
+
+    out = await MemoryGraphExpandTool().run(ids=[a], target=c, hops=3)
+    assert [step["title"] for step in out["path"]] == ["Alpha", "Beta", "Gamma"]
@@ -0,0 +1,56 @@
+import orjson
+from fastapi.testclient import TestClient
+
+from orchestrator.api.main import app
+from orchestrator.memory.history import SessionHistory, count_tokens
+
+
+def _frames(resp):
+    return [orjson.loads(f.split("data: ", 1)[1]) for f in resp.text.split("\n\n") if f]
+
+def test_session_history_is_sent_and_persisted(memory_db, monkeypatch):
+    import orchestrator.core.chat as chat
+    history = SessionHistory()
+    monkeypatch.setattr(chat, "session_history", history)
+    client = TestClient(app)
+    client.post("/chat/stream", json={"message": "first", "provider": "gemini", "session_id": "7"})
+    frames = _frames(client.post("/chat/stream", json={"message": "second", "provider": "gemini",
+                                                       "session_id": "7"}))
+    assert frames[0]["type"] == "session" and frames[0]["context_messages"] == 3
+    # The echo stub joins every user message it receives.
+    assert frames[1]["token"] == "[gemini-stub] first second"
+    assert history.stats()["loads"] == 1
+    roles = [r[0] for r in memory_db.load_session_messages(7)]
+    assert roles == ["user", "assistant", "user", "assistant"]
+
+    # A cold cache reloads the same history from the DB.
+    cold = SessionHistory()
+    monkeypatch.setattr(chat, "session_history", cold)
+    frames = _frames(client.post("/chat/stream", json={"message": "third", "provider": "gemini",
+                                                       "session_id": "7"}))
+    assert frames[1]["token"] == "[gemini-stub] first second third"
+
+def test_bad_session_id_rejected():
+    resp = TestClient(app).post("/chat/stream", json={"message": "x", "session_id": "abc"})
+    assert resp.status_code == 400
+
+async def test_context_respects_token_budget(memory_db):
+    history = SessionHistory()
+    for i in range(50):
+        await history.append(1, "user", "x" * 40)
+    per_msg = count_tokens("x" * 40)
+    ctx, tokens = await history.context(1, budget=per_msg * 5)
+    assert len(ctx) == 5 and tokens == per_msg * 5
+    assert len((await history.context(1, budget=1))[0]) == 1
+
+async def test_history_is_capped_at_the_budget_window(memory_db, monkeypatch):
+    from orchestrator.config import settings
+    per_msg = count_tokens("x" * 40)
+    monkeypatch.setattr(settings, "context_token_budget", per_msg * 10)
+    history = SessionHistory()
+    for i in range(100):
+        await history.append(1, "user", "x" * 40)
+    # Trimmed in halves, so never more than twice the window is held.
+    assert len(history._sessions[1].messages) <= 20
+    ctx, tokens = await history.context(1, budget=per_msg * 50)
+    assert len(ctx) == 10 and tokens == per_msg * 10
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from orchestrator.core.http_pool import HTTPClientPool
+from orchestrator.providers.openai_provider import OPENAI_API_BASE, OpenAIProvider
+
+SSE_BODY = b'data: {"choices":[{"delta":{"content":"hi"}}]}\n\ndata: [DONE]\n\n'
+
+async def test_pool_reuses_client_per_origin():
+    pool = HTTPClientPool()
+    a = pool.get("https://api.example.com/v1/chat")
+    b = pool.get("https://api.example.com/v1/embeddings")
+    c = pool.get("https://other.example.com/v1")
+    assert a is b
+    assert a is not c
+    await pool.aclose()
+    assert a.is_closed and c.is_closed
+    assert pool.get("https://api.example.com/v1") is not a
+
+def test_client_replaced_for_a_new_loop_is_closed():
+    pool = HTTPClientPool()
+
+    async def get() -> httpx.AsyncClient:
+        return pool.get("https://api.example.com/v1")
+
+    old = asyncio.run(get())
+    new = asyncio.run(get())
+    assert new is not old and old.is_closed
+    asyncio.run(pool.aclose())
+
+async def test_openai_provider_uses_shared_pool(monkeypatch):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "openai_api_key", "test")
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, content=SSE_BODY, headers={"content-type": "text/event-stream"})
+
+    provider = OpenAIProvider()
+    provider.http_pool = HTTPClientPool(transport=httpx.MockTransport(handler))
+    for _ in range(2):
+        events = [e async for e in provider.stream_chat([{"role": "user", "content": "x"}])]
+        assert events[-1]["type"] == "token"
+    assert len(calls) == 2
+    assert len(provider.http_pool.stats()["origins"]) == 1
+    assert provider.http_pool.get(OPENAI_API_BASE) is provider.http_pool.get(OPENAI_API_BASE)
+    await provider.http_pool.aclose()
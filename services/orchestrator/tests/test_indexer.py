@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from sqlmodel import Session, select
+
+from orchestrator.config import settings
+from orchestrator.memory import indexer, models
+from orchestrator.memory.chunking import chunk_text
+from orchestrator.memory.indexer import IgnoreRules, RepoIndexer, index_tree
+
+PY = '''import os
+
+CONST = 1
+
+
+@decorator
+def alpha(x):
+    return x + 1
+
+
+class Beta:
+    def one(self):
+        return 1
+
+    def two(self):
+        return 2
+'''
+
+
+def test_python_and_markdown_chunk_boundaries():
+    chunks = chunk_text(PY, "python", max_lines=80, min_lines=1)
+    assert [(c.kind, c.name, c.start) for c in chunks] == [("code", "", 1),
+                                                          ("function", "alpha", 6),
+                                                          ("class", "Beta", 11)]
+    chunks = chunk_text(PY, "python", max_lines=4, min_lines=1)  # Beta too large: split per method
+    assert [c.name for c in chunks if c.name] == ["alpha", "Beta", "Beta.one", "Beta.two"]
+    md = "# Title\nintro\n\n## A\ntext a\n\n## B\ntext b\n"
+    assert [c.name for c in chunk_text(md, "markdown", min_lines=1)] == ["Title", "A", "B"]
+    big = "".join(f"line {i}\n" for i in range(250))
+    spans = [(c.start, c.end) for c in chunk_text(big, None, max_lines=100)]
+    assert spans == [(1, 100), (101, 200), (201, 250)]
+
+
+def test_gitignore_rules_nest_and_negate(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("!keep.log\n")
+    rules = IgnoreRules(str(tmp_path), [".git"])
+    assert rules.ignored("a.log", False) and rules.ignored("build", True)
+    assert not rules.ignored("pkg/keep.log", False) and rules.ignored("pkg/other.log", False)
+    assert rules.ignored(".git", True) and not rules.ignored("src/main.py", False)
+
+
+def _chunks(source_prefix):
+    with Session(indexer.store.get_engine()) as s:
+        return [c for c in s.exec(select(models.VectorChunk)).all()
+                if c.source.startswith(source_prefix)]
+
+
+@pytest.fixture
+def repo(tmp_path, memory_db, monkeypatch):
+    base = tmp_path / "base"
+    (base / "proj" / "node_modules").mkdir(parents=True)
+    (base / "proj" / ".gitignore").write_text("*.tmp\n")
+    (base / "proj" / "app.py").write_text(PY)
+    (base / "proj" / "README.md").write_text("# Readme\nhello\n")
+    (base / "proj" / "scratch.tmp").write_text("ignored")
+    (base / "proj" / "node_modules" / "dep.js").write_text("function x() {}\n")
+    (base / "proj" / "blob.bin").write_bytes(b"\0\1\2")
+    monkeypatch.setattr(settings, "allow_fs_base", str(base))
+    return base / "proj"
+
+
+async def test_incremental_reindex_only_touches_changed_files(repo):
+    events = []
+    first = await index_tree("proj", events.append)
+    # .gitignore, app.py, README.md, blob.bin
+    assert (first["files"], first["changed"], first["skipped"]) == (4, 3, 1)
+    assert events[0]["phase"] == "scan" and events[-1]["phase"] == "parse"
+    assert {c.source.split("#")[0] for c in _chunks("proj/")} == {"proj/.gitignore", "proj/app.py",
+                                                                  "proj/README.md"}
+
+    again = await index_tree("proj")
+    assert again["candidates"] == 0 and again["changed"] == 0
+
+    os.utime(repo / "README.md", ns=(1, 1))  # new mtime, same content: hashed, not re-chunked
+    (repo / "app.py").write_text(PY.replace("return 2", "return 3"))
+    third = await index_tree("proj")
+    assert (third["candidates"], third["unchanged"], third["changed"]) == (2, 1, 1)
+    assert third["chunks_removed"] == third["chunks_added"]
+    assert any("return 3" in c.content for c in _chunks("proj/app.py"))
+    assert not any("return 2" in c.content for c in _chunks("proj/app.py"))
+
+    (repo / "README.md").unlink()
+    fourth = await index_tree("proj")
+    assert fourth["removed"] == 1 and not _chunks("proj/README.md")
+
+
+async def test_process_pool_and_background_job(repo, monkeypatch):
+    for i in range(5):
+        (repo / f"mod{i}.py").write_text(PY)
+    monkeypatch.setattr(indexer, "INLINE_MAX_FILES", 2)
+    monkeypatch.setattr(settings, "index_workers", 2)
+    monkeypatch.setattr(settings, "index_batch_files", 3)
+    jobs = RepoIndexer()
+    job = jobs.start("proj")
+    assert jobs.start("proj") is job  # joins the running job
+    events = [e async for e in job.follow()]
+    assert job.status == "completed" and job.result["workers"] == 2 and job.result["changed"] == 8
+    phases = [e["phase"] for e in events]
+    assert phases[0] == "scan" and phases.count("parse") == 3 and phases[-1] == "done"
+    assert [e["seq"] for e in events] == list(range(len(events)))
+    with pytest.raises(PermissionError):
+        jobs.start("../../etc")
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+import orjson
+from fastapi.testclient import TestClient
+
+from orchestrator.api.main import app
+from orchestrator.core import metrics
+from orchestrator.core.logs import JsonFormatter, RequestIdFilter, request_id
+
+
+def _value(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+async def _events():
+    yield {"type": "route", "provider": "p-test", "model": "m"}
+    for t in "abc":
+        await asyncio.sleep(0.01)
+        yield {"type": "token", "token": t}
+
+
+async def test_instrument_stream_records_ttft_gaps_and_total():
+    before = _value("orchestrator_chat_token_gap_seconds_count", provider="p-test")
+    out = [e async for e in metrics.instrument_stream(_events(), "class:c", None)]
+    assert len(out) == 4
+    # "m" is not a configured model, so it is folded into "other" to keep label cardinality bounded.
+    assert _value("orchestrator_chat_ttft_seconds_count", provider="p-test", model="other") >= 1
+    assert _value("orchestrator_chat_ttft_seconds_sum", provider="p-test", model="other") >= 0.005
+    assert _value("orchestrator_chat_ttft_seconds_count", provider="p-test", model="m") == 0
+    assert _value("orchestrator_chat_token_gap_seconds_count", provider="p-test") - before == 2
+    assert _value("orchestrator_chat_stream_seconds_count", provider="p-test", status="ok") >= 1
+
+
+def test_metrics_endpoint_and_request_id():
+    client = TestClient(app)
+    resp = client.post("/chat/stream", json={"message": "hi", "provider": "gemini"},
+                       headers={"X-Request-ID": "req-1"})
+    assert resp.headers["x-request-id"] == "req-1"
+    assert client.get("/healthz").headers["x-request-id"]  # generated when absent
+    body = client.get("/metrics").text
+    assert 'orchestrator_chat_ttft_seconds_count{model="gpt-4o-mini",provider="gemini"}' in body
+    client.post("/chat/stream",
+                json={"message": "hi", "provider": "gemini", "model": "client-chosen-123"})
+    body = client.get("/metrics").text
+    assert "client-chosen-123" not in body and 'model="other",provider="gemini"' in body
+    assert ('orchestrator_http_request_seconds_count'
+            '{method="POST",route="/chat/stream",status="200"}') in body
+    assert "orchestrator_admission_queue_depth" in body
+
+
+def test_json_log_lines_carry_fields_and_request_id():
+    record = logging.LogRecord("orchestrator.tools", logging.INFO, __file__, 1, "tool_run", None,
+                               None)
+    record.tool, record.ms = "fs.read", 1.5
+    token = request_id.set("abc")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+    doc = orjson.loads(JsonFormatter().format(record))
+    assert doc["event"] == "tool_run" and doc["tool"] == "fs.read" and doc["ms"] == 1.5
+    assert doc["request_id"] == "abc" and doc["level"] == "info"
+
+
+def test_unknown_model_class_rejected_before_any_series():
+    resp = TestClient(app).post("/chat/stream", json={"message": "x", "model_class": "nope"})
+    assert resp.status_code == 400 and "model_class" in resp.json()["detail"]
+    count = _value("orchestrator_chat_stream_seconds_count", provider="class:nope", status="error")
+    assert count == 0
@@ -0,0 +1,80 @@
+import pytest
+
+from orchestrator.tools.fs_tools import FSApplyPatchTool
+from orchestrator.tools.patch import apply_hunks, parse_patch, split_lines
+
+
+@pytest.fixture()
+def base(tmp_path):
+    from orchestrator import config as cfg
+
+    old = cfg.settings.allow_fs_base
+    cfg.settings.allow_fs_base = str(tmp_path)
+    yield tmp_path
+    cfg.settings.allow_fs_base = old
+
+
+def _lines(n):
+    return [f"l{i}\n" for i in range(1, n + 1)]
+
+
+def test_multi_hunk_tracks_offsets():
+    patch = (
+        "@@ -2,3 +2,4 @@\n l2\n-l3\n+L3\n+new\n l4\n"
+        "@@ -8,3 +9,2 @@\n l8\n-l9\n l10\n"
+    )
+    out, info = apply_hunks(_lines(12), parse_patch(patch)[0].hunks)
+    assert out == ["l1\n", "l2\n", "L3\n", "new\n"] + _lines(8)[3:] + ["l10\n", "l11\n", "l12\n"]
+    assert info["applied"] == []
+
+
+def test_context_search_and_fuzz():
+    hunks = parse_patch("@@ -2,3 +2,3 @@\n l2\n-l3\n+L3\n l4\n")[0].hunks
+    shifted = ["x\n", "y\n"] + _lines(6)
+    out, info = apply_hunks(shifted, hunks)
+    assert out[4] == "L3\n" and info["applied"][0]["offset"] == 2
+
+    drifted_context = ["l1\n", "CHANGED\n", "l3\n", "l4\n"]
+    out, info = apply_hunks(drifted_context, hunks, fuzz=1)
+    assert out == ["l1\n", "CHANGED\n", "L3\n", "l4\n"] and info["applied"][0]["fuzz"] == 1
+    with pytest.raises(ValueError):
+        apply_hunks(drifted_context, hunks, fuzz=0)
+
+
+def test_parse_edge_cases():
+    # A removed line that looks like a header, a blank context line and a missing final newline.
+    patch = "--- a/f\n+++ b/f\n@@ -1,3 +1,2 @@\n--- x\n\n-end\n+END\n\\ No newline at end of file\n"
+    [fp] = parse_patch(patch)
+    assert fp.target == "f"
+    assert fp.hunks[0].lines == [("-", "-- x\n"), (" ", "\n"), ("-", "end\n"), ("+", "END")]
+    out, _ = apply_hunks(split_lines("-- x\n\nend\n"), fp.hunks)
+    assert "".join(out) == "\nEND"
+
+
+async def test_multi_file_add_modify_delete(base):
+    (base / "keep.txt").write_text("a\nb\nc\n")
+    (base / "gone.txt").write_text("bye\n")
+    patch = (
+        "diff --git a/keep.txt b/keep.txt\n--- a/keep.txt\n+++ b/keep.txt\n"
+        "@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        "--- /dev/null\n+++ b/sub/new.txt\n@@ -0,0 +1,2 @@\n+hello\n+world\n"
+        "--- a/gone.txt\n+++ /dev/null\n@@ -1 +0,0 @@\n-bye\n"
+    )
+    res = await FSApplyPatchTool().run(patch=patch)
+    assert [f["action"] for f in res["files"]] == ["modified", "created", "deleted"]
+    assert (base / "keep.txt").read_text() == "a\nB\nc\n"
+    assert (base / "sub" / "new.txt").read_text() == "hello\nworld\n"
+    assert not (base / "gone.txt").exists()
+
+
+async def test_failing_hunk_writes_nothing(base):
+    (base / "one.txt").write_text("a\n")
+    (base / "two.txt").write_text("z\n")
+    patch = (
+        "--- a/one.txt\n+++ b/one.txt\n@@ -1 +1 @@\n-a\n+A\n"
+        "--- a/two.txt\n+++ b/two.txt\n@@ -1 +1 @@\n-nope\n+N\n"
+    )
+    with pytest.raises(ValueError):
+        await FSApplyPatchTool().run(patch=patch)
+    assert (base / "one.txt").read_text() == "a\n"
+    assert not [p for p in base.iterdir() if p.name.startswith(".patch-")]
@@ -0,0 +1,47 @@
+import importlib
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator import manifest
+from orchestrator.core.plugins import LazyRegistry, PluginSpec
+
+
+def test_manifest_matches_implementations():
+    specs = (manifest.TOOLS + manifest.CHAT_PROVIDERS + manifest.SPEECH_PROVIDERS
+             + manifest.EMBEDDING_PROVIDERS)
+    for spec in specs:
+        module_name, _, attr = spec.target.partition(":")
+        cls = getattr(importlib.import_module(module_name), attr)
+        assert cls.name == spec.name
+        if hasattr(cls, "description"):
+            assert cls.description == spec.description
+            assert cls.cacheable == spec.meta.get("cacheable", False)
+            assert cls.streaming == spec.meta.get("streaming", False)
+
+
+def test_lazy_registry_imports_on_first_get(tmp_path, monkeypatch):
+    (tmp_path / "lazy_plugin_mod.py").write_text(
+        "class Thing:\n    name = 'thing'\n    description = 'from module'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    reg = LazyRegistry()
+    reg.declare([PluginSpec("thing", "lazy_plugin_mod:Thing", "declared")])
+    assert "thing" in reg and reg.list() == ["thing"]
+    assert reg.describe()[0]["loaded"] is False and "lazy_plugin_mod" not in sys.modules
+    assert reg.get("thing").name == "thing"
+    assert reg.describe()[0]["loaded"] is True and reg.load_ms["thing"] >= 0
+    with pytest.raises(KeyError):
+        reg.get("missing")
+    sys.modules.pop("lazy_plugin_mod", None)
+
+
+def test_tools_and_plugins_endpoints_list_everything_declared():
+    from orchestrator.api.main import app
+
+    with TestClient(app) as client:
+        tools = client.get("/tools").json()
+        assert set(tools["tools"]) >= {spec.name for spec in manifest.TOOLS}
+        plugins = client.get("/plugins").json()
+    assert plugins["startup"]["import_ms"] > 0 and plugins["startup"]["rss_mb"] > 0
+    assert {p["name"] for p in plugins["providers"]} >= {"openai", "gemini"}
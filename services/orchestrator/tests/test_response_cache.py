@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from orchestrator.providers.base import ChatProvider
+from orchestrator.providers.cache import ResponseCache, canonical_key
+
+MSGS = [{"role": "user", "content": "hello"}]
+
+
+class SlowProvider(ChatProvider):
+    name = "test-slow"
+
+    def __init__(self, delay=0.02, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def stream_chat(self, messages, model=None):
+        self.calls += 1
+        for piece in ("Hel", "lo ", "wor", "ld"):
+            await asyncio.sleep(self.delay)
+            yield {"type": "token", "token": piece}
+        if self.fail:
+            raise RuntimeError("upstream reset")
+
+
+async def _collect(stream):
+    return [evt async for evt in stream]
+
+
+def test_key_is_canonical():
+    a = canonical_key("p", "m", [{"role": "user", "content": "x"}])
+    assert a == canonical_key("p", "m", [{"content": "x", "role": "user"}])
+    assert a != canonical_key("p", "m2", [{"role": "user", "content": "x"}])
+
+
+async def test_hit_replays_original_chunking(tmp_path):
+    cache = ResponseCache(str(tmp_path / "rc.db"))
+    prov = SlowProvider()
+    first = await _collect(cache.stream(prov, MSGS, "m"))
+    start = time.perf_counter()
+    second = await _collect(cache.stream(prov, MSGS, "m"))
+    assert second == first and [e["token"] for e in first] == ["Hel", "lo ", "wor", "ld"]
+    assert prov.calls == 1 and time.perf_counter() - start < 0.02
+    assert cache.stats()["hits"]["memory"] == 1
+
+    cold = ResponseCache(str(tmp_path / "rc.db"))  # new process: memory tier empty, SQLite warm
+    assert await _collect(cold.stream(prov, MSGS, "m")) == first
+    assert prov.calls == 1 and cold.stats()["hits"]["sqlite"] == 1
+
+
+async def test_concurrent_identical_requests_share_one_call(tmp_path):
+    cache = ResponseCache(str(tmp_path / "rc.db"))
+    prov = SlowProvider()
+    leader = asyncio.create_task(_collect(cache.stream(prov, MSGS, "m")))
+    await asyncio.sleep(0.05)  # leader is mid-stream; the follower replays the prefix then the tail
+    follower = await _collect(cache.stream(prov, MSGS, "m"))
+    assert follower == await leader and len(follower) == 4
+    assert prov.calls == 1 and cache.stats()["hits"]["inflight"] == 1
+
+
+async def test_failures_and_expired_entries_are_not_served(tmp_path):
+    cache = ResponseCache("")
+    failing = SlowProvider(delay=0, fail=True)
+    with pytest.raises(RuntimeError):
+        await _collect(cache.stream(failing, MSGS, "m"))
+    with pytest.raises(RuntimeError):
+        await _collect(cache.stream(failing, MSGS, "m"))
+    assert failing.calls == 2
+
+    cache.ttl = 0.01
+    prov = SlowProvider(delay=0)
+    await _collect(cache.stream(prov, MSGS, "m"))
+    await asyncio.sleep(0.02)
+    await _collect(cache.stream(prov, MSGS, "m"))
+    assert prov.calls == 2
+
+
+async def test_joiners_skip_leader_status_and_survive_a_cancelled_call(tmp_path):
+    cache = ResponseCache(str(tmp_path / "rc.db"))
+    prov = SlowProvider()
+
+    async def opener():
+        yield {"type": "admission", "queue_depth": 1}
+        async for evt in prov.stream_chat(MSGS):
+            yield evt
+
+    leader = asyncio.create_task(_collect(cache.stream(prov, MSGS, "m", opener=opener)))
+    await asyncio.sleep(0.03)
+    follower = await _collect(cache.stream(prov, MSGS, "m", opener=opener))
+    assert (await leader)[0]["type"] == "admission"
+    assert [e["type"] for e in follower] == ["token"] * 4
+
+    # The shared call is cancelled before any token: both callers start a fresh call instead.
+    cache.clear()
+    first = asyncio.create_task(_collect(cache.stream(prov, MSGS, "m")))
+    second = asyncio.create_task(_collect(cache.stream(prov, MSGS, "m")))
+    await asyncio.sleep(0.005)
+    next(iter(cache._flights.values())).task.cancel()
+    assert len(await first) == len(await second) == 4 and prov.calls == 3
+
+    # Cancelled mid-answer: the joiner gets an error, not the leader's CancelledError.
+    cache.clear()
+    first = asyncio.create_task(_collect(cache.stream(prov, MSGS, "m")))
+    await asyncio.sleep(0.03)
+    next(iter(cache._flights.values())).task.cancel()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        await first
@@ -0,0 +1,74 @@
+import asyncio
+
+from orchestrator.config import settings
+from orchestrator.embeddings.base import embedding_registry
+from orchestrator.embeddings.pipeline import EmbeddingPipeline, embedding_pipeline
+from orchestrator.embeddings.stub import StubEmbeddingProvider
+from orchestrator.memory import fts
+from orchestrator.memory.retrieval import hybrid_retriever, reciprocal_rank_fusion
+from orchestrator.tools.retrieval_tools import RetrievalSearchTool
+
+
+def test_rrf_rewards_agreement_and_keeps_top_k():
+    ranked = {
+        "lexical": [(("ParsingItem", 1), "p1"), (("OntologyItem", 7), "o7")],
+        "ontology": [(("OntologyItem", 9), "o9"), (("OntologyItem", 7), "o7")],
+        "vector": [(("VectorChunk", 3), "v3")],
+    }
+    out = reciprocal_rank_fusion(ranked, limit=2, k=60)
+    assert [(r["axis"], r["id"]) for r in out] == [("OntologyItem", 7), ("ParsingItem", 1)]
+    assert out[0]["ranks"] == {"lexical": 2, "ontology": 2}
+    assert abs(out[0]["score"] - 2 / 62) < 1e-6
+
+
+async def test_hybrid_search_fuses_all_axes(memory_db, tmp_path, monkeypatch):
+    monkeypatch.setitem(embedding_registry._items, "stub", StubEmbeddingProvider())
+    monkeypatch.setattr(settings, "embedding_provider", "stub")
+    monkeypatch.setattr(embedding_pipeline, "cache",
+                        EmbeddingPipeline(str(tmp_path / "emb.db")).cache)
+    memory_db.add_ontology_item("graph", "Graphs", "Adjacency lists for traversal",
+                                tags=["traversal"])
+    memory_db.add_ontology_item("misc", "Misc", "graph traversal mentioned in passing")
+    memory_db.add_vector_chunk("bfs.py#L1-9", "queue based walk",
+                               StubEmbeddingProvider.vector("graph traversal"))
+    memory_db.add_vector_chunk("io.py#L1-9", "file reading",
+                               StubEmbeddingProvider.vector("read files"))
+
+    out = await RetrievalSearchTool().run(query="graph traversal", limit=3)
+    assert set(out["timings_ms"]) == {"lexical", "vector", "ontology", "fuse", "total"}
+    assert not out["errors"]
+    hits = {(r["axis"], r["id"]): r["ranks"] for r in out["results"]}
+    # key + tag match, and title/body via FTS
+    assert hits[("OntologyItem", 1)].keys() == {"lexical", "ontology"}
+    assert hits[("VectorChunk", 1)] == {"vector": 1}
+    assert ("VectorChunk", 2) not in hits and len(out["results"]) == 3
+
+
+async def test_slow_axis_times_out_without_failing_search(memory_db, monkeypatch):
+    memory_db.add_ontology_item("alpha", "Alpha", "alpha body")
+
+    async def stalled(query, n, vector):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(hybrid_retriever, "_vector", stalled)
+    monkeypatch.setattr(settings, "retrieval_axis_timeout_s", 0.05)
+    out = await hybrid_retriever.search("alpha")
+    assert out["errors"] == {"vector": "timeout"} and out["candidates"]["vector"] == 0
+    assert [r["ranks"] for r in out["results"]] == [{"lexical": 1, "ontology": 1}]
+
+
+def test_scan_fallback_ranks_across_axes(memory_db, monkeypatch):
+    for i in range(8):
+        memory_db.add_ontology_item(f"k{i}", f"item {i}", "one needle")
+    memory_db.add_vector_chunk("late.py", "needle needle needle")
+    monkeypatch.setattr(fts, "_backend", None)
+    results = memory_db.simple_lexical_search("needle", limit=3)
+    assert (results[0]["axis"], results[0]["score"]) == ("VectorChunk", 3.0) and len(results) == 3
+
+def test_ontology_terms_limit_keeps_exact_matches(memory_db):
+    for i in range(20):
+        memory_db.add_ontology_item(f"graphs{i}", f"item {i}", "prefix only")
+    memory_db.add_ontology_item("misc", "Tagged", "exact tag", tags=["graph"])
+    memory_db.add_ontology_item("graph", "Exact", "exact key")
+    rows = memory_db.ontology_by_terms(["graph"], limit=3)
+    assert [r[1] for r in rows] == ["graph", "misc", "graphs0"]
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from orchestrator.config import settings
+from orchestrator.providers.base import provider_registry
+from orchestrator.providers.gemini_stub import GeminiStubProvider
+from orchestrator.providers.router import ModelRouter
+
+MSGS = [{"role": "user", "content": "ping"}]
+
+
+@pytest.fixture(autouse=True)
+def stubs(monkeypatch):
+    monkeypatch.setattr(settings, "router_explore", 0.0)
+    monkeypatch.setattr(settings, "router_hedge_after_ms", 50.0)
+    slow = GeminiStubProvider("stub-slow", first_token_delay=0.5)
+    for prov in (slow, GeminiStubProvider("stub-fast", first_token_delay=0.01),
+                 GeminiStubProvider("stub-down", fail=True)):
+        monkeypatch.setitem(provider_registry._items, prov.name, prov)
+    return slow
+
+
+async def _run(router, cls, **kw):
+    events = [e async for e in router.stream(cls, MSGS, **kw)]
+    return events[0], events[1:]
+
+
+async def test_routes_to_lowest_ewma_ttft():
+    router = ModelRouter({"c": ["stub-slow:m", "stub-fast:m"]})
+    route, tokens = await _run(router, "c", hedge=False)
+    assert route["provider"] == "stub-slow"
+    assert tokens == [{"type": "token", "token": "[stub-slow-stub] ping"}]
+    # unmeasured -> tried
+    assert (await _run(router, "c", hedge=False))[0]["provider"] == "stub-fast"
+    assert (await _run(router, "c", hedge=False))[0]["provider"] == "stub-fast"
+    stats = router.stats_snapshot()["targets"]
+    assert stats["stub-slow:m"]["ttft_ewma_ms"] > stats["stub-fast:m"]["ttft_ewma_ms"]
+
+
+async def test_hedge_wins_and_cancels_slow_primary():
+    router = ModelRouter({"c": ["stub-slow:m", "stub-fast:m"]})
+    start = time.perf_counter()
+    route, tokens = await _run(router, "c", hedge=True)
+    assert route["provider"] == "stub-fast" and route["hedged"] and route["attempts"] == 2
+    assert time.perf_counter() - start < 0.3
+    snap = router.stats_snapshot()
+    assert snap["hedges"] == 1 and snap["hedge_wins"] == 1
+    assert snap["targets"]["stub-slow:m"]["inflight"] == 0  # loser was cancelled
+    # The cancelled loser only gets a lower bound: no TTFT sample, estimate at least the wait.
+    slow = router.stats[("stub-slow", "m")]
+    assert slow.samples == 0 and not slow.recent and slow.ttft_ms >= 50.0
+
+
+def test_censored_ttft_never_lowers_the_estimate():
+    router = ModelRouter({"c": ["stub-fast:m"]})
+    stats = router._stats(("stub-fast", "m"))
+    stats.observe_ttft(300.0, 0.5)
+    stats.observe_censored(100.0, 0.5)
+    assert stats.ttft_ms == 300.0 and stats.samples == 1
+    stats.observe_censored(500.0, 0.5)
+    assert stats.ttft_ms == 400.0 and list(stats.recent) == [300.0]
+
+
+async def test_failover_and_error_rate_ranking():
+    router = ModelRouter({"c": ["stub-down:m", "stub-fast:m"]})
+    route, _ = await _run(router, "c", hedge=False)
+    assert route["provider"] == "stub-fast" and router.failovers == 1
+    assert router.rank("c")[0] == ("stub-fast", "m")
+    with pytest.raises(RuntimeError):
+        await _run(ModelRouter({"c": ["stub-down:m"]}), "c")
+    with pytest.raises(KeyError):
+        await _run(router, "missing")
+
+
+def test_hedge_threshold_follows_ttft_percentile(monkeypatch):
+    monkeypatch.setattr(settings, "router_hedge_min_samples", 5)
+    router = ModelRouter({"c": ["stub-fast:m"]})
+    assert router.hedge_delay(("stub-fast", "m")) == 0.05  # fixed fallback until enough samples
+    for ms in [10.0] * 19 + [400.0]:
+        router._stats(("stub-fast", "m")).observe_ttft(ms, 0.2)
+    assert router.hedge_delay(("stub-fast", "m")) == pytest.approx(0.01)
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator.speech.base import SpeechProvider, speech_registry
+from orchestrator.speech.cache import AudioCache, audio_cache, audio_key, synthesize_cached
+
+
+class CountingSpeech(SpeechProvider):
+    name = "test-speech"
+
+    def __init__(self):
+        self.synth_calls = 0
+        self.fail = False
+
+    async def transcribe(self, audio_bytes, language=None):
+        return {"text": f"{len(audio_bytes)} bytes", "provider": self.name}
+
+    # The streaming path is used instead.
+    async def synthesize(self, text, voice=None, format="mp3"):  # pragma: no cover
+        raise NotImplementedError
+
+    async def synthesize_stream(self, text, voice=None, format="mp3"):
+        self.synth_calls += 1
+        for i in range(3):
+            if self.fail and i == 1:
+                raise RuntimeError("provider dropped")
+            yield f"{text}-{i};".encode()
+
+
+@pytest.fixture()
+def speech(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_cache, "directory", str(tmp_path / "tts"))
+    monkeypatch.setattr(audio_cache, "_entries", type(audio_cache._entries)())
+    monkeypatch.setattr(audio_cache, "_bytes", 0)
+    monkeypatch.setattr(audio_cache, "_loaded", False)
+    prov = CountingSpeech()
+    speech_registry.register(prov)
+    return prov
+
+
+async def _drain(chunks):
+    return b"".join([c async for c in chunks])
+
+
+async def test_cache_hit_and_failed_synthesis_not_cached(speech):
+    hit, chunks = await synthesize_cached(speech, "hello", voice="v")
+    assert not hit and await _drain(chunks) == b"hello-0;hello-1;hello-2;"
+    hit, chunks = await synthesize_cached(speech, "hello", voice="v")
+    assert hit and await _drain(chunks) == b"hello-0;hello-1;hello-2;"
+    assert speech.synth_calls == 1
+
+    speech.fail = True
+    _, chunks = await synthesize_cached(speech, "other", voice="v")
+    with pytest.raises(RuntimeError):
+        await _drain(chunks)
+    assert audio_cache.get(audio_key(speech.name, "v", "mp3", "other")) is None
+    root = audio_cache.directory
+    assert not [n for d in os.listdir(root) for n in os.listdir(os.path.join(root, d))
+                if n.startswith(".")]
+
+
+async def test_hit_survives_eviction_and_vanished_file_is_a_miss(speech, monkeypatch):
+    await _drain((await synthesize_cached(speech, "hello", voice="v"))[1])
+    hit, chunks = await synthesize_cached(speech, "hello", voice="v")
+    audio_cache.clear()  # evicted after the hit was reported: the open handle still reads it
+    assert hit and await _drain(chunks) == b"hello-0;hello-1;hello-2;"
+
+    monkeypatch.setattr(audio_cache, "get", lambda key: os.path.join(audio_cache.directory, "x"))
+    hit, chunks = await synthesize_cached(speech, "hello", voice="v")
+    assert not hit and await _drain(chunks) == b"hello-0;hello-1;hello-2;"
+    assert speech.synth_calls == 2
+
+def test_lru_bounded_by_bytes_and_rebuilt_from_disk(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=25)
+    for name in ("a", "b", "c"):
+        fd, tmp = cache.new_temp(name * 8)
+        os.write(fd, b"x" * 10)
+        os.close(fd)
+        cache.commit(name * 8, "mp3", tmp)
+        if name == "b":
+            assert cache.get("a" * 8)  # touch "a" so "b" becomes the eviction candidate
+    assert cache.get("b" * 8) is None and cache.get("a" * 8) and cache.get("c" * 8)
+    reopened = AudioCache(str(tmp_path), max_bytes=25)
+    assert reopened.stats()["entries"] == 0 and reopened.get("c" * 8)
+    assert reopened.stats()["bytes"] == 20
+
+
+def test_speech_endpoints(speech):
+    from orchestrator.api.main import app
+
+    client = TestClient(app)
+    body = {"text": "hi", "provider": speech.name, "format": "wav"}
+    first = client.post("/speech/tts/stream", json=body)
+    second = client.post("/speech/tts/stream", json=body)
+    assert first.headers["x-cache"] == "miss" and second.headers["x-cache"] == "hit"
+    assert first.content == second.content == b"hi-0;hi-1;hi-2;"
+    assert first.headers["content-type"] == "audio/wav"
+    assert client.post("/speech/tts", json=body).json()["cached"] is True
+
+    audio = b"\x00" * 200_000
+    resp = client.post("/speech/transcribe/upload", files={"file": ("a.wav", audio)},
+                       data={"provider": speech.name})
+    assert resp.json()["text"] == "200000 bytes"
+    resp = client.post(f"/speech/transcribe/stream?provider={speech.name}",
+                       content=iter([audio[:1000], audio[1000:]]))
+    assert resp.json()["text"] == "200000 bytes"
+
+
+async def test_unknown_format_rejected_before_touching_cache(speech, tmp_path):
+    from orchestrator.api.main import app
+
+    resp = TestClient(app).post("/speech/tts/stream", json={"text": "hi", "provider": speech.name,
+                                                            "format": "mp3/../../x"})
+    assert resp.status_code == 400
+    with pytest.raises(ValueError):
+        await synthesize_cached(speech, "hi", format="../x")
+    assert speech.synth_calls == 0 and not os.path.exists(tmp_path / "tts")
@@ -0,0 +1,40 @@
+import asyncio
+
+import orjson
+from fastapi.testclient import TestClient
+
+from orchestrator.api.main import app
+from orchestrator.api.sse import coalesce_tokens, encode_event
+
+
+async def _events(items, gap=0.0):
+    for item in items:
+        yield item
+        await asyncio.sleep(gap)
+
+async def test_coalesce_merges_tokens_but_not_first():
+    items = [{"type": "token", "token": t} for t in ["a", "b", "c", "d"]]
+    items.append({"type": "end", "reason": "completed"})
+    out = [e async for e in coalesce_tokens(_events(items), window_ms=50, max_bytes=1024)]
+    assert out == [
+        {"type": "token", "token": "a"},
+        {"type": "token", "token": "bcd"},
+        {"type": "end", "reason": "completed"},
+    ]
+
+async def test_coalesce_flushes_on_size_and_zero_window_passthrough():
+    items = [{"type": "token", "token": "xx"} for _ in range(5)]
+    out = [e async for e in coalesce_tokens(_events(items), window_ms=1000, max_bytes=4)]
+    assert [e["token"] for e in out] == ["xx", "xxxx", "xxxx"]
+    out = [e async for e in coalesce_tokens(_events(items), window_ms=0, max_bytes=4)]
+    assert len(out) == 5
+
+def test_encode_event_frame():
+    assert encode_event({"type": "end"}) == b'data: {"type":"end"}\n\n'
+
+def test_chat_stream_endpoint_frames():
+    client = TestClient(app)
+    resp = client.post("/chat/stream", json={"message": "hi", "provider": "gemini"})
+    frames = [orjson.loads(f.split("data: ", 1)[1]) for f in resp.text.split("\n\n") if f]
+    assert frames[0] == {"type": "token", "token": "[gemini-stub] hi"}
+    assert frames[-1]["type"] == "end"
@@ -0,0 +1,97 @@
+import asyncio
+from contextlib import aclosing
+
+import orjson
+from fastapi.testclient import TestClient
+
+from orchestrator.api.main import app
+from orchestrator.config import settings
+from orchestrator.core.streams import StreamRegistry, parse_event_id
+
+
+def _frames(resp):
+    out = []
+    for frame in resp.text.split("\n\n"):
+        if frame:
+            head, data = frame.split("\ndata: ", 1)
+            out.append((head[len("id: "):], orjson.loads(data)))
+    return out
+
+
+async def test_generation_survives_disconnect_and_resumes_from_last_id():
+    started = []
+
+    async def turn():
+        started.append(1)
+        for i in range(6):
+            yield {"type": "token", "token": str(i)}
+            await asyncio.sleep(0.01)
+        yield {"type": "end", "reason": "completed"}
+
+    streams = StreamRegistry()
+    stream = streams.start(turn())
+    seen = []
+    async with aclosing(stream.follow()) as events:
+        async for seq, evt in events:
+            seen.append(seq)
+            if len(seen) == 2:
+                break  # client drops
+    assert stream.followers == 0 and not stream.done
+    await asyncio.sleep(0.03)  # generation keeps going while nobody listens
+    rest = [(seq, evt) async for seq, evt in await streams.open(stream.id, after=seen[-1])]
+    assert [seq for seq, _ in rest] == list(range(2, 7)) and rest[-1][1]["type"] == "end"
+    assert len(started) == 1 and streams.stats()["resumed"] == 1
+
+
+async def test_overwritten_events_are_reported_as_a_gap(monkeypatch):
+    monkeypatch.setattr(settings, "sse_replay_events", 3)
+
+    async def turn():
+        for i in range(5):
+            yield {"type": "token", "token": str(i)}
+
+    streams = StreamRegistry()
+    stream = streams.start(turn())
+    await stream.task
+    out = [item async for item in stream.follow(0)]
+    assert out[0] == (1, {"type": "gap", "missed": 1})
+    assert [seq for seq, _ in out[1:]] == [2, 3, 4]
+
+
+def test_chat_stream_ids_and_last_event_id_reconnect():
+    client = TestClient(app)
+    resp = client.post("/chat/stream",
+                       json={"message": "a b c", "provider": "gemini", "coalesce_ms": 0})
+    frames = _frames(resp)
+    stream_id = resp.headers["x-stream-id"]
+    assert [parse_event_id(i) for i, _ in frames] == [(stream_id, n) for n in range(len(frames))]
+    assert frames[-1][1]["type"] == "end"
+
+    again = _frames(client.post("/chat/stream", json={"message": "ignored"},
+                                headers={"Last-Event-ID": frames[0][0]}))
+    assert again == frames[1:]
+    assert _frames(client.get(f"/chat/stream/{stream_id}?after=-1")) == frames
+    assert client.get("/chat/stream/nope").status_code == 404
+
+
+async def test_finished_streams_spill_to_db(memory_db, monkeypatch):
+    from orchestrator.memory import writer as writer_mod
+    from orchestrator.memory.writer import BatchWriter
+
+    writer = BatchWriter()
+    monkeypatch.setattr(writer_mod, "db_writer", writer)
+    monkeypatch.setattr(settings, "sse_replay_spill", True)
+    writer.start()
+
+    async def turn():
+        yield {"type": "token", "token": "x"}
+        yield {"type": "end", "reason": "completed"}
+
+    streams = StreamRegistry()
+    stream = streams.start(turn())
+    await stream.task
+    await writer.shutdown()
+    streams.streams.clear()  # evicted from memory
+    out = [item async for item in await streams.open(stream.id, after=0)]
+    assert out == [(1, {"type": "end", "reason": "completed"})]
+    assert streams.stats()["resumed_from_db"] == 1
@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from orchestrator.tools.process import ProcessExit, ProcessScheduler, SchedulerFull, stream_process
+from orchestrator.tools.terminal_tool import TerminalExecTool
+
+
+async def _collect(cmd, **kw):
+    chunks, exit_ = [], None
+    async for item in stream_process(cmd, **kw):
+        if isinstance(item, ProcessExit):
+            exit_ = item
+        else:
+            chunks.append((time.perf_counter(), item))
+    return chunks, exit_
+
+
+async def test_output_streams_before_exit():
+    code = ("import sys, time; sys.stdout.write('a\\n'); sys.stdout.flush(); time.sleep(0.4); "
+            "sys.stdout.write('b\\n')")
+    start = time.perf_counter()
+    chunks, exit_ = await _collect([sys.executable, "-c", code])
+    assert [c[1] for c in chunks] == [("stdout", b"a\n"), ("stdout", b"b\n")]
+    assert chunks[0][0] - start < chunks[1][0] - start - 0.3
+    assert exit_.code == 0 and not exit_.timed_out
+
+
+async def test_timeout_kills_process_group():
+    # The backgrounded child keeps the pipes open; only a group kill ends the stream.
+    start = time.perf_counter()
+    _, exit_ = await _collect("sleep 30 & sleep 30", timeout=0.3)
+    assert exit_.timed_out and exit_.code is not None
+    assert time.perf_counter() - start < 5
+
+
+async def test_output_cap_truncates():
+    chunks, exit_ = await _collect([sys.executable, "-c", "print('x' * 1_000_000)"], max_bytes=1000)
+    assert exit_.truncated and exit_.stdout_bytes == 1000
+    assert sum(len(d) for _, (_, d) in chunks) == 1000
+
+
+async def test_scheduler_limits_and_rejects():
+    sched = ProcessScheduler(max_procs=2, max_queued=1)
+    peak = 0
+
+    async def one():
+        nonlocal peak
+        argv = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+        async for item in stream_process(argv, scheduler=sched):
+            peak = max(peak, sched.running)
+        return item
+
+    tasks = [asyncio.create_task(one()) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(SchedulerFull):
+        await one()
+    results = await asyncio.gather(*tasks)
+    assert peak <= 2 and sched.stats()["rejected"] == 1
+    assert max(r.queued_ms for r in results) > 100
+
+
+async def test_terminal_tool_run_and_stream():
+    tool = TerminalExecTool()
+    res = await tool.run(command="echo hi")
+    assert res["stdout"] == "hi\n" and res["code"] == 0 and not res["truncated"]
+    items = [item async for item in tool.stream(command="echo hi")]
+    assert items[0] == {"stream": "stdout", "data": "hi\n"}
+    with pytest.raises(PermissionError):
+        await tool.run(command="rm -rf /")
+
+
+async def test_terminal_tool_cannot_raise_configured_limits(monkeypatch):
+    from orchestrator.config import settings
+
+    monkeypatch.setattr(settings, "terminal_max_output_bytes", 10)
+    monkeypatch.setattr(settings, "terminal_timeout_s", 0.3)
+    tool = TerminalExecTool()
+    res = await tool.run(command="echo " + "x" * 100, max_bytes=1_000_000)
+    assert res["truncated"] and res["stdout_bytes"] == 10
+    start = time.perf_counter()
+    res = await tool.run(command="tail -f /dev/null", timeout=60)
+    assert res["timed_out"] and time.perf_counter() - start < 5
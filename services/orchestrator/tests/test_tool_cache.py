@@ -0,0 +1,68 @@
+import os
+
+from orchestrator.tools.cache import ToolResultCache
+from orchestrator.tools.fs_tools import FSReadTool, FSWriteTool
+
+
+async def test_fs_read_cache_hits_and_invalidation(tmp_path, monkeypatch):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "allow_fs_base", str(tmp_path))
+    import orchestrator.tools.fs_tools as fs_tools
+    cache = ToolResultCache(max_entries=8)
+    monkeypatch.setattr(fs_tools, "tool_cache", cache)
+
+    path = str(tmp_path / "a.txt")
+    read = FSReadTool()
+    await FSWriteTool().run(path=path, content="one")
+    assert (await cache.call(read, {"path": path}))["content"] == "one"
+    assert (await cache.call(read, {"path": path}))["content"] == "one"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Eager invalidation through fs.write
+    await FSWriteTool().run(path=path, content="two")
+    assert cache.stats()["entries"] == 0
+    assert (await cache.call(read, {"path": path}))["content"] == "two"
+
+    # Out-of-band modification is caught by the mtime/size fingerprint
+    with open(path, "w") as f:
+        f.write("three!")
+    os.utime(path, ns=(1, 1))
+    assert (await cache.call(read, {"path": path}))["content"] == "three!"
+    assert cache.stale == 1
+
+async def test_lru_eviction(tmp_path, monkeypatch):
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "allow_fs_base", str(tmp_path))
+    cache = ToolResultCache(max_entries=2)
+    read = FSReadTool()
+    for name in ("a", "b", "c"):
+        (tmp_path / name).write_text(name)
+        await cache.call(read, {"path": str(tmp_path / name)})
+    await cache.call(read, {"path": str(tmp_path / "c")})
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1 and stats["hits"] == 1
+
+async def test_apply_patch_invalidates_on_the_loop_thread(tmp_path, monkeypatch):
+    import threading
+
+    from orchestrator import config as cfg
+    monkeypatch.setattr(cfg.settings, "allow_fs_base", str(tmp_path))
+    import orchestrator.tools.fs_tools as fs_tools
+    cache = ToolResultCache(max_entries=8)
+    monkeypatch.setattr(fs_tools, "tool_cache", cache)
+    threads = []
+    real_invalidate = cache.invalidate_path
+
+    def invalidate_path(path):
+        threads.append(threading.current_thread())
+        return real_invalidate(path)
+
+    monkeypatch.setattr(cache, "invalidate_path", invalidate_path)
+    path = str(tmp_path / "a.txt")
+    (tmp_path / "a.txt").write_text("one\n")
+    read = FSReadTool()
+    await cache.call(read, {"path": path})
+    patch = "--- a/a.txt\n+++ b/a.txt\n@@ -1 +1 @@\n-one\n+two\n"
+    await fs_tools.FSApplyPatchTool().run(patch=patch, path=path)
+    assert threads == [threading.current_thread()]
+    assert (await cache.call(read, {"path": path}))["content"] == "two\n"
@@ -0,0 +1,61 @@
+import numpy as np
+
+from orchestrator.memory.vector_index import VectorIndex, pack_vector, unpack_vector
+from orchestrator.tools.memory_tools import MemoryVectorSearchTool
+
+
+def test_pack_roundtrip_and_legacy_json():
+    vec = [0.5, -1.25, 3.0]
+    assert np.allclose(unpack_vector(pack_vector(vec)), vec)
+    assert np.allclose(unpack_vector("[0.5, -1.25, 3.0]"), vec)
+
+def test_exact_and_ivf_search(tmp_path):
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((2000, 32)).astype(np.float32)
+    index = VectorIndex(str(tmp_path))
+    index.write(((i + 100, data[i]) for i in range(len(data))), dim=32, count=len(data))
+    assert len(index) == 2000
+    top = index.search(data[42], k=5, mode="exact")
+    assert top[0][0] == 142 and abs(top[0][1] - 1.0) < 1e-5
+    index.build_ivf(nlist=16)
+    hits = 0
+    for q in range(50):
+        exact = {i for i, _ in index.search(data[q], k=10, mode="exact")}
+        approx = {i for i, _ in index.search(data[q], k=10, mode="ivf", nprobe=4)}
+        hits += len(exact & approx)
+    assert hits / 500 > 0.6
+
+async def test_vector_search_tool(memory_db):
+    memory_db.add_vector_chunk("a.py#L1-2", "alpha", [1.0, 0.0, 0.0])
+    memory_db.add_vector_chunk("b.py#L1-2", "beta", [0.0, 1.0, 0.0])
+    out = await MemoryVectorSearchTool().run(vector=[0.9, 0.1, 0.0], k=1)
+    assert [r["source"] for r in out["results"]] == ["a.py#L1-2"]
+    memory_db.add_vector_chunk("c.py#L1-2", "gamma", [1.0, 0.05, 0.0])
+    out = await MemoryVectorSearchTool().run(vector=[1.0, 0.05, 0.0], k=1)
+    assert out["results"][0]["snippet"] == "gamma"
+
+def test_legacy_json_embeddings_are_migrated(memory_db, tmp_path, monkeypatch):
+    import sqlite3
+    monkeypatch.setattr(memory_db, "_MIGRATE_PAGE", 1)
+    conn = sqlite3.connect(tmp_path / "memory.db")
+    conn.execute("CREATE TABLE vectorchunk (id INTEGER PRIMARY KEY, source VARCHAR NOT NULL, "
+                 "content VARCHAR NOT NULL, embedding VARCHAR, dim INTEGER, "
+                 "created_at DATETIME NOT NULL)")
+    conn.execute("INSERT INTO vectorchunk VALUES (1, 'a.py', 'alpha', '[1.0, 0.0]', 2, "
+                 "'2024-01-01 00:00:00')")
+    conn.execute("INSERT INTO vectorchunk VALUES (2, 'b.py', 'beta', 'not json', 2, "
+                 "'2024-01-01 00:00:00')")
+    conn.commit()
+    conn.close()
+    chunks = memory_db.get_vector_chunks([1, 2])  # a malformed row does not abort startup
+    assert isinstance(chunks[1].embedding, bytes)
+    assert np.allclose(unpack_vector(chunks[1].embedding), [1.0, 0.0])
+    assert chunks[2].embedding is None
+    with memory_db.get_engine().connect() as c:  # recorded, so later startups skip the scan
+        assert c.exec_driver_sql("PRAGMA user_version").scalar() == 1
+
+def test_rows_of_another_dim_are_counted(tmp_path):
+    index = VectorIndex(str(tmp_path))
+    rows = [(1, np.ones(4, dtype=np.float32)), (2, np.ones(3, dtype=np.float32))]
+    index.write(rows, dim=4, count=2)
+    assert len(index) == 1 and index.stats()["skipped"] == 1
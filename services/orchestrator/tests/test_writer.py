@@ -0,0 +1,61 @@
+from sqlmodel import Session, select
+
+from orchestrator.core.executor import ToolExecutor
+from orchestrator.memory import models
+from orchestrator.memory.writer import BatchWriter
+
+
+async def test_batched_inserts_flush_and_shutdown(memory_db):
+    writer = BatchWriter(max_batch=50, max_delay_ms=1000)
+    writer.start()
+    futures = [writer.submit(models.Message(session_id=1, role="user", content_json="{}"))
+               for _ in range(120)]
+    await writer.flush()
+    assert all(f.done() for f in futures)
+    assert sorted(f.result() for f in futures) == list(range(1, 121))
+    assert writer.stats()["batches"] == 3
+    writer.submit(models.Message(session_id=1, role="assistant", content_json="{}"))
+    await writer.shutdown()
+    assert not writer.running
+    with Session(memory_db.get_engine()) as s:
+        assert len(s.exec(select(models.Message)).all()) == 121
+
+async def test_tool_executions_recorded(memory_db, monkeypatch):
+    import orchestrator.core.executor as executor
+    writer = BatchWriter()
+    monkeypatch.setattr(executor, "db_writer", writer)
+    import orchestrator.memory.writer as writer_mod
+    monkeypatch.setattr(writer_mod, "db_writer", writer)
+    writer.start()
+    calls = [{"name": "no.such.tool"}]
+    _ = [e async for e in ToolExecutor().run(calls)]
+    await writer.shutdown()
+    with Session(memory_db.get_engine()) as s:
+        rows = s.exec(select(models.ToolExecution)).all()
+    assert [(r.tool_name, r.status) for r in rows] == [("no.such.tool", "error")]
+
+async def test_failed_batch_is_retried_row_by_row(memory_db):
+    writer = BatchWriter(max_batch=10, max_delay_ms=1000)
+    writer.start()
+    good = [writer.submit(models.Message(session_id=1, role="user", content_json="{}"))
+            for _ in range(3)]
+    bad = writer.submit(models.Message(session_id=1, role=None, content_json="{}"))
+    unbuildable = writer.submit(lambda: models.Message(session_id=1, role="user",
+                                                       content_json=1 / 0))
+    await writer.flush()
+    assert sorted(f.result() for f in good) == [1, 2, 3]
+    assert bad.exception() is not None and isinstance(unbuildable.exception(), ZeroDivisionError)
+    assert writer.stats()["failed"] == 2 and writer.stats()["committed"] == 3
+    await writer.shutdown()
+
+async def test_stop_reports_a_thread_that_outlives_the_timeout(memory_db):
+    import threading
+    release = threading.Event()
+    writer = BatchWriter(engine_factory=lambda: release.wait() and memory_db.get_engine())
+    writer.start()
+    writer.submit(models.Message(session_id=1, role="user", content_json="{}"))
+    assert not await writer.shutdown(timeout=0.05)
+    assert writer.running and writer.stats()["running"]
+    release.set()
+    assert await writer.shutdown()
+    assert not writer.running
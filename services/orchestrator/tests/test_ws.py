@@ -0,0 +1,86 @@
+import orjson
+from fastapi.testclient import TestClient
+
+from orchestrator.api.main import app
+from orchestrator.api.ws import pack_frames, stream_registry, unpack_frames
+from orchestrator.providers.base import provider_registry
+from orchestrator.providers.gemini_stub import GeminiStubProvider
+
+
+def _until_closed(ws, ids, binary=False):
+    frames, closed = [], set()
+    while closed != set(ids):
+        batch = unpack_frames(ws.receive_bytes()) if binary else [ws.receive_json()]
+        for frame in batch:
+            frames.append(frame)
+            if frame.get("op") == "closed":
+                closed.add(frame["id"])
+    return frames
+
+
+def test_concurrent_turns_share_one_socket():
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"op": "ping"})
+        assert ws.receive_json() == {"op": "pong"}
+        for cid, text in (("a", "one"), ("b", "two")):
+            ws.send_json({"op": "chat", "id": cid, "message": text, "provider": "gemini"})
+        frames = _until_closed(ws, {"a", "b"})
+    by_id = {cid: [f for f in frames if f.get("id") == cid] for cid in "ab"}
+    for cid, text in (("a", "one"), ("b", "two")):
+        opened, *events, closed = by_id[cid]
+        assert opened["op"] == "opened" and closed == {"id": cid, "op": "closed"}
+        assert [e["seq"] for e in events] == list(range(len(events)))
+        assert events[0]["event"] == {"type": "token", "token": f"[gemini-stub] {text}"}
+        assert events[-1]["event"]["type"] == "end"
+
+
+def test_binary_framing_batches_frames():
+    frames = [{"id": "x", "seq": i, "event": {"type": "token", "token": "t"}} for i in range(3)]
+    assert unpack_frames(pack_frames(frames)) == frames
+    with TestClient(app).websocket_connect("/ws?binary=1") as ws:
+        ws.send_bytes(orjson.dumps({"op": "chat", "id": "b", "message": "hi", "provider": "gemini",
+                                    "coalesce_ms": 0}))
+        frames = _until_closed(ws, {"b"}, binary=True)
+    assert frames[0]["op"] == "opened" and frames[-2]["event"]["type"] == "end"
+
+
+def test_cancel_stops_generation_and_stream_resumes_over_sse(monkeypatch):
+    monkeypatch.setitem(provider_registry._items, "slow",
+                        GeminiStubProvider("slow", token_delay=0.05))
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"op": "chat", "id": "s", "message": "a b c d e f g h", "provider": "slow",
+                      "coalesce_ms": 0})
+        stream_id = ws.receive_json()["stream"]
+        assert ws.receive_json()["event"]["type"] == "token"
+        ws.send_json({"op": "cancel", "id": "s"})
+        frames = _until_closed(ws, {"s"})
+        assert frames[-2]["event"] == {"type": "error", "error": "cancelled"}
+
+        ws.send_json({"op": "chat", "id": "s", "message": "x", "session_id": "nope"})
+        assert ws.receive_json() == {"id": "s", "op": "error",
+                                     "error": "session_id must be an integer"}
+        ws.send_json({"op": "resume", "id": "r", "stream": stream_id, "after": 0})
+        frames = _until_closed(ws, {"r"})
+        assert frames[1]["seq"] == 1 and frames[-2]["event"]["error"] == "cancelled"
+    resp = client.get(f"/chat/stream/{stream_id}")
+    assert resp.status_code == 200 and '"cancelled"' in resp.text
+    assert client.get("/chat/streams").json()["websocket"]["cancels"] >= 1
+
+
+def test_bad_frames_fail_their_id_and_keep_the_socket(monkeypatch):
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"op": "resume", "id": "n", "stream": "x", "after": None})
+        reply = ws.receive_json()
+        assert reply["id"] == "n" and reply["op"] == "error"
+        ws.send_json({"op": "resume", "id": "l", "stream": "x", "after": [1]})
+        assert ws.receive_json()["op"] == "error"
+
+        async def broken(stream_id, after):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(stream_registry, "open", broken)
+        ws.send_json({"op": "resume", "id": "b", "stream": "x", "after": 0})
+        assert ws.receive_json() == {"id": "b", "op": "error", "error": "RuntimeError"}
+        ws.send_json({"op": "ping"})
+        assert ws.receive_json() == {"op": "pong"}